@@ -0,0 +1,117 @@
+"""
+Benchmark the per-task overhead of the execution engines.
+
+Runs a single virtual task that depends on N trivial tasks, with N jobs
+so that every task is running at once, and reports the wall time per task
+and the peak number of threads for each engine.
+
+Usage, from the root of the repository: python -m benchmarks.engines [N ...]
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from vscode_task_runner import executor
+from vscode_task_runner.parser import load_tasks
+
+DEFAULT_COUNTS = [10, 100, 1000]
+
+
+def write_tasks(path: str, count: int) -> None:
+    """
+    Write a tasks file with a task that depends on `count` trivial tasks.
+    """
+    if true_executable := shutil.which("true"):
+        command, args = true_executable, []
+    else:  # pragma: no cover
+        command, args = sys.executable, ["-c", ""]
+
+    tasks = [
+        {"label": f"task{i}", "type": "process", "command": command, "args": args}
+        for i in range(count)
+    ]
+    tasks.append({"label": "all", "dependsOn": [t["label"] for t in tasks]})
+
+    os.makedirs(os.path.join(path, ".vscode"))
+    with open(os.path.join(path, ".vscode", "tasks.json"), "w") as fp:
+        json.dump({"version": "2.0.0", "tasks": tasks}, fp)
+
+
+def raise_file_limit(count: int) -> None:
+    """
+    Make sure enough file descriptors are available for every task's pipes.
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = count * 4 + 256
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+def run(path: str, engine: str, count: int) -> tuple[float, int]:
+    """
+    Run the benchmark once, returning the wall time and peak thread count.
+    """
+    os.environ["VTR_ENGINE"] = engine
+    os.environ["VTR_JOBS"] = str(count)
+
+    peak_threads = 0
+    stop = threading.Event()
+
+    def sample_threads() -> None:
+        nonlocal peak_threads
+        while not stop.is_set():
+            # don't count this sampling thread
+            peak_threads = max(peak_threads, threading.active_count() - 1)
+            time.sleep(0.001)
+
+    sampler = threading.Thread(target=sample_threads)
+    sampler.start()
+
+    task = load_tasks(path).tasks_dict["all"]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        executor.execute_tasks([task], extra_args=[])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    sampler.join()
+    return elapsed, peak_threads
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS
+    raise_file_limit(max(counts))
+
+    os.environ["VTR_SKIP_SUMMARY"] = "1"
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        os.environ["VTR_STATE_DIR"] = state_dir
+
+        print(
+            f"{'tasks':>6} {'engine':>8} {'wall (s)':>10} {'per task (ms)':>14} {'threads':>8}"
+        )
+        for count in counts:
+            with tempfile.TemporaryDirectory() as path:
+                write_tasks(path, count)
+
+                for engine in ("threads", "asyncio"):
+                    elapsed, threads = run(path, engine, count)
+                    print(
+                        f"{count:>6} {engine:>8} {elapsed:>10.3f} {elapsed / count * 1000:>14.3f} {threads:>8}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the throughput of prefixed output from tasks running in parallel.
+
+Runs a number of tasks at once that each write lots of lines of output,
+and reports how many MB/s of prefixed output each engine prints.
+
+Usage, from the root of the repository: python -m benchmarks.output [TASKS] [MB PER TASK]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from vscode_task_runner import executor
+from vscode_task_runner.parser import load_tasks
+
+LINE = "x" * 79
+"""
+Line of output written by each task.
+"""
+
+
+def write_tasks(path: str, count: int, megabytes: int) -> None:
+    """
+    Write a tasks file with a task that depends on `count` tasks
+    that each write `megabytes` of output.
+    """
+    lines = megabytes * 1024 * 1024 // (len(LINE) + 1)
+    code = f"import sys; sys.stdout.write(('{LINE}' + chr(10)) * {lines})"
+
+    labels = [f"task{i}" for i in range(count)]
+    tasks: list[dict] = [
+        {
+            "label": label,
+            "type": "process",
+            "command": sys.executable,
+            "args": ["-c", code],
+        }
+        for label in labels
+    ]
+    tasks.append({"label": "all", "dependsOn": labels})
+
+    os.makedirs(os.path.join(path, ".vscode"))
+    with open(os.path.join(path, ".vscode", "tasks.json"), "w") as fp:
+        json.dump({"version": "2.0.0", "tasks": tasks}, fp)
+
+
+def run(path: str, engine: str, count: int) -> float:
+    """
+    Run the benchmark once, returning the wall time.
+    """
+    os.environ["VTR_ENGINE"] = engine
+    os.environ["VTR_JOBS"] = str(count)
+
+    task = load_tasks(path).tasks_dict["all"]
+
+    # send all output to nowhere, so only the cost of vtr is measured
+    original_stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            start = time.perf_counter()
+            executor.execute_tasks([task], extra_args=[])
+            return time.perf_counter() - start
+        finally:
+            sys.stdout = original_stdout
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    os.environ["VTR_SKIP_SUMMARY"] = "1"
+
+    with tempfile.TemporaryDirectory() as path:
+        os.environ["VTR_STATE_DIR"] = os.path.join(path, "state")
+        write_tasks(path, count, megabytes)
+
+        print(f"{count} tasks writing {megabytes} MB each")
+        print(f"{'engine':>8} {'wall (s)':>10} {'MB/s':>10}")
+        for engine in ("threads", "asyncio"):
+            elapsed = run(path, engine, count)
+            print(f"{engine:>8} {elapsed:>10.3f} {count * megabytes / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the throughput of scanning task output with problem matchers.
+
+Scans a compiler log made of ordinary build lines with the odd warning,
+and reports how many MB/s are split into lines and scanned, with and
+without the predefined problem matchers.
+
+Usage, from the root of the repository: python -m benchmarks.problems [MB]
+"""
+
+import sys
+import time
+from typing import Optional
+from unittest import mock
+
+from vscode_task_runner import problems
+from vscode_task_runner.models.problem_matcher import PREDEFINED_PROBLEM_MATCHERS
+from vscode_task_runner.output import CHUNK_SIZE, LineBuffer
+from vscode_task_runner.problems import Problem, ProblemMatchers
+
+LINES = [
+    "[ 42%] Building CXX object src/CMakeFiles/app.dir/some/long/path/file.cpp.o",
+    "/usr/bin/c++ -O2 -g -Isrc -Iinclude -c src/some/long/path/file.cpp",
+] * 50 + ["src/some/long/path/file.cpp:12:7: warning: unused variable 'x'"]
+"""
+Lines of the log, repeated as often as needed.
+"""
+
+
+def run(data: bytes, matchers: Optional[ProblemMatchers]) -> tuple[float, int]:
+    """
+    Scan the log once, returning the wall time and the number of problems.
+    """
+    found: list[Problem] = []
+    lines = LineBuffer("", matchers)
+
+    # collect the problems instead of reporting them
+    with mock.patch.object(problems, "report", found.append):
+        start = time.perf_counter()
+        for offset in range(0, len(data), CHUNK_SIZE):
+            lines.feed(data[offset : offset + CHUNK_SIZE])
+        lines.flush()
+        return time.perf_counter() - start, len(found)
+
+
+def main() -> None:
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    chunk = ("\n".join(LINES) + "\n").encode()
+    data = chunk * (megabytes * 1024 * 1024 // len(chunk))
+
+    print(f"Scanning {len(data) / 1024 / 1024:.0f} MB of compiler output")
+    print(f"{'matchers':>40} {'wall (s)':>10} {'MB/s':>10} {'problems':>10}")
+    for names in ((), ("$gcc",), ("$tsc", "$gcc", "$eslint-stylish")):
+        matchers = ProblemMatchers(
+            [PREDEFINED_PROBLEM_MATCHERS[name] for name in names], "."
+        )
+        elapsed, found = run(data, matchers if names else None)
+        print(
+            f"{', '.join(names) or 'none':>40} {elapsed:>10.3f} "
+            + f"{len(data) / 1024 / 1024 / elapsed:>10.1f} {found:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
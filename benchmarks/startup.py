@@ -0,0 +1,87 @@
+"""
+Benchmark loading a tasks file, with and without the cache of validated tasks.
+
+Writes a tasks file with N tasks, each depending on the one before it, and
+reports the median time to load it when it is decoded and validated, and when
+it is loaded from the cache.
+
+Usage, from the root of the repository: python -m benchmarks.startup [N ...]
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from vscode_task_runner import tasks_cache
+from vscode_task_runner.parser import load_tasks
+
+DEFAULT_COUNTS = [50, 2000]
+REPEATS = 20
+
+
+def write_tasks(path: str, count: int) -> None:
+    """
+    Write a tasks file with `count` tasks, each depending on the one before it.
+    """
+    tasks = [
+        {
+            "label": f"task{i}",
+            "type": "shell",
+            "command": "echo",
+            "args": [f"task{i}"],
+            "options": {"cwd": "${workspaceFolder}", "env": {"TASK": str(i)}},
+            "group": "build",
+            "problemMatcher": [],
+            "dependsOn": [f"task{i - 1}"] if i else [],
+        }
+        for i in range(count)
+    ]
+
+    os.makedirs(os.path.join(path, ".vscode"))
+    with open(os.path.join(path, ".vscode", "tasks.json"), "w") as fp:
+        json.dump({"version": "2.0.0", "tasks": tasks}, fp)
+
+
+def median_load(path: str, cached: bool) -> float:
+    """
+    Return the median time in seconds to load the tasks file.
+    """
+    times = []
+    for _ in range(REPEATS):
+        if not cached:
+            for entry in tasks_cache.tasks_cache_dir().iterdir():
+                entry.unlink()
+
+        start = time.perf_counter()
+        load_tasks(path)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        os.environ["VTR_STATE_DIR"] = state_dir
+
+        print(f"{'tasks':>6} {'validated (ms)':>15} {'cached (ms)':>12} {'speedup':>8}")
+        for count in counts:
+            with tempfile.TemporaryDirectory() as path:
+                write_tasks(path, count)
+
+                # write the cache, and warm up imports
+                load_tasks(path)
+
+                validated = median_load(path, cached=False)
+                cached = median_load(path, cached=True)
+                print(
+                    f"{count:>6} {validated * 1000:>15.2f} {cached * 1000:>12.2f} {validated / cached:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
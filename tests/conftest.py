@@ -1,12 +1,15 @@
+import json
 import os
 import pathlib
 import subprocess
+import sys
 from typing import Any, Generator
 
 import pytest
 from pytest_mock import MockerFixture
 
 import vscode_task_runner.constants
+import vscode_task_runner.history
 import vscode_task_runner.models.properties
 import vscode_task_runner.utils.shell
 import vscode_task_runner.variables.resolve
@@ -21,12 +24,23 @@ PLATFORM_SOURCES = (
     vscode_task_runner.vscode.terminal_task_system,
     vscode_task_runner.utils.shell,
     vscode_task_runner.models.properties,
+    vscode_task_runner.history,
 )
 """
 Sources where the platform key is used. Need to patch each one.
 """
 
 
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Keep state such as recorded task durations out of the user's home directory.
+    """
+    path = tmp_path / "state"
+    monkeypatch.setenv("VTR_STATE_DIR", str(path))
+    return path
+
+
 def _patch_platform(mocker: MockerFixture, platform: PlatformEnum) -> None:
     for source in PLATFORM_SOURCES:
         mocker.patch.object(source, "CURRENT_PLATFORM", platform)
@@ -147,3 +161,31 @@ def task_obj(path: str, label: str) -> Task:
     Given a working directory and task label, returns the Task object.
     """
     return tasks_obj(path).tasks_dict[label]
+
+
+def python_task(label: str, code: str, *args: str, **properties: Any) -> dict:
+    """
+    Returns a task that runs the given Python code, with the Python
+    executable running the tests.
+    """
+    return {
+        "label": label,
+        "type": "process",
+        "command": sys.executable,
+        "args": ["-c", code, *args],
+        **properties,
+    }
+
+
+def write_tasks(
+    path: pathlib.Path, tasks: list[dict], **properties: Any
+) -> pathlib.Path:
+    """
+    Write a tasks file with the given tasks, and any other top-level properties,
+    into the workspace at the given path, and return the path.
+    """
+    (path / ".vscode").mkdir(exist_ok=True)
+    (path / ".vscode" / "tasks.json").write_text(
+        json.dumps({"version": "2.0.0", **properties, "tasks": tasks})
+    )
+    return path
@@ -0,0 +1,86 @@
+import os
+import pathlib
+
+import pytest
+from pytest import CaptureFixture
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor
+
+
+def _write_tasks(path: pathlib.Path) -> None:
+    """
+    Write a tasks file with real processes that print output.
+    """
+
+    tasks = [
+        python_task("a", "import sys; print('a out'); print('a err', file=sys.stderr)"),
+        python_task("b", "print('b out 1'); print('b out 2')"),
+        # give the other task time to finish, so it is not cancelled
+        python_task("fail", "import time; time.sleep(0.5); raise SystemExit(3)"),
+        {"label": "All", "dependsOn": ["a", "b"]},
+        {"label": "Fail", "dependsOn": ["a", "fail"]},
+    ]
+
+    write_tasks(path, tasks)
+
+
+@pytest.fixture
+def engine_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Run tasks in parallel without creating a summary.
+    """
+    monkeypatch.setenv("VTR_JOBS", "4")
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+
+
+def _run(path: pathlib.Path, label: str, engine: str, capfd: CaptureFixture) -> tuple:
+    """
+    Run a task with the given engine, returning the exit code and sorted output.
+    """
+    os.environ["VTR_ENGINE"] = engine
+    # don't let durations recorded by one engine change the order for the other
+    os.environ["VTR_STATE_DIR"] = str(path / f"state-{engine}")
+    try:
+        returncode = executor.execute_tasks([task_obj(str(path), label)], extra_args=[])
+    finally:
+        del os.environ["VTR_ENGINE"]
+
+    captured = capfd.readouterr()
+    return (
+        returncode,
+        sorted(captured.out.splitlines()),
+        sorted(captured.err.splitlines()),
+    )
+
+
+def test_engines_identical_output(
+    tmp_path: pathlib.Path, engine_env: None, capfd: CaptureFixture
+) -> None:
+    """
+    Test that the asyncio engine produces the same output as the thread engine.
+    """
+    _write_tasks(tmp_path)
+
+    threads_result = _run(tmp_path, "All", "threads", capfd)
+    asyncio_result = _run(tmp_path, "All", "asyncio", capfd)
+
+    assert threads_result == asyncio_result
+    assert asyncio_result[0] == 0
+    assert any(line.endswith("b out 2") for line in asyncio_result[1])
+    assert any(line.endswith("a err") for line in asyncio_result[2])
+
+
+def test_engines_failure(
+    tmp_path: pathlib.Path, engine_env: None, capfd: CaptureFixture
+) -> None:
+    """
+    Test that the asyncio engine stops on a failure like the thread engine.
+    """
+    _write_tasks(tmp_path)
+
+    threads_result = _run(tmp_path, "Fail", "threads", capfd)
+    asyncio_result = _run(tmp_path, "Fail", "asyncio", capfd)
+
+    assert threads_result == asyncio_result
+    assert asyncio_result[0] == 3
@@ -0,0 +1,144 @@
+import os
+import pathlib
+import time
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import background, executor
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+from vscode_task_runner.models.problem_matcher import js_regex
+
+# writes its process ID, then says it is ready, then keeps running
+SERVER = (
+    "import os, pathlib, time; time.sleep(0.2); print('Starting', flush=True); "
+    + "pathlib.Path('server.pid').write_text(str(os.getpid())); "
+    + "print('Listening on 8080', flush=True); time.sleep(30)"
+)
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with a server running in the background,
+    and tests that need it to be ready.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+
+    matcher = {
+        "owner": "server",
+        "pattern": {"regexp": "^error: (.*)$", "message": 1},
+        "background": {
+            "activeBegin": True,
+            "beginsPattern": "^Starting",
+            "endsPattern": {"regexp": r"^Listening on (?<port>\d+)"},
+        },
+    }
+
+    tasks = [
+        python_task("server", SERVER, isBackground=True, problemMatcher=[matcher]),
+        python_task(
+            "untracked",
+            "import time; time.sleep(30)",
+            isBackground=True,
+            problemMatcher="$unknown",
+        ),
+        python_task(
+            "broken",
+            "raise SystemExit(4)",
+            isBackground=True,
+            problemMatcher=[matcher],
+        ),
+        python_task(
+            "e2e",
+            "import os, pathlib; os.kill(int(pathlib.Path('server.pid').read_text()), 0)",
+            dependsOn=["server"],
+        ),
+        python_task("after", "pass", dependsOn=["untracked"]),
+        python_task("never", "pass", dependsOn=["broken"]),
+        {
+            "label": "tsc",
+            "command": "tsc",
+            "isBackground": True,
+            "problemMatcher": {"base": "$tsc-watch", "owner": "mine"},
+        },
+    ]
+
+    return write_tasks(tmp_path, tasks)
+
+
+def test_js_regex() -> None:
+    """
+    Test JavaScript named groups are converted
+    """
+    match = js_regex(r"^(?<file>\S+):(?<line>\d+)$").match("a.py:3")
+
+    assert match is not None
+    assert match.group("file") == "a.py"
+    assert match.group("line") == "3"
+
+
+def test_ready_pattern(workspace: pathlib.Path) -> None:
+    """
+    Test the ready pattern comes from the endsPattern of a problem matcher
+    """
+    pattern = background.ready_pattern(task_obj(str(workspace), "server"))
+    assert pattern is not None
+    assert pattern.search("Listening on 8080")
+
+    assert background.ready_pattern(task_obj(str(workspace), "untracked")) is None
+
+    # predefined problem matchers can be extended
+    tsc = task_obj(str(workspace), "tsc")
+    assert tsc.problem_matchers_use()[0].owner == "mine"
+    pattern = background.ready_pattern(tsc)
+    assert pattern is not None
+    assert pattern.search("[12:00:00 PM] Found 0 errors. Watching for file changes.")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="process groups are POSIX only")
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_background_ready(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test dependents start once a background task is ready,
+    and the background task is stopped at the end of the run
+    """
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    task = task_obj(str(workspace), "e2e")
+    server = task.depends_on[0]
+
+    start = time.monotonic()
+    assert executor.execute_tasks([task], extra_args=[]) == 0
+    assert time.monotonic() - start < 10
+
+    assert task._execution_state == TaskExecutionStateEnum.completed
+    assert server._execution_state == TaskExecutionStateEnum.completed
+
+    # the server was stopped
+    with pytest.raises(ProcessLookupError):
+        os.kill(int((workspace / "server.pid").read_text()), 0)
+
+
+def test_background_untracked(workspace: pathlib.Path) -> None:
+    """
+    Test dependents start right away without a pattern to tell when it is ready
+    """
+    task = task_obj(str(workspace), "after")
+
+    start = time.monotonic()
+    assert executor.execute_tasks([task], extra_args=[]) == 0
+    assert time.monotonic() - start < 10
+
+
+def test_background_exits(workspace: pathlib.Path) -> None:
+    """
+    Test a background task that fails before it is ready stops the run
+    """
+    task = task_obj(str(workspace), "never")
+
+    assert executor.execute_tasks([task], extra_args=[]) == 4
+    assert task.depends_on[0]._execution_state == TaskExecutionStateEnum.failed
+    assert task._execution_state == TaskExecutionStateEnum.pending
@@ -0,0 +1,139 @@
+import os
+import pathlib
+
+import pytest
+from pytest import CaptureFixture
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import cache, executor
+from vscode_task_runner.models.task import Task
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with a task that counts how many times it ran,
+    and creates an output file. Tasks run in the workspace, which is
+    also the current directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    code = (
+        "import pathlib; "
+        "count = pathlib.Path('count.txt'); "
+        "count.write_text(count.read_text() + 'x' if count.exists() else 'x'); "
+        "pathlib.Path('out').mkdir(exist_ok=True); "
+        "pathlib.Path('out', 'result.txt').write_text(pathlib.Path('input.txt').read_text().upper()); "
+        "print('built')"
+    )
+
+    tasks = [
+        python_task(
+            "build",
+            code,
+            options={"cwd": str(tmp_path)},
+            vtr={
+                "inputs": ["input.txt"],
+                "outputs": ["out/*.txt"],
+                "inputEnv": ["BUILD_MODE"],
+            },
+        ),
+        python_task("uncached", "print('hi')", options={"cwd": str(tmp_path)}),
+    ]
+
+    write_tasks(tmp_path, tasks)
+    (tmp_path / "input.txt").write_text("hello")
+    return tmp_path
+
+
+def _task(path: pathlib.Path, label: str = "build") -> Task:
+    task = task_obj(str(path), label)
+    task.resolve_variables()
+    return task
+
+
+def test_is_cacheable(workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that only tasks declaring inputs are cached, unless disabled.
+    """
+
+    assert cache.is_cacheable(_task(workspace))
+    assert not cache.is_cacheable(_task(workspace, "uncached"))
+
+    monkeypatch.setenv("VTR_NO_CACHE", "1")
+    assert not cache.is_cacheable(_task(workspace))
+
+
+def test_cache_key(workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the cache key changes with the command, inputs, and input environment.
+    """
+    task = _task(workspace)
+    key = cache.cache_key(task, ["build"])
+
+    assert cache.cache_key(task, ["build"]) == key
+    assert cache.cache_key(task, ["build", "--release"]) != key
+
+    # unrelated environment variables are ignored
+    monkeypatch.setenv("SOMETHING_ELSE", "1")
+    assert cache.cache_key(_task(workspace), ["build"]) == key
+
+    monkeypatch.setenv("BUILD_MODE", "release")
+    assert cache.cache_key(_task(workspace), ["build"]) != key
+    monkeypatch.delenv("BUILD_MODE")
+
+    (workspace / "input.txt").write_text("changed")
+    assert cache.cache_key(_task(workspace), ["build"]) != key
+
+
+def test_save_load(workspace: pathlib.Path) -> None:
+    """
+    Test that a saved result can be loaded, and its outputs restored.
+    """
+    task = _task(workspace)
+    (workspace / "out").mkdir()
+    (workspace / "out" / "result.txt").write_text("HELLO")
+
+    assert cache.load("key") is None
+
+    cache.save("key", task, stdout=b"out\n", stderr=b"err\n")
+    result = cache.load("key")
+    assert result is not None
+    assert result.stdout == b"out\n"
+    assert result.stderr == b"err\n"
+
+    (workspace / "out" / "result.txt").unlink()
+    cache.restore_outputs(task, result)
+    assert (workspace / "out" / "result.txt").read_text() == "HELLO"
+
+
+def test_execute_tasks_cached(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, capfd: CaptureFixture
+) -> None:
+    """
+    Test that a task with a cached result is not executed again,
+    and its output is replayed.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+
+    for engine in ("threads", "asyncio"):
+        monkeypatch.setenv("VTR_ENGINE", engine)
+        monkeypatch.setenv("VTR_STATE_DIR", str(workspace / f"state-{engine}"))
+        (workspace / "count.txt").unlink(missing_ok=True)
+        capfd.readouterr()
+
+        assert executor.execute_tasks([task_obj(str(workspace), "build")], []) == 0
+        assert executor.execute_tasks([task_obj(str(workspace), "build")], []) == 0
+        assert (workspace / "count.txt").read_text() == "x"
+        assert capfd.readouterr().out.splitlines().count("built") == 2
+
+        # outputs are restored
+        os.remove(workspace / "out" / "result.txt")
+        assert executor.execute_tasks([task_obj(str(workspace), "build")], []) == 0
+        assert (workspace / "out" / "result.txt").read_text() == "HELLO"
+        assert (workspace / "count.txt").read_text() == "x"
+
+        # changing an input runs the task again
+        (workspace / "input.txt").write_text("changed")
+        assert executor.execute_tasks([task_obj(str(workspace), "build")], []) == 0
+        assert (workspace / "count.txt").read_text() == "xx"
+        (workspace / "input.txt").write_text("hello")
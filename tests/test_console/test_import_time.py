@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 0.75
+"""
+Maximum number of seconds importing the console application may take.
+This is generous, to allow for slow CI runners.
+"""
+
+LAZY_MODULES = ("questionary", "prompt_toolkit", "shellingham")
+"""
+Modules that are slow to import, and only needed for some runs.
+"""
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter, and return the cumulative
+    import time in microseconds of every module it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_import_time() -> None:
+    """
+    Test importing the console application stays within budget.
+    """
+    times = _import_times("vscode_task_runner.console")
+
+    assert times["vscode_task_runner.console"] / 1_000_000 < IMPORT_TIME_BUDGET
+
+
+def test_lazy_imports() -> None:
+    """
+    Test slow modules are only imported when they are needed.
+    """
+    times = _import_times("vscode_task_runner.console")
+
+    for module in LAZY_MODULES:
+        assert module not in times
+
+
+def test_client_imports() -> None:
+    """
+    Test the entry point only imports the standard library.
+    """
+    times = _import_times("vscode_task_runner.client")
+
+    assert not any(name.startswith("pydantic") for name in times)
@@ -1,4 +1,5 @@
 import os
+import pathlib
 
 import pytest
 
@@ -84,6 +85,19 @@ def test_show_complete(sys_argv: list[str]) -> None:
         ["--invalid-option", "Test1"],  # invalid option
         ["Test1", "InvalidTask"],  # invalid task label
         ["--input=Key1", "Test1"],  # invalid input format
+        ["--jobs=0", "Test1"],  # jobs must be positive
+        ["--jobs=", "Test1"],  # jobs must be provided
+        ["-jfour", "Test1"],  # jobs must be an integer
+        ["--engine=trio", "Test1"],  # unsupported engine
+        ["--timeout=0", "Test1"],  # timeout must be positive
+        ["--timeout=soon", "Test1"],  # timeout must be a number
+        ["--retries=-1", "Test1"],  # retries must not be negative
+        ["--trace=", "Test1"],  # trace file must be provided
+        ["--metrics-file=", "Test1"],  # metrics file must be provided
+        ["--metrics-port=0", "Test1"],  # metrics port must be a valid port
+        ["--metrics-port=http", "Test1"],  # metrics port must be a number
+        ["--plan=", "Test1"],  # plan file must be provided
+        ["--exec-plan=", "Test1"],  # plan file must be provided
     ),
 )
 def test_parse_args_error(sys_argv: list[str]) -> None:
@@ -127,3 +141,125 @@ def test_parse_args_env_vars() -> None:
 
         # Wipe environment variables after the test
         del os.environ[var]
+
+
+@pytest.mark.parametrize(
+    "sys_argv, expected",
+    (
+        (["--jobs=4", "Test1"], "4"),
+        (["-j2", "Test1"], "2"),
+    ),
+)
+def test_parse_args_jobs(sys_argv: list[str], expected: str) -> None:
+    """
+    Test the jobs option turns into an environment variable
+    """
+    console.parse_args(sys_argv, ["Test1"])
+
+    assert os.environ["VTR_JOBS"] == expected
+    del os.environ["VTR_JOBS"]
+
+
+def test_parse_args_engine() -> None:
+    """
+    Test the engine option turns into an environment variable
+    """
+    console.parse_args(["--engine=asyncio", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_ENGINE"] == "asyncio"
+    del os.environ["VTR_ENGINE"]
+
+
+def test_parse_args_timeout() -> None:
+    """
+    Test the timeout option turns into an environment variable
+    """
+    console.parse_args(["--timeout=2.5", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_TIMEOUT"] == "2.5"
+    del os.environ["VTR_TIMEOUT"]
+
+
+def test_parse_args_retries() -> None:
+    """
+    Test the retries option turns into an environment variable
+    """
+    console.parse_args(["--retries=3", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_RETRIES"] == "3"
+    del os.environ["VTR_RETRIES"]
+
+
+def test_parse_args_jobserver() -> None:
+    """
+    Test the jobserver option turns into an environment variable
+    """
+    console.parse_args(["--jobserver", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_JOBSERVER"] == "1"
+    del os.environ["VTR_JOBSERVER"]
+
+
+def test_parse_args_trace(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the trace option turns into an environment variable
+    """
+    # removed after the test, even if it fails, so no other test writes a trace
+    monkeypatch.setitem(os.environ, "VTR_TRACE", "")
+    trace_file = str(tmp_path / "out.json")
+    console.parse_args([f"--trace={trace_file}", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_TRACE"] == trace_file
+
+
+def test_parse_args_metrics() -> None:
+    """
+    Test the metrics options turn into environment variables
+    """
+    console.parse_args(
+        ["--metrics-file=vtr.prom", "--metrics-port=9464", "Test1"], ["Test1"]
+    )
+
+    assert os.environ["VTR_METRICS_FILE"] == "vtr.prom"
+    assert os.environ["VTR_METRICS_PORT"] == "9464"
+    del os.environ["VTR_METRICS_FILE"]
+    del os.environ["VTR_METRICS_PORT"]
+
+
+def test_parse_args_plan() -> None:
+    """
+    Test the plan options turn into environment variables
+    """
+    console.parse_args(["--plan=plan.json", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_PLAN"] == "plan.json"
+    del os.environ["VTR_PLAN"]
+
+    # a plan selects the tasks, so no task labels are needed
+    result = console.parse_args(["--exec-plan=plan.json"], [], require_labels=False)
+
+    assert result.task_labels == []
+    assert os.environ["VTR_EXEC_PLAN"] == "plan.json"
+    del os.environ["VTR_EXEC_PLAN"]
+
+
+def test_parse_args_no_cache() -> None:
+    """
+    Test the no cache option turns into an environment variable
+    """
+    console.parse_args(["--no-cache", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_NO_CACHE"] == "1"
+    del os.environ["VTR_NO_CACHE"]
+
+
+def test_parse_args_watch() -> None:
+    """
+    Test the watch option turns into an environment variable
+    """
+    console.parse_args(["--watch", "Test1"], ["Test1"])
+
+    assert os.environ["VTR_WATCH"] == "1"
+    del os.environ["VTR_WATCH"]
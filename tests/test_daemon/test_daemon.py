@@ -0,0 +1,202 @@
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import time
+from typing import Generator
+
+import pytest
+
+from tests.conftest import python_task, write_tasks
+from vscode_task_runner import client, console
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Unix sockets only")
+
+CLIENT = [
+    sys.executable,
+    "-c",
+    "import sys; from vscode_task_runner.client import main; code = main(); "
+    + "print('pydantic' in sys.modules, file=sys.stderr); sys.exit(code)",
+]
+
+
+def _write_tasks(path: pathlib.Path, message: str) -> None:
+    """
+    Write a tasks file with a task that prints a message, and one that fails.
+    """
+    tasks = [
+        python_task("hello", f"import os; print('{message}', os.getcwd())"),
+        python_task("fail", "raise SystemExit(3)"),
+    ]
+    write_tasks(path, tasks)
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Workspace with a tasks file, without a CI/CD summary.
+    """
+    monkeypatch.setenv("VTR_DAEMON_SOCKET", str(tmp_path / "vtr.sock"))
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    monkeypatch.delenv("TF_BUILD", raising=False)
+    # the client runs in the workspace, so make sure the package can be found
+    monkeypatch.setenv("PYTHONPATH", str(pathlib.Path(__file__).parents[2]))
+
+    path = tmp_path / "workspace"
+    path.mkdir()
+    _write_tasks(path, "hello")
+    return path
+
+
+@pytest.fixture
+def daemon(workspace: pathlib.Path) -> Generator[None, None, None]:
+    """
+    Run the daemon in the background.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "vscode_task_runner", "--daemon"],
+        stdout=subprocess.DEVNULL,
+    )
+
+    for _ in range(100):
+        if client.socket_path().exists():
+            break
+        time.sleep(0.05)
+
+    try:
+        yield
+    finally:
+        proc.terminate()
+        assert proc.wait(timeout=10) == 0
+        assert not client.socket_path().exists()
+
+
+def _run_client(path: pathlib.Path, *args: str) -> subprocess.CompletedProcess:
+    """
+    Run the client in the given directory.
+    """
+    return subprocess.run(
+        [*CLIENT, *args], cwd=path, capture_output=True, text=True, timeout=30
+    )
+
+
+def test_daemon(workspace: pathlib.Path, daemon: None) -> None:
+    """
+    Test that tasks are run by the daemon, in the working directory of the client.
+    """
+    result = _run_client(workspace, "hello")
+
+    assert result.returncode == 0
+    assert f"hello {workspace}" in result.stdout.splitlines()
+    # the client never imported the rest of the package
+    assert result.stderr.strip() == "False"
+
+    # exit codes are passed back
+    assert _run_client(workspace, "fail").returncode == 3
+
+
+def test_daemon_reload(workspace: pathlib.Path, daemon: None) -> None:
+    """
+    Test that changes to the tasks file are picked up.
+    """
+    assert "hello" in _run_client(workspace, "hello").stdout
+
+    _write_tasks(workspace, "changed")
+    result = _run_client(workspace, "hello")
+    assert f"changed {workspace}" in result.stdout.splitlines()
+
+
+def test_no_daemon(workspace: pathlib.Path) -> None:
+    """
+    Test that the tasks are run by the client itself if no daemon is running.
+    """
+    result = _run_client(workspace, "hello")
+
+    assert result.returncode == 0
+    assert f"hello {workspace}" in result.stdout.splitlines()
+    assert result.stderr.strip() == "True"
+
+
+def test_socket_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the socket is in a per-user directory when there is no runtime directory.
+    """
+    monkeypatch.delenv("VTR_DAEMON_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert client.socket_path() == pathlib.Path(
+        "/run/user/1000/vscode-task-runner.sock"
+    )
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert client.socket_path().parent.name == f"vscode-task-runner-{os.getuid()}"
+
+
+def test_is_private_dir(tmp_path: pathlib.Path) -> None:
+    """
+    Test only directories that no other user can write to are private.
+    """
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    assert client.is_private_dir(private)
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    assert not client.is_private_dir(shared)
+
+    assert not client.is_private_dir(tmp_path / "missing")
+
+
+def test_untrusted_daemon(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test nothing is sent to a socket in a directory other users can write to.
+    """
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    path = shared / "vtr.sock"
+    monkeypatch.setenv("VTR_DAEMON_SOCKET", str(path))
+    monkeypatch.delenv("VTR_NO_DAEMON", raising=False)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+
+        assert client.run_with_daemon(["hello"]) is None
+
+        conn, _ = server.accept()
+        with conn:
+            # the client hung up without sending anything
+            assert conn.recv(1024) == b""
+
+
+def test_leading_options() -> None:
+    """
+    Test only the options before the first task label are found.
+    """
+    assert client.leading_options(["--daemon"]) == ["--daemon"]
+    assert client.leading_options(["-j2", "--list", "build", "--daemon"]) == [
+        "-j2",
+        "--list",
+    ]
+    assert client.leading_options(["--", "--daemon"]) == []
+
+
+def test_daemon_task_argument(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the daemon option is passed on to a task after its label,
+    rather than starting a daemon.
+    """
+    code = "import sys; open('args.txt', 'w').write(sys.argv[1])"
+    write_tasks(workspace, [python_task("echo", code)])
+    monkeypatch.chdir(workspace)
+    monkeypatch.setattr(sys, "argv", ["vtr", "echo", "--daemon"])
+
+    assert console.run() == 0
+    assert (workspace / "args.txt").read_text() == "--daemon"
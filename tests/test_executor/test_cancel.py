@@ -0,0 +1,93 @@
+import os
+import pathlib
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor, processes
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with a task that fails quickly, and tasks that take a long time.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+
+    tasks = [
+        python_task("fail", "import time; time.sleep(0.5); raise SystemExit(3)"),
+        python_task("slow", "import time; time.sleep(30)"),
+        python_task(
+            "stubborn",
+            "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+            + "print('ready', flush=True); time.sleep(30)",
+        ),
+        python_task("queued", "print('should not run')"),
+        {"label": "Fail", "dependsOn": ["fail", "slow", "queued"]},
+        {"label": "Stubborn", "dependsOn": ["fail", "stubborn"]},
+    ]
+
+    return write_tasks(tmp_path, tasks)
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_cancel_siblings(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test that a failing task cancels the tasks running alongside it,
+    and that tasks waiting for a slot are not started.
+    """
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.setenv("VTR_JOBS", "2")
+
+    task = task_obj(str(workspace), "Fail")
+    tasks = {t.label: t for t in task.depends_on}
+
+    start = time.monotonic()
+    assert executor.execute_tasks([task], extra_args=[]) == 3
+    assert time.monotonic() - start < 10
+
+    assert tasks["fail"]._execution_state == TaskExecutionStateEnum.failed
+    assert tasks["slow"]._execution_state == TaskExecutionStateEnum.cancelled
+    assert tasks["queued"]._execution_state == TaskExecutionStateEnum.pending
+
+
+@pytest.mark.skipif(os.name == "nt", reason="SIGTERM cannot be ignored on Windows")
+def test_cancel_kill(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    """
+    Test that a task that ignores SIGTERM is killed after the grace period.
+    """
+    mocker.patch.object(processes, "TERMINATE_GRACE_SECONDS", 0.5)
+    monkeypatch.setenv("VTR_JOBS", "2")
+
+    task = task_obj(str(workspace), "Stubborn")
+    tasks = {t.label: t for t in task.depends_on}
+
+    start = time.monotonic()
+    assert executor.execute_tasks([task], extra_args=[]) == 3
+    assert time.monotonic() - start < 10
+
+    assert tasks["stubborn"]._execution_state == TaskExecutionStateEnum.cancelled
+
+
+def test_continue_on_error(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    """
+    Test that nothing is cancelled when continuing on error.
+    """
+    monkeypatch.setenv("VTR_CONTINUE_ON_ERROR", "1")
+    cancel = mocker.spy(processes.RunningProcesses, "cancel")
+
+    task = task_obj(str(workspace), "Fail")
+    # don't actually wait for the slow task
+    task.depends_on[1].args = ["-c", "pass"]
+
+    assert executor.execute_tasks([task], extra_args=[]) == 1
+    cancel.assert_not_called()
@@ -0,0 +1,103 @@
+import os
+import pathlib
+import sys
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import console, executor
+from vscode_task_runner.exceptions import WorkingDirectoryNotFound
+from vscode_task_runner.graph import build_task_graph
+
+
+def test_compile_spec(shutil_which_patch: None) -> None:
+    """
+    Test everything needed to execute a task is compiled into its spec
+    """
+    spec = executor.compile_spec(task_obj(__file__, "build"), ["-j4"])
+
+    assert spec.label == "build"
+    assert spec.argv == ("make", "all", "-j4")
+    assert spec.argv_use() == ["make", "all", "-j4"]
+    # the working directory is only checked once the task starts
+    assert spec.cwd == os.path.normpath("/does/not/exist/yet")
+    with pytest.raises(WorkingDirectoryNotFound):
+        spec.cwd_use()
+
+    # only the variables the task sets itself are kept
+    assert spec.env == (("CC", "clang"),)
+    assert spec.env_use()["CC"] == "clang"
+    assert spec.env_use()["PATH"] == os.environ["PATH"]
+
+    assert (spec.virtual, spec.background) == (False, False)
+    assert (spec.timeout, spec.attempts, spec.retry_delay) == (60, 3, 5)
+
+    # specs can be used as keys
+    assert hash(spec) == hash(
+        executor.compile_spec(task_obj(__file__, "build"), ["-j4"])
+    )
+
+
+def test_compile_specs(shutil_which_patch: None) -> None:
+    """
+    Test extra arguments are only given to the last node of the graph
+    """
+    nodes = build_task_graph([task_obj(__file__, "all")])
+    specs = {
+        spec.label: spec for spec in executor.compile_specs(nodes, ["-x"]).values()
+    }
+
+    assert specs["build"].argv == ("make", "all")
+    assert specs["test"].argv == ("bash", "-c", "pytest")
+    assert specs["all"].argv == ()
+    assert specs["all"].virtual
+
+
+def test_shell_not_changed(shutil_which_patch: None) -> None:
+    """
+    Test compiling a shell task does not change the shell configuration,
+    which is shared between tasks
+    """
+    task = task_obj(__file__, "test")
+    executor.task_subprocess_command(task)
+
+    assert task._tasks.options is not None
+    shell = task._tasks.options.shell
+    assert shell is not None
+    assert shell.quoting is None
+    assert task.shell_use().quoting is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a shell script")
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_executable_created_by_dependency(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test the executable of a task is only resolved once the task starts,
+    so it can be created by a task it depends on
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+
+    script = "#!/bin/sh\necho used > used.txt\n"
+    tasks = [
+        python_task(
+            "setup",
+            "import os, sys; open('tool.sh', 'w').write(sys.argv[1]); "
+            + "os.chmod('tool.sh', 0o755)",
+            script,
+        ),
+        {
+            "label": "use",
+            "type": "process",
+            "command": "./tool.sh",
+            "dependsOn": ["setup"],
+        },
+    ]
+    write_tasks(tmp_path, tasks)
+
+    monkeypatch.setattr(sys, "argv", ["vtr", "use"])
+    assert console.run() == 0
+    assert (tmp_path / "used.txt").read_text() == "used\n"
@@ -102,3 +102,24 @@ def test_execute_tasks_continue_on_errror(
     ]
 
     del os.environ["VTR_CONTINUE_ON_ERROR"]
+
+
+def test_execute_tasks_shared(
+    subprocess_run_mock: None, shutil_which_patch: None
+) -> None:
+    """
+    Test that a task that is depended on more than once is only executed once.
+    """
+    t4 = task_obj(__file__, "Task4")
+
+    executor.execute_tasks([t4], extra_args=[])
+
+    assert len(subprocess.Popen.call_args_list) == 2  # type: ignore
+    assert subprocess.Popen.call_args_list[0].kwargs.get("args") == [  # type: ignore
+        "echo",
+        "I come first",
+    ]
+    assert subprocess.Popen.call_args_list[1].kwargs.get("args") == [  # type: ignore
+        "echo",
+        "hello world",
+    ]
@@ -0,0 +1,33 @@
+import pytest
+
+from vscode_task_runner import executor
+from vscode_task_runner.exceptions import UnsupportedEngine
+from vscode_task_runner.models.enums import ExecutionEngineEnum
+
+
+def test_execution_engine_default() -> None:
+    """
+    Test the execution engine defaults to threads
+    """
+    assert executor.execution_engine() == ExecutionEngineEnum.threads
+
+
+@pytest.mark.parametrize(
+    "environment_variable", [("VTR_ENGINE", "asyncio")], indirect=True
+)
+def test_execution_engine_env(environment_variable: None) -> None:
+    """
+    Test the execution engine can be set with an environment variable
+    """
+    assert executor.execution_engine() == ExecutionEngineEnum.asyncio
+
+
+@pytest.mark.parametrize(
+    "environment_variable", [("VTR_ENGINE", "trio")], indirect=True
+)
+def test_execution_engine_invalid(environment_variable: None) -> None:
+    """
+    Test an unsupported execution engine raises an error
+    """
+    with pytest.raises(UnsupportedEngine):
+        executor.execution_engine()
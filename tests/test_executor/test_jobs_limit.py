@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from vscode_task_runner import executor
+from vscode_task_runner.exceptions import InvalidJobs
+
+
+def test_jobs_limit_default() -> None:
+    """
+    Test the number of jobs defaults to the number of CPUs
+    """
+    assert "VTR_JOBS" not in os.environ
+    assert executor.jobs_limit() == (os.cpu_count() or 1)
+
+
+@pytest.mark.parametrize("environment_variable", [("VTR_JOBS", "3")], indirect=True)
+def test_jobs_limit_env(environment_variable: None) -> None:
+    """
+    Test the number of jobs can be set with an environment variable
+    """
+    assert executor.jobs_limit() == 3
+
+
+@pytest.mark.parametrize(
+    "environment_variable",
+    [("VTR_JOBS", "0"), ("VTR_JOBS", "-1"), ("VTR_JOBS", "many")],
+    indirect=True,
+)
+def test_jobs_limit_invalid(environment_variable: None) -> None:
+    """
+    Test an invalid number of jobs raises an error
+    """
+    with pytest.raises(InvalidJobs):
+        executor.jobs_limit()
@@ -0,0 +1,123 @@
+import os
+import pathlib
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor
+from vscode_task_runner.exceptions import InvalidRetries
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+
+# fails until it has been executed the given number of times
+FLAKY = (
+    "import pathlib, sys; path = pathlib.Path('attempts'); "
+    + "attempts = int(path.read_text()) + 1 if path.exists() else 1; "
+    + "path.write_text(str(attempts)); "
+    + "sys.exit(0 if attempts >= int(sys.argv[1]) else 2)"
+)
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with tasks that fail a few times before succeeding.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+
+    tasks = [
+        python_task("flaky", FLAKY, "3", vtr={"retries": 2, "retryDelay": 0}),
+        python_task("broken", FLAKY, "5", vtr={"retries": 1, "retryDelay": 0}),
+        python_task("once", FLAKY, "2"),
+    ]
+
+    return write_tasks(tmp_path, tasks)
+
+
+def test_retries_limit_default() -> None:
+    """
+    Test tasks are not retried by default
+    """
+    assert "VTR_RETRIES" not in os.environ
+    assert executor.retries_limit() == 0
+
+
+@pytest.mark.parametrize(
+    "environment_variable",
+    [("VTR_RETRIES", "-1"), ("VTR_RETRIES", "twice")],
+    indirect=True,
+)
+def test_retries_limit_invalid(environment_variable: None) -> None:
+    """
+    Test an invalid number of retries raises an error
+    """
+    with pytest.raises(InvalidRetries):
+        executor.retries_limit()
+
+
+def test_task_attempts(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the retries of a task take priority over the retries for all tasks
+    """
+    monkeypatch.setenv("VTR_RETRIES", "4")
+
+    assert executor.task_attempts(task_obj(str(workspace), "flaky")) == 3
+    assert executor.task_attempts(task_obj(str(workspace), "once")) == 5
+
+
+def test_retry_delay(workspace: pathlib.Path) -> None:
+    """
+    Test the delay doubles with every retry
+    """
+    spec = executor.compile_spec(task_obj(str(workspace), "once"), [])
+
+    assert [executor.retry_delay(spec, attempt) for attempt in (2, 3, 4)] == [
+        1,
+        2,
+        4,
+    ]
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_retries(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test a flaky task succeeds after being retried
+    """
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    task = task_obj(str(workspace), "flaky")
+
+    assert executor.execute_tasks([task], extra_args=[]) == 0
+    assert task._execution_state == TaskExecutionStateEnum.completed
+    assert task._execution_attempts == 3
+
+
+def test_retries_exhausted(workspace: pathlib.Path) -> None:
+    """
+    Test a task fails once it has run out of retries
+    """
+    task = task_obj(str(workspace), "broken")
+
+    assert executor.execute_tasks([task], extra_args=[]) == 2
+    assert task._execution_state == TaskExecutionStateEnum.failed
+    assert task._execution_attempts == 2
+
+
+def test_retries_global(
+    workspace: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capfd: pytest.CaptureFixture,
+) -> None:
+    """
+    Test tasks are retried with the number of retries for all tasks
+    """
+    monkeypatch.setenv("VTR_RETRIES", "1")
+    task = task_obj(str(workspace), "once")
+    task.vtr.retry_delay = 0
+
+    assert executor.execute_tasks([task], extra_args=[]) == 0
+    assert task._execution_attempts == 2
+    assert "(attempt 2/2)" in capfd.readouterr().out
@@ -0,0 +1,122 @@
+import os
+import pathlib
+import time
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor
+from vscode_task_runner.exceptions import InvalidTimeout
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+
+# starts a grandchild that outlives its parent unless the whole group is stopped
+GRANDCHILD = (
+    "import subprocess, sys, time; "
+    + "subprocess.Popen([sys.executable, '-c', "
+    + "'import pathlib, time; time.sleep(2); pathlib.Path(\"grandchild\").touch()']); "
+    + "time.sleep(30)"
+)
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with tasks that run for too long.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+
+    tasks = [
+        python_task("hang", GRANDCHILD, vtr={"timeout": 0.5}),
+        python_task("quick", "pass", vtr={"timeout": 10}),
+        python_task("slow", "import time; time.sleep(30)"),
+        {"label": "Both", "dependsOn": ["hang", "slow"]},
+    ]
+
+    return write_tasks(tmp_path, tasks)
+
+
+def test_timeout_limit_default() -> None:
+    """
+    Test there is no timeout by default
+    """
+    assert "VTR_TIMEOUT" not in os.environ
+    assert executor.timeout_limit() is None
+
+
+@pytest.mark.parametrize(
+    "environment_variable",
+    [("VTR_TIMEOUT", "0"), ("VTR_TIMEOUT", "-1"), ("VTR_TIMEOUT", "later")],
+    indirect=True,
+)
+def test_timeout_limit_invalid(environment_variable: None) -> None:
+    """
+    Test an invalid timeout raises an error
+    """
+    with pytest.raises(InvalidTimeout):
+        executor.timeout_limit()
+
+
+def test_task_timeout(workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the timeout of a task takes priority over the timeout for all tasks
+    """
+    monkeypatch.setenv("VTR_TIMEOUT", "60")
+
+    assert executor.task_timeout(task_obj(str(workspace), "hang")) == 0.5
+    assert executor.task_timeout(task_obj(str(workspace), "slow")) == 60
+
+
+@pytest.mark.skipif(os.name == "nt", reason="process groups are POSIX only")
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_timeout(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test that a task that runs for too long is stopped along with the processes
+    it started, and stops the tasks running alongside it.
+    """
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.setenv("VTR_JOBS", "2")
+
+    task = task_obj(str(workspace), "Both")
+    tasks = {t.label: t for t in task.depends_on}
+
+    start = time.monotonic()
+    assert executor.execute_tasks([task], extra_args=[]) == 124
+    assert time.monotonic() - start < 10
+
+    assert tasks["hang"]._execution_state == TaskExecutionStateEnum.timed_out
+    assert tasks["slow"]._execution_state == TaskExecutionStateEnum.cancelled
+
+    # the grandchild was stopped too
+    time.sleep(2.5)
+    assert not (workspace / "grandchild").exists()
+
+
+def test_timeout_not_reached(workspace: pathlib.Path) -> None:
+    """
+    Test that a task that finishes in time is not stopped
+    """
+    task = task_obj(str(workspace), "quick")
+
+    assert executor.execute_tasks([task], extra_args=[]) == 0
+    assert task._execution_state == TaskExecutionStateEnum.completed
+
+
+def test_timeout_continue_on_error(
+    workspace: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a timed out task fails the run, but not other tasks,
+    when continuing on error
+    """
+    monkeypatch.setenv("VTR_CONTINUE_ON_ERROR", "1")
+    monkeypatch.setenv("VTR_TIMEOUT", "1")
+
+    task = task_obj(str(workspace), "Both")
+    tasks = {t.label: t for t in task.depends_on}
+
+    assert executor.execute_tasks([task], extra_args=[]) == 1
+    assert tasks["hang"]._execution_state == TaskExecutionStateEnum.timed_out
+    assert tasks["slow"]._execution_state == TaskExecutionStateEnum.timed_out
@@ -0,0 +1,51 @@
+import pathlib
+
+import pytest
+
+from tests.conftest import task_obj
+from vscode_task_runner import graph
+from vscode_task_runner.exceptions import TasksFileInvalid
+
+
+def test_assign_priorities() -> None:
+    """
+    Test that priorities are the length of the longest remaining path.
+    """
+    task_main = task_obj(__file__, "All")
+
+    nodes = graph.build_task_graph([task_main])
+    graph.assign_priorities(nodes, {"recorded": 10.0, "long": 1000.0})
+    priorities = {n.task.label: n.priority for n in nodes}
+
+    default = graph.DEFAULT_TASK_DURATION
+    assert priorities["All"] == default
+    assert priorities["after-short"] == 2 * default
+    # declared durations take priority over recorded durations
+    assert priorities["short"] == 2 + 2 * default
+    assert priorities["long"] == 30 + default
+    # recorded durations are used when nothing is declared
+    assert priorities["recorded"] == 10 + default
+
+
+def test_task_duration_default() -> None:
+    """
+    Test the default duration of a task that has never been executed.
+    """
+    task = task_obj(__file__, "after-short")
+
+    assert graph.task_duration(task, {}) == graph.DEFAULT_TASK_DURATION
+    assert graph.task_duration(task, {"after-short": 5.0}) == 5.0
+
+
+def test_negative_duration(tmp_path: pathlib.Path) -> None:
+    """
+    Test that a negative duration is not valid.
+    """
+    vscode_dir = tmp_path / ".vscode"
+    vscode_dir.mkdir()
+    (vscode_dir / "tasks.json").write_text(
+        '{"version": "2.0.0", "tasks": [{"label": "a", "vtr": {"duration": -1}}]}'
+    )
+
+    with pytest.raises(TasksFileInvalid):
+        task_obj(str(tmp_path), "a")
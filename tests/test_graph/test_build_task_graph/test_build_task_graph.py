@@ -0,0 +1,60 @@
+import pprint
+
+from tests.conftest import task_obj
+from vscode_task_runner import graph
+
+
+def test_build_task_graph() -> None:
+    task_1_1 = task_obj(__file__, "Task_1_1")
+    task_1_2 = task_obj(__file__, "Task_1_2")
+
+    nodes = graph.build_task_graph([task_1_1, task_1_2])
+    pp_nodes = {n.task.label: [d.task.label for d in n.dependencies] for n in nodes}
+    pprint.pprint(pp_nodes)
+
+    # Tree looks like
+    # - Task_1_1
+    # -- Task_2_1
+    # --- Task_3_1
+    # --- Task_3_2
+    # -- Task_2_2
+    # --- Task_3_3
+    # - Task_1_2
+    # -- Task_2_3
+
+    # planned depth-first
+    assert [n.task.label for n in nodes] == [
+        "Task_3_1",
+        "Task_3_2",
+        "Task_2_1",
+        "Task_3_3",
+        "Task_2_2",
+        "Task_1_1",
+        "Task_2_3",
+        "Task_1_2",
+    ]
+
+    # leaves of the first top-level task can all start immediately
+    assert pp_nodes["Task_3_1"] == []
+    assert pp_nodes["Task_3_2"] == []
+    assert pp_nodes["Task_3_3"] == []
+
+    # parents only wait on their own children
+    assert pp_nodes["Task_2_1"] == ["Task_3_1", "Task_3_2"]
+    assert pp_nodes["Task_2_2"] == ["Task_3_3"]
+    assert pp_nodes["Task_1_1"] == ["Task_2_1", "Task_2_2"]
+
+    # top-level tasks are run in sequence
+    assert pp_nodes["Task_2_3"] == ["Task_1_1"]
+    assert pp_nodes["Task_1_2"] == ["Task_1_1", "Task_2_3"]
+
+
+def test_build_task_graph_dependents() -> None:
+    task_1_1 = task_obj(__file__, "Task_1_1")
+
+    nodes = graph.build_task_graph([task_1_1])
+    nodes_dict = {n.task.label: n for n in nodes}
+
+    assert [d.task.label for d in nodes_dict["Task_3_1"].dependents] == ["Task_2_1"]
+    assert [d.task.label for d in nodes_dict["Task_2_2"].dependents] == ["Task_1_1"]
+    assert nodes_dict["Task_1_1"].dependents == []
@@ -0,0 +1,41 @@
+import pprint
+
+from tests.conftest import task_obj
+from vscode_task_runner import graph
+
+
+def test_build_task_graph2() -> None:
+    task_main = task_obj(__file__, "All")
+
+    nodes = graph.build_task_graph([task_main])
+    pp_nodes = {n.task.label: [d.task.label for d in n.dependencies] for n in nodes}
+    pprint.pprint(pp_nodes)
+
+    # https://github.com/NathanVaughn/vscode-task-runner/pull/108
+
+    assert [n.task.label for n in nodes] == [
+        "Sequence 1",
+        "Sequence 2",
+        "Parallel 1",
+        "Parallel 2",
+        "Parallel 3",
+        "Sequence 3",
+        "All",
+    ]
+
+    # sequence children wait on the previous sibling
+    assert pp_nodes["Sequence 1"] == []
+    assert pp_nodes["Sequence 2"] == ["Sequence 1"]
+
+    # the entire subtree of a sequence child waits on the previous sibling
+    assert pp_nodes["Parallel 1"] == ["Sequence 2"]
+    assert pp_nodes["Parallel 2"] == ["Sequence 2"]
+    assert pp_nodes["Parallel 3"] == ["Sequence 2"]
+    assert pp_nodes["Sequence 3"] == [
+        "Sequence 2",
+        "Parallel 1",
+        "Parallel 2",
+        "Parallel 3",
+    ]
+
+    assert pp_nodes["All"] == ["Sequence 1", "Sequence 2", "Sequence 3"]
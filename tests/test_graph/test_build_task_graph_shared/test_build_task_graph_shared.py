@@ -0,0 +1,118 @@
+from unittest import mock
+
+import pytest
+
+from tests.conftest import task_obj
+from vscode_task_runner import graph, printer
+from vscode_task_runner.exceptions import TasksFileInvalid
+from vscode_task_runner.scheduler import Scheduler
+
+
+def test_build_task_graph_shared() -> None:
+    """
+    Test that a task reachable through more than one path is only planned once.
+    """
+    lint = task_obj(__file__, "lint")
+    test = task_obj(__file__, "test")
+
+    nodes = graph.build_task_graph([lint, test])
+    pp_nodes = {n.task.label: [d.task.label for d in n.dependencies] for n in nodes}
+
+    assert [n.task.label for n in nodes] == ["install", "lint", "codegen", "test"]
+
+    assert pp_nodes["install"] == []
+    assert pp_nodes["lint"] == ["install"]
+    # second top-level task waits on the first
+    assert pp_nodes["codegen"] == ["lint", "install"]
+    assert pp_nodes["test"] == ["lint", "install", "codegen"]
+
+    # dependents all wait on the single shared node
+    install = nodes[0]
+    assert [d.task.label for d in install.dependents] == ["lint", "codegen", "test"]
+
+
+def test_build_task_graph_shared_top_level() -> None:
+    """
+    Test that top-level tasks sharing a dependency only plan it once.
+    """
+    build = task_obj(__file__, "build")
+    test = task_obj(__file__, "test")
+
+    nodes = graph.build_task_graph([build, test])
+
+    assert [n.task.label for n in nodes] == ["install", "codegen", "build", "test"]
+
+
+def test_build_task_graph_shared_sequence() -> None:
+    """
+    Test that a task in a sequence waits on the task before it,
+    even if it was already planned through another path.
+    """
+    publish = task_obj(__file__, "publish")
+
+    nodes = graph.build_task_graph([publish])
+    pp_nodes = {n.task.label: [d.task.label for d in n.dependencies] for n in nodes}
+
+    assert pp_nodes["package"] == ["clean"]
+    # nodes still come after the nodes they wait on
+    assert [n.task.label for n in nodes] == [
+        "clean",
+        "package",
+        "docs",
+        "release",
+        "publish",
+    ]
+
+    by_label = {n.task.label: n for n in nodes}
+    scheduler = Scheduler(nodes, jobs=4)
+    assert [launch.node.task.label for launch in scheduler.start()] == ["clean"]
+
+    scheduler.finish([by_label["clean"]])
+    assert [launch.node.task.label for launch in scheduler.start()] == ["package"]
+
+
+def test_build_task_graph_shared_sequence_conflict() -> None:
+    """
+    Test that a task in a sequence that the task before it depends on
+    is run only once, before it, and that this is reported.
+    """
+    conflict = task_obj(__file__, "conflict")
+
+    with mock.patch.object(printer, "info") as info:
+        nodes = graph.build_task_graph([conflict])
+
+    assert [n.task.label for n in nodes] == ["package", "wrapper", "conflict"]
+    assert [d.task.label for d in nodes[0].dependencies] == []
+    assert "run before" in info.call_args.args[0]
+
+
+def test_build_task_graph_loop() -> None:
+    """
+    Test that a dependency loop is detected.
+    """
+    loop1 = task_obj(__file__, "loop1")
+
+    with pytest.raises(TasksFileInvalid, match="loop1 -> loop2 -> loop3 -> loop1"):
+        graph.build_task_graph([loop1])
+
+
+def test_affected_subgraph() -> None:
+    """
+    Test that only affected nodes and the nodes depending on them are selected,
+    without following the ordering between top-level tasks.
+    """
+    lint = task_obj(__file__, "lint")
+    test = task_obj(__file__, "test")
+
+    nodes = graph.build_task_graph([lint, test])
+    by_label = {n.task.label: n for n in nodes}
+
+    subgraph = graph.affected_subgraph(nodes, {by_label["codegen"]})
+    pp_nodes = {n.task.label: [d.task.label for d in n.dependencies] for n in subgraph}
+    assert pp_nodes == {"codegen": [], "test": ["codegen"]}
+
+    # nodes are copies, so the original graph is untouched
+    assert all(n not in nodes for n in subgraph)
+
+    subgraph = graph.affected_subgraph(nodes, {by_label["install"]})
+    assert [n.task.label for n in subgraph] == ["install", "lint", "codegen", "test"]
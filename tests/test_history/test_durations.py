@@ -0,0 +1,50 @@
+import os
+import pathlib
+
+import pytest
+
+from vscode_task_runner import history
+
+
+def test_durations_round_trip() -> None:
+    """
+    Test that durations are saved and merged with previous runs.
+    """
+    assert history.load_durations() == {}
+
+    history.save_durations({"build": 1.5, "test": 2.0})
+    history.save_durations({"test": 3.0})
+
+    assert history.load_durations() == {"build": 1.5, "test": 3.0}
+
+
+def test_durations_corrupt(state_dir: pathlib.Path) -> None:
+    """
+    Test that a corrupt durations file is ignored.
+    """
+    state_dir.mkdir(parents=True)
+    (state_dir / history.DURATIONS_FILE).write_text("not json")
+
+    assert history.load_durations() == {}
+
+
+def test_durations_unwritable(state_dir: pathlib.Path) -> None:
+    """
+    Test that failing to save durations is not an error.
+    """
+    state_dir.parent.mkdir(parents=True, exist_ok=True)
+    state_dir.write_text("a file where a directory should be")
+
+    history.save_durations({"build": 1.0})
+
+
+def test_state_dir_default(monkeypatch: pytest.MonkeyPatch, linux: None) -> None:
+    """
+    Test the default state directory is per-workspace under XDG_STATE_HOME.
+    """
+    monkeypatch.delenv("VTR_STATE_DIR")
+    monkeypatch.setenv("XDG_STATE_HOME", os.path.join(os.sep, "state"))
+
+    path = history.state_dir()
+    assert path.parent == pathlib.Path(os.sep, "state", "vscode-task-runner")
+    assert path == history.state_dir()
@@ -0,0 +1,86 @@
+import os
+import pathlib
+import time
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor, history
+
+
+def test_executions_round_trip() -> None:
+    """
+    Test that executions are only saved when asked to, all at once.
+    """
+    assert history.load_executions() == []
+
+    usage = history.ResourceUsage(user_time=1.5, system_time=0.25, max_rss=1024)
+    history.record_execution("build", ["make"], 10.0, 12.0, 0, usage)
+    history.record_execution("test", ["pytest"], 12.0, 13.0, 1, None)
+    assert history.load_executions() == []
+
+    history.save_executions()
+    history.record_execution("build", ["make", "-j2"], 20.0, 21.0, 0, None)
+    history.save_executions()
+
+    executions = history.load_executions()
+    assert [execution.label for execution in executions] == ["build", "test", "build"]
+    assert executions[0] == history.Execution(
+        label="build",
+        argv_hash=history.argv_hash(["make"]),
+        start_time=10.0,
+        end_time=12.0,
+        exit_code=0,
+        usage=usage,
+    )
+    assert executions[1].usage is None
+    assert executions[2].argv_hash != executions[0].argv_hash
+
+    assert len(history.load_executions("build")) == 2
+
+
+def test_executions_unwritable(state_dir: pathlib.Path) -> None:
+    """
+    Test that failing to save executions is not an error.
+    """
+    state_dir.parent.mkdir(parents=True, exist_ok=True)
+    state_dir.write_text("a file where a directory should be")
+
+    history.record_execution("build", ["make"], 10.0, 12.0, 0, None)
+    history.save_executions()
+
+    assert history.load_executions() == []
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_executions_recorded(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test every execution of a task is recorded, with the resources it used
+    where they are known.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+
+    # use some memory, so the peak is clearly from the task
+    code = "import sys; data = bytearray(64 * 1024 * 1024); sys.exit(3)"
+    write_tasks(
+        tmp_path, [python_task("build", code, vtr={"retries": 1, "retryDelay": 0})]
+    )
+
+    start = time.time()
+    assert executor.execute_tasks([task_obj(str(tmp_path), "build")], []) == 3
+
+    executions = history.load_executions("build")
+    assert len(executions) == 2
+    for execution in executions:
+        assert execution.exit_code == 3
+        assert start <= execution.start_time <= execution.end_time <= time.time()
+
+        if engine == "threads" and hasattr(os, "wait4"):
+            assert execution.usage is not None
+            assert execution.usage.max_rss > 64 * 1024 * 1024
+        else:
+            assert execution.usage is None
@@ -0,0 +1,179 @@
+import os
+import pathlib
+from typing import Generator
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor, jobserver
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="POSIX jobserver only")
+
+
+@pytest.fixture
+def job_server() -> Generator[jobserver.JobServer, None, None]:
+    """
+    Jobserver that lets 3 jobs run at once.
+    """
+    server = jobserver.create_jobserver(3)
+    try:
+        yield server
+    finally:
+        server.close()
+
+
+def test_tokens(job_server: jobserver.JobServer) -> None:
+    """
+    Test tokens are handed out until there are none left, including the implicit one
+    """
+    tokens = [job_server.try_acquire() for _ in range(3)]
+
+    assert tokens == [jobserver.IMPLICIT_TOKEN, b"+", b"+"]
+    assert job_server.try_acquire() is None
+
+    job_server.release(b"+")
+    assert job_server.try_acquire() == b"+"
+
+    job_server.release(jobserver.IMPLICIT_TOKEN)
+    assert job_server.try_acquire() == jobserver.IMPLICIT_TOKEN
+
+
+def test_tokens_without_reopening(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test tokens are taken without blocking where the pipe can't be opened again,
+    and the pipe is left in blocking mode for other processes
+    """
+    monkeypatch.setattr(jobserver, "_open_nonblocking", lambda fd: None)
+    server = jobserver.create_jobserver(2)
+    try:
+        tokens = [server.try_acquire() for _ in range(2)]
+
+        assert tokens == [jobserver.IMPLICIT_TOKEN, b"+"]
+        assert server.try_acquire() is None
+        assert os.get_blocking(server.read_fd)
+    finally:
+        server.close()
+
+
+def test_acquire_cancelled(job_server: jobserver.JobServer) -> None:
+    """
+    Test waiting for a token stops once cancelled
+    """
+    for _ in range(3):
+        job_server.try_acquire()
+
+    assert job_server.acquire(lambda: True) is None
+
+
+def test_inherited_jobserver(
+    job_server: jobserver.JobServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the jobserver of make is used
+    """
+    monkeypatch.setenv("MAKEFLAGS", job_server.makeflags)
+
+    inherited = jobserver.inherited_jobserver()
+    assert inherited is not None
+    assert inherited.pass_fds == job_server.pass_fds
+
+    # both share the same tokens, but each has an implicit one
+    assert inherited.try_acquire() == jobserver.IMPLICIT_TOKEN
+    assert inherited.try_acquire() == b"+"
+    assert inherited.try_acquire() == b"+"
+    assert inherited.try_acquire() is None
+
+    # the file descriptors belong to make
+    inherited.close()
+    os.fstat(job_server.read_fd)
+
+
+def test_inherited_jobserver_fifo(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the jobserver of make is used when it is a fifo
+    """
+    fifo = tmp_path / "jobserver"
+    os.mkfifo(fifo)
+    monkeypatch.setenv("MAKEFLAGS", f" -j2 --jobserver-auth=fifo:{fifo}")
+
+    inherited = jobserver.inherited_jobserver()
+    assert inherited is not None
+
+    try:
+        inherited.release(b"+")
+        assert inherited.try_acquire() == jobserver.IMPLICIT_TOKEN
+        assert inherited.try_acquire() == b"+"
+        assert inherited.try_acquire() is None
+    finally:
+        inherited.close()
+
+
+@pytest.mark.parametrize(
+    "makeflags",
+    ("", "-j4", " -j4 --jobserver-auth=-2,-2", " -j4 --jobserver-auth=998,999"),
+)
+def test_inherited_jobserver_unavailable(
+    monkeypatch: pytest.MonkeyPatch, makeflags: str
+) -> None:
+    """
+    Test nothing is used if make did not share a jobserver
+    """
+    monkeypatch.setenv("MAKEFLAGS", makeflags)
+
+    assert jobserver.inherited_jobserver() is None
+
+
+def test_run_jobserver(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test a jobserver is only created when asked for,
+    and MAKEFLAGS is set while it is in use
+    """
+    monkeypatch.setenv("MAKEFLAGS", "-s")
+
+    with jobserver.run_jobserver(4) as job_server:
+        assert job_server is None
+
+    monkeypatch.setenv("VTR_JOBSERVER", "1")
+    with jobserver.run_jobserver(4) as job_server:
+        assert job_server is not None
+        assert os.environ["MAKEFLAGS"] == job_server.makeflags
+        assert os.environ["MAKEFLAGS"].startswith("-s -j4 --jobserver-auth=")
+
+    assert os.environ["MAKEFLAGS"] == "-s"
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_tasks_use_jobserver(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test tasks can take tokens from the jobserver
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_JOBSERVER", "1")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.setenv("VTR_JOBS", "2")
+    monkeypatch.chdir(tmp_path)
+
+    # the first task runs with the implicit token, so the second takes the only
+    # other one, and the task itself can't take any more
+    code = (
+        "import os, re, select; "
+        + "r, w = map(int, re.search(r'--jobserver-auth=(\\d+),(\\d+)', "
+        + "os.environ['MAKEFLAGS']).groups()); "
+        + "os.fstat(w); "
+        + "raise SystemExit(len(select.select([r], [], [], 0)[0]))"
+    )
+
+    code = f"import time; time.sleep(0.5); {code}"
+    tasks = [
+        python_task("a", code),
+        python_task("b", code),
+        {"label": "Both", "dependsOn": ["a", "b"]},
+    ]
+    write_tasks(tmp_path, tasks)
+
+    assert executor.execute_tasks([task_obj(str(tmp_path), "Both")], []) == 0
+    assert "MAKEFLAGS" not in os.environ
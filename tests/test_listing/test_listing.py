@@ -0,0 +1,170 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+from vscode_task_runner import console, listing
+from vscode_task_runner.constants import CURRENT_PLATFORM
+from vscode_task_runner.models.enums import PlatformEnum
+
+OS_KEY = {
+    PlatformEnum.windows: "windows",
+    PlatformEnum.linux: "linux",
+    PlatformEnum.osx: "osx",
+}[CURRENT_PLATFORM]
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Change to a workspace with a tasks file.
+    """
+    tasks = {
+        "version": "2.0.0",
+        "isBackground": True,
+        "command": "serve",
+        "tasks": [
+            {
+                "label": "build",
+                "type": "shell",
+                "command": "make",
+                "group": {"kind": "build", "isDefault": True},
+            },
+            {"label": "lint", "command": "ruff", "group": "test"},
+            {"label": "serve"},
+            {"label": "watch", OS_KEY: {"command": "watch"}},
+            {"label": "npm", "type": "npm", "script": "build"},
+            {"label": "all", "dependsOn": "build", "dependsOrder": "sequence"},
+        ],
+    }
+    (tmp_path / ".vscode").mkdir()
+    # comments are allowed in tasks files
+    (tmp_path / ".vscode" / "tasks.json").write_text("// tasks\n" + json.dumps(tasks))
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    (
+        (["--complete"], True),
+        (["--list", "--json"], True),
+        (["--jobs=2", "--list"], True),
+        (["build"], False),
+        (["build", "--complete"], False),
+        (["build", "--", "--list"], False),
+    ),
+)
+def test_is_listing(argv: list[str], expected: bool) -> None:
+    """
+    Test only options before the task labels ask for the tasks to be listed.
+    """
+    assert listing.is_listing(argv) is expected
+
+
+def test_complete(workspace: None, capsys: pytest.CaptureFixture) -> None:
+    """
+    Test the options and supported task labels are completed.
+    """
+    assert listing.run(["--complete"]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        "--skip-summary",
+        "--continue-on-error",
+        "build",
+        "lint",
+        "serve",
+        "watch",
+        "all",
+    ]
+
+
+def test_list(workspace: None, capsys: pytest.CaptureFixture) -> None:
+    """
+    Test the supported task labels are listed.
+    """
+    assert listing.run(["--list"]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        "build",
+        "lint",
+        "serve",
+        "watch",
+        "all",
+    ]
+
+
+def test_list_json(workspace: None, capsys: pytest.CaptureFixture) -> None:
+    """
+    Test the supported tasks are listed with their metadata.
+    """
+    assert listing.run(["--list", "--json"]) == 0
+
+    tasks = {task["label"]: task for task in json.loads(capsys.readouterr().out)}
+    assert list(tasks) == ["build", "lint", "serve", "watch", "all"]
+
+    assert tasks["build"] == {
+        "label": "build",
+        "type": "shell",
+        "group": "build",
+        "isDefault": True,
+        "isBackground": False,
+        "dependsOn": [],
+        "dependsOrder": "parallel",
+    }
+    assert tasks["lint"]["type"] == "process"
+    assert tasks["lint"]["group"] == "test"
+    assert tasks["lint"]["isDefault"] is False
+
+    # only tasks using the global command use the global background setting
+    assert tasks["serve"]["isBackground"] is True
+    assert tasks["watch"]["isBackground"] is False
+
+    assert tasks["all"]["dependsOn"] == ["build"]
+    assert tasks["all"]["dependsOrder"] == "sequence"
+
+
+def test_not_found(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test nothing is completed without a tasks file, but listing shows an error.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    assert listing.run(["--complete"]) == 1
+    assert capsys.readouterr().out == ""
+
+    assert listing.run(["--list"]) == 1
+    assert "No suitable tasks file" in capsys.readouterr().err
+
+
+def test_invalid(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test a tasks file that can't be decoded is reported.
+    """
+    (tmp_path / ".vscode").mkdir()
+    (tmp_path / ".vscode" / "tasks.json").write_text("{tasks: ")
+    monkeypatch.chdir(tmp_path)
+
+    assert listing.run(["--list", "--json"]) == 1
+    assert "Tasks file not valid" in capsys.readouterr().err
+
+
+def test_console(
+    workspace: None, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    """
+    Test the console lists tasks without loading the tasks file.
+    """
+    monkeypatch.setattr(console, "load_tasks", None)
+    monkeypatch.setattr(sys, "argv", ["vtr", "--list", "--json"])
+
+    assert console.run() == 0
+    assert len(json.loads(capsys.readouterr().out)) == 5
@@ -0,0 +1,155 @@
+import pathlib
+import sys
+import urllib.error
+import urllib.request
+from typing import Iterator
+
+import pytest
+
+from tests.conftest import python_task, write_tasks
+from vscode_task_runner import console, metrics
+from vscode_task_runner.exceptions import InvalidMetricsPort
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+from vscode_task_runner.models.task import Task
+
+
+@pytest.fixture
+def recording() -> Iterator[None]:
+    """
+    Record metrics for the duration of the test.
+    """
+    metrics.start()
+    yield
+    metrics.stop()
+
+
+def _samples(text: str) -> dict[str, float]:
+    """
+    Parse the samples of the Prometheus text format.
+    """
+    return {
+        name: float(value)
+        for name, value in (
+            line.rsplit(" ", 1) for line in text.splitlines() if line[0] != "#"
+        )
+    }
+
+
+def test_render(recording: None) -> None:
+    """
+    Test metrics are rendered in the Prometheus text format.
+    """
+    task = Task(label="build", type="process", command="make")
+    task._execution_state = TaskExecutionStateEnum.completed
+    task._execution_duration = 2.5
+
+    metrics.task_spawned("build", 0.002)
+    metrics.task_finished(task)
+    metrics.task_output("build", 1024)
+    metrics.task_output('say "hi"', 1)
+    metrics.run_finished(3.0)
+
+    text = metrics.render()
+    assert text.startswith(
+        "# HELP vtr_tasks_started_total Number of task processes started, including retries.\n"
+        + "# TYPE vtr_tasks_started_total counter\n"
+        + 'vtr_tasks_started_total{task="build"} 1\n'
+    )
+    assert "vtr_tasks_failed_total" not in text
+
+    samples = _samples(text)
+    assert samples['vtr_tasks_completed_total{task="build"}'] == 1
+    assert samples['vtr_task_duration_seconds_bucket{task="build",le="1"}'] == 0
+    assert samples['vtr_task_duration_seconds_bucket{task="build",le="5"}'] == 1
+    assert samples['vtr_task_duration_seconds_bucket{task="build",le="+Inf"}'] == 1
+    assert samples['vtr_task_duration_seconds_sum{task="build"}'] == 2.5
+    assert samples['vtr_task_duration_seconds_count{task="build"}'] == 1
+    assert (
+        samples['vtr_task_spawn_latency_seconds_bucket{task="build",le="0.005"}'] == 1
+    )
+    assert samples['vtr_task_output_bytes_total{task="build"}'] == 1024
+    assert samples['vtr_task_output_bytes_total{task="say \\"hi\\""}'] == 1
+    assert samples["vtr_run_duration_seconds"] == 3
+
+
+def test_not_recording() -> None:
+    """
+    Test nothing is recorded unless metrics have been started.
+    """
+    metrics.task_spawned("build", 0.002)
+    metrics.run_finished(3.0)
+
+    assert not metrics.enabled()
+    assert metrics.render() == ""
+
+
+def test_serve(recording: None) -> None:
+    """
+    Test metrics are served over HTTP while they are being recorded.
+    """
+    with metrics.serve(0) as port:
+        metrics.task_spawned("build", 0.002)
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode()
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/")
+
+    assert _samples(text)['vtr_tasks_started_total{task="build"}'] == 1
+
+
+def test_metrics_port(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the port to serve metrics on is validated.
+    """
+    assert metrics.metrics_port() is None
+
+    monkeypatch.setenv("VTR_METRICS_PORT", "9464")
+    assert metrics.metrics_port() == 9464
+
+    monkeypatch.setenv("VTR_METRICS_PORT", "70000")
+    with pytest.raises(InvalidMetricsPort):
+        metrics.metrics_port()
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_metrics_file(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test metrics of the run are written to a file at the end of it.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_CONTINUE_ON_ERROR", "1")
+    monkeypatch.setenv("VTR_JOBS", "2")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+
+    tasks = [
+        python_task("pass", "print('x' * 99)"),
+        python_task("fail", "raise SystemExit(1)"),
+        {"label": "all", "dependsOn": ["pass", "fail"]},
+    ]
+    write_tasks(tmp_path, tasks)
+
+    monkeypatch.setattr(sys, "argv", ["vtr", "--metrics-file=vtr.prom", "all"])
+    monkeypatch.delenv("VTR_METRICS_FILE", raising=False)
+    assert console.run() == 1
+    monkeypatch.delenv("VTR_METRICS_FILE")
+
+    assert not metrics.enabled()
+    samples = _samples((tmp_path / "vtr.prom").read_text())
+
+    assert samples['vtr_tasks_started_total{task="pass"}'] == 1
+    assert samples['vtr_tasks_started_total{task="fail"}'] == 1
+    assert samples['vtr_tasks_completed_total{task="pass"}'] == 1
+    assert samples['vtr_tasks_failed_total{task="fail"}'] == 1
+    assert samples['vtr_task_duration_seconds_count{task="fail"}'] == 1
+    assert samples['vtr_task_spawn_latency_seconds_count{task="pass"}'] == 1
+    # the tasks run in parallel, so their output is read
+    assert samples['vtr_task_output_bytes_total{task="pass"}'] >= 100
+    for label in ("pass", "fail", "all"):
+        assert samples[f'vtr_task_queue_wait_seconds_count{{task="{label}"}}'] == 1
+    assert samples["vtr_run_duration_seconds"] > 0
@@ -7,7 +7,7 @@ from tests.conftest import task_obj
     "label, is_supported",
     [
         ("Task1", False),  # npm
-        ("Task2", False),  # background task
+        ("Task2", True),  # background task
         ("Task3", True),  # yes
     ],
 )
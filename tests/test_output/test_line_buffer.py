@@ -0,0 +1,35 @@
+from vscode_task_runner.output import LineBuffer
+
+
+def test_line_buffer() -> None:
+    """
+    Test that output is split into prefixed lines.
+    """
+    lines = LineBuffer("[task] ")
+
+    assert lines.feed(b"one\ntwo\r\n") == ["[task] one", "[task] two"]
+    assert lines.feed(b"\n") == ["[task] "]
+
+
+def test_line_buffer_partial() -> None:
+    """
+    Test that incomplete lines are held until the rest arrives.
+    """
+    lines = LineBuffer("[task] ")
+
+    assert lines.feed(b"hel") == []
+    assert lines.feed(b"lo\nwor") == ["[task] hello"]
+    assert lines.feed(b"ld") == []
+    assert lines.flush() == ["[task] world"]
+    assert lines.flush() == []
+
+
+def test_line_buffer_split_character() -> None:
+    """
+    Test that a multi-byte character split between reads is decoded correctly.
+    """
+    lines = LineBuffer("")
+    data = "ü\n".encode("utf-8")
+
+    assert lines.feed(data[:1]) == []
+    assert lines.feed(data[1:]) == [data.decode("utf-8").rstrip()]
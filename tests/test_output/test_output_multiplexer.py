@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+from pytest import CaptureFixture
+
+from vscode_task_runner.output import OutputMultiplexer
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="selectors do not support pipes")
+def test_output_multiplexer(capsys: CaptureFixture) -> None:
+    """
+    Test that the output of multiple tasks is read and prefixed.
+    """
+    pipes = [os.pipe() for _ in range(4)]
+    files = [os.fdopen(read_fd, "rb") for read_fd, _ in pipes]
+
+    with OutputMultiplexer() as multiplexer:
+        first = multiplexer.add(files[0], files[1], "[a] ")
+        second = multiplexer.add(files[2], files[3], "[b] ")
+
+        os.write(pipes[0][1], b"a out\npartial")
+        os.write(pipes[1][1], b"a err\n")
+        os.write(pipes[2][1], b"b out\n")
+
+        for _, write_fd in pipes[:2]:
+            os.close(write_fd)
+
+        assert first.finished.wait(timeout=5)
+        assert not second.finished.is_set()
+
+        for _, write_fd in pipes[2:]:
+            os.close(write_fd)
+
+        assert second.finished.wait(timeout=5)
+
+    captured = capsys.readouterr()
+    assert sorted(captured.out.splitlines()) == [
+        "[a] a out",
+        "[a] partial",
+        "[b] b out",
+    ]
+    assert captured.err.splitlines() == ["[a] a err"]
+    assert all(f.closed for f in files)
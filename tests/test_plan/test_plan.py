@@ -0,0 +1,132 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+from tests.conftest import python_task, write_tasks
+from vscode_task_runner import console, plan
+from vscode_task_runner.exceptions import PlanInvalid
+
+SCRIPT = """
+import os, sys
+with open("out.txt", "a") as fp:
+    fp.write(" ".join([os.path.basename(os.getcwd()), os.environ["GREETING"], *sys.argv[1:]]) + "\\n")
+"""
+
+
+def _write_tasks(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "sub").mkdir()
+    tasks = [
+        python_task(
+            "generate", SCRIPT, "generate", options={"cwd": str(tmp_path / "sub")}
+        ),
+        python_task("build", SCRIPT, "build", dependsOn=["generate"]),
+    ]
+    write_tasks(tmp_path, tasks, options={"env": {"GREETING": "hello"}})
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_plan_round_trip(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test a plan written from the tasks file is executed the same way,
+    without the tasks file.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+    _write_tasks(tmp_path)
+
+    monkeypatch.setenv("VTR_PLAN", "plan.json")
+    monkeypatch.setattr(sys, "argv", ["vtr", "build", "--", "--release"])
+    assert console.run() == 0
+    monkeypatch.delenv("VTR_PLAN")
+
+    # writing the plan does not execute anything
+    assert not (tmp_path / "out.txt").exists()
+    assert not (tmp_path / "sub" / "out.txt").exists()
+
+    (tmp_path / ".vscode" / "tasks.json").unlink()
+    monkeypatch.setenv("GREETING", "overridden")
+
+    monkeypatch.setenv("VTR_EXEC_PLAN", "plan.json")
+    monkeypatch.setattr(sys, "argv", ["vtr"])
+    assert console.run() == 0
+
+    # the dependency ran in its own working directory, and only the
+    # selected task was given the extra arguments
+    assert (tmp_path / "sub" / "out.txt").read_text() == "sub hello generate\n"
+    assert (
+        tmp_path / "out.txt"
+    ).read_text() == f"{tmp_path.name} hello build --release\n"
+
+
+def test_exec_plan_task_argument(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the exec plan option is passed on to a task after its label,
+    rather than executing a plan.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+    _write_tasks(tmp_path)
+
+    monkeypatch.setattr(sys, "argv", ["vtr", "build", "--exec-plan=plan.json"])
+    assert console.run() == 0
+
+    assert (tmp_path / "out.txt").read_text() == (
+        f"{tmp_path.name} hello build --exec-plan=plan.json\n"
+    )
+
+
+def test_load_plan(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the graph of tasks is rebuilt from a plan.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+    _write_tasks(tmp_path)
+
+    monkeypatch.setenv("VTR_PLAN", "plan.json")
+    monkeypatch.setattr(sys, "argv", ["vtr", "build"])
+    assert console.run() == 0
+
+    nodes, specs = plan.load_plan(str(tmp_path / "plan.json"))
+
+    assert [node.task.label for node in nodes] == ["generate", "build"]
+    assert nodes[1].dependencies == [nodes[0]]
+    assert specs[nodes[0]].cwd == str(tmp_path / "sub")
+    assert specs[nodes[1]].argv[0] == sys.executable
+    assert dict(specs[nodes[1]].env)["GREETING"] == "hello"
+
+
+@pytest.mark.parametrize(
+    "content",
+    (
+        "not json",
+        json.dumps([]),
+        json.dumps({"version": 0, "nodes": []}),
+        json.dumps({"version": plan.PLAN_VERSION, "nodes": []}),
+        json.dumps({"version": plan.PLAN_VERSION, "nodes": [{"label": "build"}]}),
+    ),
+)
+def test_load_plan_invalid(tmp_path: pathlib.Path, content: str) -> None:
+    """
+    Test plans that can't be executed are rejected.
+    """
+    path = tmp_path / "plan.json"
+    path.write_text(content)
+
+    with pytest.raises(PlanInvalid):
+        plan.load_plan(str(path))
+
+
+def test_load_plan_not_found(tmp_path: pathlib.Path) -> None:
+    """
+    Test a plan that does not exist is rejected.
+    """
+    with pytest.raises(PlanInvalid):
+        plan.load_plan(str(tmp_path / "plan.json"))
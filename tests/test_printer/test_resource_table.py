@@ -0,0 +1,70 @@
+import os
+import pathlib
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor, printer
+from vscode_task_runner.history import ResourceUsage
+
+
+def test_resource_table() -> None:
+    """
+    Test the table has a row for each task, slowest first, and the totals
+    for the run.
+    """
+    table = printer.resource_table(
+        task_durations={"lint": 2.0, "build": 4.0, "test": 2.0},
+        task_usage={
+            "build": ResourceUsage(user_time=6.0, system_time=1.0, max_rss=3 << 30),
+            "lint": ResourceUsage(user_time=0.5, system_time=0.5, max_rss=200 << 20),
+        },
+        wall_time=5.0,
+        slots=2,
+    )
+
+    assert table.splitlines() == [
+        "## Resource Usage 📊",
+        "",
+        "| Task | Wall Time | CPU Time | CPU Utilisation | Peak Memory |",
+        "| --- | ---: | ---: | ---: | ---: |",
+        "| `build` | 4.0s | 7.0s | 175% | 3.0 GiB |",
+        "| `lint` | 2.0s | 1.0s | 50% | 200.0 MiB |",
+        "| `test` | 2.0s | - | - | - |",
+        "| **Total** | 8.0s | 8.0s | 133% | 3.0 GiB |",
+        "",
+        "Ran for 5.0s with 2 slots, parallel efficiency 80%",
+        "",
+    ]
+
+
+def test_resource_table_unknown_usage() -> None:
+    """
+    Test the table only has wall times when no resource usage is known,
+    and is left out when no tasks were executed.
+    """
+    table = printer.resource_table({"build": 1.0}, {}, wall_time=1.0, slots=1)
+    assert "| **Total** | 1.0s | - | - | - |" in table
+    assert "Ran for 1.0s with 1 slot, parallel efficiency 100%" in table
+
+    assert printer.resource_table({}, {}, wall_time=1.0, slots=1) == ""
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="requires os.wait4")
+def test_task_usage(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the resources used by the process of a task are recorded on the task.
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.chdir(tmp_path)
+
+    code = "data = bytearray(64 * 1024 * 1024); sum(range(10 ** 6))"
+    write_tasks(tmp_path, [python_task("build", code)])
+
+    task = task_obj(str(tmp_path), "build")
+    assert executor.execute_tasks([task], []) == 0
+
+    usage = task._execution_usage
+    assert usage is not None
+    assert usage.user_time + usage.system_time > 0
+    assert usage.max_rss > 64 * 1024 * 1024
@@ -0,0 +1,286 @@
+import pathlib
+
+import pytest
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import executor, printer, problems
+from vscode_task_runner.models.enums import ProblemSeverityEnum
+from vscode_task_runner.models.problem_matcher import (
+    PREDEFINED_PROBLEM_MATCHERS,
+    ProblemMatcher,
+)
+from vscode_task_runner.problems import Problem, ProblemMatchers
+
+ESLINT_OUTPUT = [
+    "/work/src/app.js",
+    "  1:10  error    Missing semicolon   semi",
+    "  4:1   warning  Unexpected console  no-console",
+    "",
+    "/work/src/util.js",
+    "  2:3  error  'x' is not defined  no-undef",
+]
+
+
+def _scan(matchers: list[ProblemMatcher], lines: list[str]) -> list[Problem]:
+    scanner = ProblemMatchers(matchers, "/work").scanner()
+    return [problem for line in lines for problem in scanner.scan_line(line)]
+
+
+def test_tsc() -> None:
+    """
+    Test the predefined TypeScript problem matcher
+    """
+    found = _scan(
+        [PREDEFINED_PROBLEM_MATCHERS["$tsc"]],
+        [
+            "src/index.ts(3,7): error TS2322: Type 'string' is not assignable.",
+            "Found 1 error.",
+        ],
+    )
+
+    assert found == [
+        Problem(
+            message="Type 'string' is not assignable.",
+            severity=ProblemSeverityEnum.error,
+            file="/work/src/index.ts",
+            line=3,
+            column=7,
+            code="2322",
+            source="ts",
+        )
+    ]
+
+
+def test_gcc() -> None:
+    """
+    Test the predefined GCC problem matcher
+    """
+    found = _scan(
+        [PREDEFINED_PROBLEM_MATCHERS["$gcc"]],
+        [
+            "main.c: In function 'main':",
+            "main.c:5:9: warning: unused variable 'x' [-Wunused-variable]",
+            "lib.c:12:: fatal error: foo.h: No such file or directory",
+        ],
+    )
+
+    assert [(p.file, p.line, p.column, p.severity) for p in found] == [
+        ("/work/main.c", 5, 9, ProblemSeverityEnum.warning),
+        ("/work/lib.c", 12, None, ProblemSeverityEnum.error),
+    ]
+    assert found[1].message == "foo.h: No such file or directory"
+
+
+def test_eslint_stylish() -> None:
+    """
+    Test the predefined ESLint problem matcher, which spans multiple lines
+    """
+    found = _scan([PREDEFINED_PROBLEM_MATCHERS["$eslint-stylish"]], ESLINT_OUTPUT)
+
+    assert [(p.file, p.line, p.column, p.code) for p in found] == [
+        ("/work/src/app.js", 1, 10, "semi"),
+        ("/work/src/app.js", 4, 1, "no-console"),
+        ("/work/src/util.js", 2, 3, "no-undef"),
+    ]
+    assert found[1].severity == ProblemSeverityEnum.warning
+
+
+def test_custom_multi_line() -> None:
+    """
+    Test a custom problem matcher with patterns over multiple lines,
+    that must match one after the other
+    """
+    matcher = ProblemMatcher.model_validate(
+        {
+            "owner": "custom",
+            "fileLocation": ["relative", "src"],
+            "severity": "warning",
+            "pattern": [
+                {"regexp": r"^In (?<file>\S+):$", "file": 1},
+                {"regexp": r"^\s+line (\d+): (.*)$", "line": 1, "message": 2},
+            ],
+        }
+    )
+
+    found = _scan(
+        [matcher],
+        [
+            "In a.py:",
+            "  line 3: bad thing",
+            "  line 4: not reported",
+            "In b.py:",
+            "oops",
+        ],
+    )
+
+    assert found == [
+        Problem(
+            message="bad thing",
+            severity=ProblemSeverityEnum.warning,
+            file="/work/src/a.py",
+            line=3,
+            source="custom",
+        )
+    ]
+
+
+def test_combined() -> None:
+    """
+    Test problem matchers are combined into one expression where possible,
+    and still all find problems when they are not
+    """
+    matchers = [
+        PREDEFINED_PROBLEM_MATCHERS["$tsc"],
+        PREDEFINED_PROBLEM_MATCHERS["$gcc"],
+        PREDEFINED_PROBLEM_MATCHERS["$eslint-stylish"],
+    ]
+    lines = [
+        "src/index.ts(3,7): error TS2322: Bad type.",
+        "main.c:5:9: warning: unused variable",
+        *ESLINT_OUTPUT,
+    ]
+
+    assert ProblemMatchers(matchers, "/work").combined
+    found = _scan(matchers, lines)
+    assert [p.source for p in found] == ["ts", "gcc", "eslint", "eslint", "eslint"]
+
+    # a pattern that refers to its own groups can't be combined
+    backreference = ProblemMatcher.model_validate(
+        {"owner": "quoted", "pattern": {"regexp": r"^(['\"])(.*)\1$", "message": 2}}
+    )
+    assert not ProblemMatchers([backreference, *matchers], "/work").combined
+    found = _scan([backreference, *matchers], ["'quoted'", *lines])
+    assert [p.source for p in found] == [
+        "quoted",
+        "ts",
+        "gcc",
+        "eslint",
+        "eslint",
+        "eslint",
+    ]
+
+
+def test_same_line() -> None:
+    """
+    Test every problem matcher that matches a line finds a problem
+    """
+    gcc = PREDEFINED_PROBLEM_MATCHERS["$gcc"]
+    assert len(_scan([gcc, gcc, gcc], ["main.c:5:9: error: oops"])) == 3
+
+    # not every pattern matches from the start of the line
+    anywhere = ProblemMatcher.model_validate(
+        {"owner": "anywhere", "pattern": {"regexp": r"(oops|ouch)$", "message": 1}}
+    )
+    found = _scan([anywhere, gcc], ["main.c:5:9: error: oops", "ouch", "fine"])
+    assert [(p.source, p.message) for p in found] == [
+        ("anywhere", "oops"),
+        ("gcc", "oops"),
+        ("anywhere", "ouch"),
+    ]
+
+
+def test_prefilter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test lines are only searched if they have text the first patterns need,
+    unless a problem spread across multiple lines is in progress
+    """
+    gcc = PREDEFINED_PROBLEM_MATCHERS["$gcc"]
+    tsc = PREDEFINED_PROBLEM_MATCHERS["$tsc"]
+    assert ProblemMatchers([gcc], "/work").literals == {"error", "warning"}
+    assert ProblemMatchers([gcc, tsc], "/work").literals == {"error", "warning", "info"}
+
+    # case insensitive patterns may match any line
+    ignore_case = ProblemMatcher.model_validate(
+        {"owner": "loud", "pattern": {"regexp": r"(?i)error: (.*)$", "message": 1}}
+    )
+    assert ProblemMatchers([ignore_case, gcc], "/work").literals is None
+
+    # including when only part of the pattern is
+    inline = ProblemMatcher.model_validate(
+        {
+            "owner": "inline",
+            "pattern": {"regexp": r"^(?:note|(?i:error)): (.*)$", "message": 1},
+        }
+    )
+    assert ProblemMatchers([inline, gcc], "/work").literals is None
+
+    matcher = ProblemMatcher.model_validate(
+        {
+            "owner": "custom",
+            "pattern": [
+                {"regexp": r"^In (\S+):$", "file": 1},
+                {"regexp": r"^\s+line (\d+): (.*)$", "line": 1, "message": 2},
+            ],
+        }
+    )
+    assert ProblemMatchers([matcher], "/work").literals == {"In "}
+
+    found: list[Problem] = []
+    monkeypatch.setattr(problems, "report", found.append)
+    scanner = ProblemMatchers([matcher, gcc], "/work").scanner()
+    scanner.feed(["building", "In a.py:", "  line 3: bad thing", "  line 4: skipped"])
+    scanner.feed(["main.c:5:9: error: oops", "done", "In b.py:"])
+    scanner.feed(["  line 7: split across reads"])
+
+    assert [(p.source, p.line, p.message) for p in found] == [
+        ("custom", 3, "bad thing"),
+        ("gcc", 5, "oops"),
+        ("custom", 7, "split across reads"),
+    ]
+
+    found.clear()
+    ProblemMatchers([inline], "/work").scanner().feed(["ERROR: loud", "fine"])
+    assert [(p.source, p.message) for p in found] == [("inline", "loud")]
+
+
+def test_task_problem_matchers(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test problem matchers are only used in GitHub Actions and Azure Pipelines
+    """
+    tasks = [
+        {"label": "gcc", "command": "gcc", "problemMatcher": ["$gcc", "$unknown"]},
+        {"label": "none", "command": "true"},
+    ]
+    write_tasks(tmp_path, tasks)
+
+    gcc = task_obj(str(tmp_path), "gcc")
+    monkeypatch.setattr(printer, "IS_GITHUB_ACTIONS", False)
+    monkeypatch.setattr(printer, "IS_AZURE_PIPELINES", False)
+    assert problems.task_problem_matchers(gcc) is None
+
+    monkeypatch.setattr(printer, "IS_GITHUB_ACTIONS", True)
+    matchers = problems.task_problem_matchers(gcc)
+    assert matchers is not None
+    assert len(matchers.matchers) == 1
+
+    assert problems.task_problem_matchers(task_obj(str(tmp_path), "none")) is None
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_annotations(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capfd: pytest.CaptureFixture,
+    engine: str,
+) -> None:
+    """
+    Test problems in the output of a task are reported as annotations
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(printer, "IS_GITHUB_ACTIONS", True)
+
+    code = (
+        "import sys; print('compiling'); "
+        + "print('src/main.c:5:9: warning: unused, really', file=sys.stderr)"
+    )
+    write_tasks(tmp_path, [python_task("build", code, problemMatcher="$gcc")])
+
+    assert executor.execute_tasks([task_obj(str(tmp_path), "build")], []) == 0
+
+    stdout = capfd.readouterr().out
+    assert "compiling" in stdout
+    assert "::warning file=src/main.c,line=5,col=9,title=gcc::unused, really" in stdout
@@ -0,0 +1,152 @@
+import pathlib
+
+import pytest
+from pydantic import ValidationError
+from pytest_mock import MockerFixture
+
+from tests.conftest import task_obj
+from vscode_task_runner import resources
+from vscode_task_runner.exceptions import InvalidResources
+from vscode_task_runner.graph import build_task_graph
+from vscode_task_runner.models.task import VtrOptions
+from vscode_task_runner.resources import Resources
+from vscode_task_runner.scheduler import Scheduler
+
+GIB = 1024**3
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        (1000, 1000),
+        (6.5e9, 6_500_000_000),
+        ("1000", 1000),
+        ("6G", 6 * GIB),
+        ("6 GiB", 6 * GIB),
+        ("512MB", 512 * 1024**2),
+        ("1.5g", int(1.5 * GIB)),
+        ("4k", 4096),
+    ),
+)
+def test_parse_memory(value: object, expected: int) -> None:
+    """
+    Test amounts of memory are converted into bytes
+    """
+    assert resources.parse_memory(value) == expected  # ty:ignore[invalid-argument-type]
+
+
+@pytest.mark.parametrize(
+    "value", ("lots", "6X", "-1G", -1, -1.5, float("inf"), True, ["6G"])
+)
+def test_parse_memory_invalid(value: object) -> None:
+    """
+    Test invalid amounts of memory raise an error
+    """
+    with pytest.raises(ValueError):
+        resources.parse_memory(value)  # ty:ignore[invalid-argument-type]
+
+    with pytest.raises(ValidationError):
+        VtrOptions(memory=value)  # ty:ignore[invalid-argument-type]
+
+
+def test_memory_option_float() -> None:
+    """
+    Test a number of bytes written in exponent notation is accepted
+    """
+    assert VtrOptions.model_validate({"memory": 6.5e9}).memory == 6_500_000_000
+
+
+def test_system_memory(tmp_path: pathlib.Path, mocker: MockerFixture) -> None:
+    """
+    Test the available memory is read from /proc/meminfo
+    """
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text(
+        "MemTotal:       16000000 kB\nMemFree:  1000 kB\nMemAvailable:    8000000 kB\n"
+    )
+    mocker.patch.object(resources, "MEMINFO_FILE", str(meminfo))
+    assert resources.system_memory() == 8000000 * 1024
+
+    # not available at all
+    mocker.patch.object(resources, "MEMINFO_FILE", str(tmp_path / "missing"))
+    assert resources.system_memory() is None
+
+
+def test_machine_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the budget can be set with environment variables
+    """
+    monkeypatch.setenv("VTR_CPUS", "3")
+    monkeypatch.setenv("VTR_MEMORY", "8G")
+
+    assert resources.machine_budget() == Resources(cpu=3, memory=8 * GIB)
+
+
+@pytest.mark.parametrize(
+    "variable, value",
+    (("VTR_CPUS", "0"), ("VTR_CPUS", "many"), ("VTR_MEMORY", "plenty")),
+)
+def test_machine_budget_invalid(
+    monkeypatch: pytest.MonkeyPatch, variable: str, value: str
+) -> None:
+    """
+    Test an invalid budget raises an error
+    """
+    monkeypatch.setenv(variable, value)
+
+    with pytest.raises(InvalidResources):
+        resources.machine_budget()
+
+
+def _started(scheduler: Scheduler) -> list[str]:
+    return sorted(launch.node.task.label for launch in scheduler.start())
+
+
+def test_scheduler_budget() -> None:
+    """
+    Test tasks are only started when there are enough resources free
+    """
+    nodes = build_task_graph([task_obj(__file__, "Link")])
+    by_label = {node.task.label: node for node in nodes}
+    scheduler = Scheduler(nodes, jobs=4, budget=Resources(cpu=4, memory=8 * GIB))
+
+    # both linkers don't fit in memory at once,
+    # but the other tasks fit alongside one of them
+    first = _started(scheduler)
+    assert len(first) == 3
+    assert {"plain", "small"} < set(first)
+    linker = (set(first) - {"plain", "small"}).pop()
+
+    assert _started(scheduler) == []
+
+    # finishing a task that doesn't use much does not free enough
+    scheduler.finish([by_label["small"]])
+    assert _started(scheduler) == []
+
+    scheduler.finish([by_label[linker]])
+    assert _started(scheduler) == sorted({"link-a", "link-b"} - {linker})
+
+
+def test_scheduler_over_budget() -> None:
+    """
+    Test a task that needs more than the whole budget is started on its own
+    """
+    nodes = build_task_graph([task_obj(__file__, "Huge")])
+    by_label = {node.task.label: node for node in nodes}
+    by_label["huge"].priority = 10
+    scheduler = Scheduler(nodes, jobs=4, budget=Resources(cpu=4, memory=8 * GIB))
+
+    assert _started(scheduler) == ["huge"]
+
+    scheduler.finish([by_label["huge"]])
+    assert _started(scheduler) == ["small"]
+
+
+def test_scheduler_no_budget() -> None:
+    """
+    Test resources are ignored without a budget
+    """
+    nodes = build_task_graph([task_obj(__file__, "Link")])
+    scheduler = Scheduler(nodes, jobs=4)
+
+    assert _started(scheduler) == ["link-a", "link-b", "plain", "small"]
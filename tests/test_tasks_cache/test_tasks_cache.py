@@ -0,0 +1,153 @@
+import os
+import pathlib
+import pickle
+
+import pytest
+
+import vscode_task_runner.parser
+from tests.conftest import write_tasks
+from vscode_task_runner import tasks_cache
+from vscode_task_runner.parser import load_tasks
+
+
+def _write_tasks(path: pathlib.Path, command: str) -> None:
+    tasks = [
+        {"label": "build", "type": "shell", "command": command},
+        {"label": "test", "type": "shell", "command": "pytest"},
+        {"label": "all", "dependsOn": ["build", "test"]},
+    ]
+    write_tasks(path, tasks)
+
+
+def _fail_decode(*args: object) -> None:
+    raise AssertionError("tasks file should not be decoded")
+
+
+def test_cache_hit(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test an unchanged tasks file is loaded from the cache, without decoding it.
+    """
+    _write_tasks(tmp_path, "make")
+    tasks = load_tasks(str(tmp_path))
+
+    monkeypatch.setattr(vscode_task_runner.parser, "decode_vscode_json", _fail_decode)
+    cached = load_tasks(str(tmp_path))
+
+    assert cached is not tasks
+    assert cached.model_dump() == tasks.model_dump()
+
+    # the tasks are linked to each other and their parent again
+    all_task = cached.tasks_dict["all"]
+    assert all_task._tasks is cached
+    assert all_task.depends_on == [
+        cached.tasks_dict["build"],
+        cached.tasks_dict["test"],
+    ]
+
+
+def test_cache_changed(tmp_path: pathlib.Path) -> None:
+    """
+    Test the cache is not used once the tasks file has changed.
+    """
+    _write_tasks(tmp_path, "make")
+    load_tasks(str(tmp_path))
+
+    # same size, and possibly the same modification time
+    _write_tasks(tmp_path, "ninj")
+    tasks = load_tasks(str(tmp_path))
+
+    assert tasks.tasks_dict["build"].command == "ninj"
+
+
+def test_cache_key(tmp_path: pathlib.Path) -> None:
+    """
+    Test the key covers the location, size, modification time and contents
+    of the tasks file.
+    """
+    _write_tasks(tmp_path, "make")
+    path = str(tmp_path / ".vscode" / "tasks.json")
+    content = (tmp_path / ".vscode" / "tasks.json").read_bytes()
+
+    key = tasks_cache.cache_key(path, content)
+    assert key.path == os.path.abspath(path)
+    assert key.size == len(content)
+    assert key == tasks_cache.cache_key(path, content)
+    assert key != tasks_cache.cache_key(path, content.replace(b"make", b"ninj"))
+
+    os.utime(path, ns=(0, 0))
+    assert key != tasks_cache.cache_key(path, content)
+
+
+def test_cache_unreadable(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test a cache entry that can't be read is ignored, and replaced.
+    """
+    _write_tasks(tmp_path, "make")
+    load_tasks(str(tmp_path))
+
+    (entry,) = tasks_cache.tasks_cache_dir().iterdir()
+    entry.write_bytes(b"not a pickle")
+
+    assert load_tasks(str(tmp_path)).tasks_dict["build"].command == "make"
+
+    # the entry was written again, so the tasks file is not decoded
+    monkeypatch.setattr(vscode_task_runner.parser, "decode_vscode_json", _fail_decode)
+    assert load_tasks(str(tmp_path)).tasks_dict["build"].command == "make"
+
+
+def test_cache_not_writable(tmp_path: pathlib.Path) -> None:
+    """
+    Test tasks are still loaded when the cache can't be written.
+    """
+    _write_tasks(tmp_path, "make")
+    tasks_cache.tasks_cache_dir().parent.mkdir(parents=True)
+    # a file where the directory should be
+    tasks_cache.tasks_cache_dir().touch()
+
+    assert load_tasks(str(tmp_path)).tasks_dict["build"].command == "make"
+
+
+def test_cache_key_modules(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the key covers every module of the package, not only the models.
+    """
+    package = tmp_path / "package"
+    (package / "models").mkdir(parents=True)
+    (package / "models" / "task.py").write_text("")
+    (package / "resources.py").write_text("")
+    monkeypatch.setattr(tasks_cache, "_PACKAGE_DIR", package)
+
+    _write_tasks(tmp_path, "make")
+    path = str(tmp_path / ".vscode" / "tasks.json")
+    content = (tmp_path / ".vscode" / "tasks.json").read_bytes()
+
+    key = tasks_cache.cache_key(path, content)
+    assert [module[0] for module in key.modules] == [
+        "resources.py",
+        os.path.join("models", "task.py"),
+    ]
+
+    (package / "resources.py").write_text("UNITS = {}")
+    assert key != tasks_cache.cache_key(path, content)
+
+
+def test_cache_save_failed(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test tasks are still loaded when they can't be cached,
+    and no partially written entry is left behind.
+    """
+
+    def _fail_dump(*args: object, **kwargs: object) -> None:
+        raise pickle.PicklingError("can't pickle")
+
+    _write_tasks(tmp_path, "make")
+    monkeypatch.setattr(pickle, "dump", _fail_dump)
+
+    assert load_tasks(str(tmp_path)).tasks_dict["build"].command == "make"
+    assert list(tasks_cache.tasks_cache_dir().iterdir()) == []
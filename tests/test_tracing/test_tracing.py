@@ -0,0 +1,99 @@
+import json
+import os
+import pathlib
+import sys
+
+import pytest
+
+from tests.conftest import python_task, write_tasks
+from vscode_task_runner import console, tracing
+
+
+@pytest.mark.parametrize("engine", ("threads", "asyncio"))
+def test_trace(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, engine: str
+) -> None:
+    """
+    Test a timeline of the run is written, with the phases of the run on one
+    track, and tasks running at the same time on tracks of their own
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.setenv("VTR_JOBS", "2")
+    monkeypatch.setenv("VTR_ENGINE", engine)
+    monkeypatch.chdir(tmp_path)
+
+    work = "import time; print('working', flush=True); time.sleep(0.2)"
+    tasks = [
+        python_task("a", work),
+        python_task("b", work),
+        python_task("all", "pass", dependsOn=["a", "b"]),
+    ]
+    write_tasks(tmp_path, tasks)
+
+    trace_file = tmp_path / "out.json"
+    monkeypatch.setattr(sys, "argv", ["vtr", f"--trace={trace_file}", "all"])
+    # removed after the test, even if it fails, so no other test writes a trace
+    monkeypatch.setitem(os.environ, "VTR_TRACE", "")
+    assert console.run() == 0
+
+    assert not tracing.enabled()
+    events = json.loads(trace_file.read_text())["traceEvents"]
+
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    for phase in ("parse", "validate", "plan", "resolve", "execute"):
+        assert spans[phase]["tid"] == tracing.MAIN_TRACK
+
+    # the tasks running at the same time are in different slots
+    assert {spans["a"]["tid"], spans["b"]["tid"]} == {1, 2}
+    assert spans["all"]["tid"] in (1, 2)
+    assert spans["all"]["ts"] >= spans["a"]["ts"] + spans["a"]["dur"]
+    assert spans["a"]["args"] == {"state": "completed", "returncode": 0, "attempts": 1}
+
+    instants = [
+        (event["args"]["task"], event["name"], event["tid"])
+        for event in events
+        if event["ph"] == "i"
+    ]
+    for name in ("spawn", "first output", "exit"):
+        assert ("a", name, spans["a"]["tid"]) in instants
+
+    track_names = {
+        event["tid"]: event["args"]["name"]
+        for event in events
+        if event["name"] == "thread_name"
+    }
+    assert track_names == {0: "vtr", 1: "slot 1", 2: "slot 2"}
+
+
+def test_trace_task_argument(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test the trace option is passed on to a task after its label,
+    rather than recording a timeline
+    """
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+    monkeypatch.delenv("VTR_TRACE", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    code = "import sys; open('args.txt', 'w').write(sys.argv[1])"
+    write_tasks(tmp_path, [python_task("echo", code)])
+
+    monkeypatch.setattr(sys, "argv", ["vtr", "echo", "--trace=out.json"])
+    assert console.run() == 0
+
+    assert not tracing.enabled()
+    assert (tmp_path / "args.txt").read_text() == "--trace=out.json"
+    assert not (tmp_path / "out.json").exists()
+
+
+def test_not_tracing() -> None:
+    """
+    Test nothing is recorded unless tracing has been started
+    """
+    assert not tracing.enabled()
+
+    with tracing.span("plan"):
+        tracing.instant("a", "spawn")
+
+    assert not tracing.enabled()
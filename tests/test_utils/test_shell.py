@@ -1,3 +1,5 @@
+from typing import Optional
+
 import pytest
 import shellingham
 from pytest_mock import MockerFixture
@@ -13,7 +15,7 @@ def detect_shell_patch(mocker: MockerFixture) -> None:
     Fixture to always raise a ShellDetectionFailure exception
     """
 
-    def replacement() -> None:
+    def replacement(pid: Optional[int] = None) -> None:
         raise shellingham.ShellDetectionFailure
 
     mocker.patch("shellingham.detect_shell", replacement)
@@ -98,3 +100,18 @@ def test_shell_exception(
     mocker.patch.object(shell, "FALLBACK_SHELL", "")
     with pytest.raises(ShellNotFound):
         shell.get_parent_shell()
+
+
+def test_get_parent_shell_daemon(
+    mocker: MockerFixture, shutil_which_patch: None
+) -> None:
+    """
+    Test that the shell is detected from the client process when running in the daemon
+    """
+    detect_shell = mocker.patch(
+        "shellingham.detect_shell", return_value=("bash", "/bin/bash")
+    )
+    mocker.patch.dict("os.environ", {"VTR_SHELL_PID": "1234"})
+
+    assert shell.get_parent_shell() == ShellConfiguration(executable="/bin/bash")
+    detect_shell.assert_called_once_with(pid=1234)
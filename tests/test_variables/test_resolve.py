@@ -1,3 +1,5 @@
+import os
+import pathlib
 from typing import Any, Union
 
 import pytest
@@ -41,13 +43,31 @@ def test_replace_supported_variables(default_build_task_mock: None) -> None:
 
     # python versions 3.7+ maintain order
     input_string = (
-        " ".join(resolve.SUPPORTED_PREDEFINED_VARIABLES.keys()) + " ${defaultBuildTask}"
+        " ".join(resolve.predefined_variables().keys()) + " ${defaultBuildTask}"
     )
-    output_string = " ".join(resolve.SUPPORTED_PREDEFINED_VARIABLES.values()) + " task1"
+    output_string = " ".join(resolve.predefined_variables().values()) + " task1"
 
     assert resolve.replace_supported_variables(input_string) == output_string
 
 
+def test_predefined_variables(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test predefined variables are only worked out again when
+    the working directory changes
+    """
+    monkeypatch.chdir(tmp_path)
+    variables = resolve.predefined_variables()
+    assert variables["${workspaceFolder}"] == os.getcwd()
+    assert resolve.predefined_variables() is variables
+
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path / "sub")
+    assert resolve.predefined_variables()["${workspaceFolderBasename}"] == "sub"
+    assert resolve.replace_supported_variables("${cwd}") == os.getcwd()
+
+
 @pytest.mark.parametrize(
     "text",
     (
@@ -0,0 +1,175 @@
+import pathlib
+import sys
+from typing import Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from tests.conftest import python_task, task_obj, write_tasks
+from vscode_task_runner import watch
+
+
+@pytest.fixture
+def workspace(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """
+    Write a tasks file with a task that declares its inputs, a task that does
+    not, and a task depending on the first. Each task records when it runs.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("VTR_SKIP_SUMMARY", "1")
+
+    def recording_task(label: str, **properties: object) -> dict:
+        return python_task(
+            label, f"open('runs.txt', 'a').write('{label}\\n')", **properties
+        )
+
+    tasks = [
+        recording_task("compile", vtr={"inputs": ["src/**/*.c"]}),
+        recording_task("lint"),
+        recording_task(
+            "package", dependsOn=["compile"], vtr={"inputs": ["package.json"]}
+        ),
+        {"label": "All", "dependsOn": ["package", "lint"]},
+    ]
+
+    write_tasks(tmp_path, tasks)
+    (tmp_path / "src" / "lib").mkdir(parents=True)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    (
+        ("src/**/*.c", "src/main.c", True),
+        ("src/**/*.c", "src/lib/util.c", True),
+        ("src/**/*.c", "src/main.h", False),
+        ("src/*.c", "src/lib/util.c", False),
+        ("*.json", "package.json", True),
+        ("file?.txt", "file1.txt", True),
+        ("a.b", "axb", False),
+    ),
+)
+def test_glob_regex(pattern: str, path: str, expected: bool) -> None:
+    """
+    Test converting globs to regular expressions.
+    """
+    assert bool(watch._glob_regex(pattern).fullmatch(path)) == expected
+
+
+def test_task_affected(workspace: pathlib.Path) -> None:
+    """
+    Test that declared inputs are used if present, and the working directory otherwise.
+    """
+    compile_task = task_obj(str(workspace), "compile")
+    lint_task = task_obj(str(workspace), "lint")
+
+    changed = {workspace / "src" / "lib" / "util.c"}
+    assert watch.task_affected(compile_task, changed)
+    assert watch.task_affected(lint_task, changed)
+
+    changed = {workspace / "README.md"}
+    assert not watch.task_affected(compile_task, changed)
+    assert watch.task_affected(lint_task, changed)
+
+    changed = {workspace.parent / "elsewhere.c"}
+    assert not watch.task_affected(lint_task, changed)
+
+
+def _wait_for(watcher: watch.Watcher, path: pathlib.Path) -> set[pathlib.Path]:
+    """
+    Wait until the watcher sees a change to the given path.
+    """
+    changed: set[pathlib.Path] = set()
+    for _ in range(20):
+        changed |= watcher.wait(0.5)
+        if path in changed:
+            break
+
+    return changed
+
+
+@pytest.mark.parametrize(
+    "watcher_class",
+    (
+        pytest.param(
+            watch.InotifyWatcher,
+            marks=pytest.mark.skipif(
+                not sys.platform.startswith("linux"), reason="inotify is Linux only"
+            ),
+        ),
+        watch.PollingWatcher,
+    ),
+)
+def test_watcher(workspace: pathlib.Path, watcher_class: type) -> None:
+    """
+    Test that watchers see new and modified files, including in new directories.
+    """
+    watcher = watcher_class([workspace])
+    try:
+        main = workspace / "src" / "main.c"
+        main.write_text("int main;")
+        assert main in _wait_for(watcher, main)
+
+        nested = workspace / "src" / "new" / "nested.c"
+        nested.parent.mkdir()
+        nested.write_text("int nested;")
+        assert nested in _wait_for(watcher, nested)
+
+        # changes are forgotten once discarded
+        main.write_text("int main2;")
+        if watcher_class is watch.InotifyWatcher:
+            watcher.discard()
+            assert watcher.wait(0.1) == set()
+    finally:
+        watcher.close()
+
+
+class _ScriptedWatcher:
+    """
+    Watcher that returns changes from a script.
+    """
+
+    def __init__(self, script: list[set[pathlib.Path]]) -> None:
+        self.script = script
+
+    def wait(self, timeout: Optional[float]) -> set[pathlib.Path]:
+        return self.script.pop(0) if self.script else set()
+
+
+def test_wait_for_changes_debounce() -> None:
+    """
+    Test that a burst of changes is collected together.
+    """
+    a, b, c = pathlib.Path("a"), pathlib.Path("b"), pathlib.Path("c")
+    watcher = _ScriptedWatcher([set(), {a}, {b}, set(), {c}])
+
+    assert watch.wait_for_changes(watcher) == {a, b}  # ty:ignore[invalid-argument-type]
+    assert watch.wait_for_changes(watcher) == {c}  # ty:ignore[invalid-argument-type]
+
+
+def test_watch_tasks(
+    workspace: pathlib.Path, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that only affected tasks and their dependents are executed again.
+    """
+    monkeypatch.setenv("VTR_NO_CACHE", "1")
+    mocker.patch.object(
+        watch,
+        "wait_for_changes",
+        side_effect=[
+            {workspace / "src" / "main.h"},
+            {workspace / "src" / "main.c"},
+            KeyboardInterrupt,
+        ],
+    )
+
+    assert watch.watch_tasks([task_obj(str(workspace), "All")], extra_args=[]) == 0
+
+    runs = (workspace / "runs.txt").read_text().splitlines()
+    initial = sorted(runs[:3])
+    assert initial == ["compile", "lint", "package"]
+    # a header change only affects the task without declared inputs
+    assert runs[3:4] == ["lint"]
+    # a source change affects the compile task, and the task that depends on it
+    assert sorted(runs[4:]) == ["compile", "lint", "package"]
@@ -0,0 +1,293 @@
+"""
+Execution engine that runs every task from a single asyncio event loop,
+instead of a thread per task plus threads per output stream.
+"""
+
+import asyncio
+import contextlib
+import subprocess
+import sys
+import time
+from typing import AsyncGenerator, Optional
+
+from vscode_task_runner.background import BackgroundTasks
+from vscode_task_runner.executor import (
+    TaskAttempt,
+    TaskExecution,
+    cancel_running_tasks,
+    execute_virtual_task,
+    task_output_prefix,
+)
+from vscode_task_runner.graph import TaskNode
+from vscode_task_runner.jobserver import JobServer
+from vscode_task_runner.models.enums import OutputStreamEnum
+from vscode_task_runner.models.task import Task
+from vscode_task_runner.output import CHUNK_SIZE, LineBuffer, print_lines
+from vscode_task_runner.problems import ProblemMatchers
+from vscode_task_runner.processes import RunningProcesses
+from vscode_task_runner.scheduler import Scheduler
+from vscode_task_runner.spec import ExecSpec
+
+
+def run_scheduler(
+    scheduler: Scheduler,
+    specs: dict[TaskNode, ExecSpec],
+    job_server: Optional[JobServer],
+    background: BackgroundTasks,
+) -> None:
+    """
+    Execute all the tasks from the scheduler in an asyncio event loop, as compiled
+    in the given specs, taking a token from the jobserver for each, if there is one.
+    Background tasks are started with the given background tasks instead.
+    """
+    processes = RunningProcesses()
+
+    try:
+        asyncio.run(_run_scheduler(scheduler, specs, processes, job_server, background))
+    except KeyboardInterrupt:
+        # tasks running in their own session don't see Ctrl+C
+        processes.cancel()
+        raise
+
+
+async def _run_scheduler(
+    scheduler: Scheduler,
+    specs: dict[TaskNode, ExecSpec],
+    processes: RunningProcesses,
+    job_server: Optional[JobServer],
+    background: BackgroundTasks,
+) -> None:
+    """
+    Execute all the tasks from the scheduler.
+    """
+    # tasks that are currently executing
+    running: dict[asyncio.Future, TaskNode] = {}
+
+    while not scheduler.finished:
+        for launch in scheduler.start():
+            spec = specs[launch.node]
+            if spec.background:
+                running[
+                    asyncio.wrap_future(
+                        background.start(
+                            launch.node.task, spec, launch.index, scheduler.total
+                        )
+                    )
+                ] = launch.node
+                continue
+
+            future = asyncio.ensure_future(
+                execute_task(
+                    launch.node.task,
+                    spec,
+                    launch.index,
+                    scheduler.total,
+                    launch.parallel,
+                    processes,
+                    job_server,
+                )
+            )
+            running[future] = launch.node
+
+        if not running:
+            continue
+
+        # wait for at least one task to finish
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+        # raise any exceptions
+        for future in done:
+            future.result()
+
+        scheduler.finish([running.pop(future) for future in done])
+        cancel_running_tasks(scheduler, processes, background)
+
+
+async def _print_stream(
+    stream: Optional[asyncio.StreamReader],
+    prefix: str,
+    output: OutputStreamEnum,
+    captured: Optional[bytearray],
+    problem_matchers: Optional[ProblemMatchers],
+) -> tuple[Optional[float], int]:
+    """
+    Read output from a task output stream and print it line by line with the
+    given prefix until the stream is closed. Optionally keeps a copy of the raw
+    output, and scans it with problem matchers.
+
+    Returns when the first output arrived, from `time.perf_counter`, if any did,
+    and how many bytes of output were read.
+    """
+    assert stream is not None
+    lines = LineBuffer(prefix, problem_matchers)
+    first_output = None
+    size = 0
+
+    while chunk := await stream.read(CHUNK_SIZE):
+        if first_output is None:
+            first_output = time.perf_counter()
+
+        size += len(chunk)
+
+        if captured is not None:
+            captured.extend(chunk)
+
+        print_lines(lines.feed(chunk), output)
+
+    print_lines(lines.flush(), output)
+    return first_output, size
+
+
+async def _wait_cancelled(processes: RunningProcesses, timeout: float) -> bool:
+    """
+    Wait up to the timeout in seconds for running tasks to be cancelled,
+    without blocking the event loop. Returns if they were.
+    """
+    deadline = time.monotonic() + timeout
+    while not processes.cancelling and (remaining := deadline - time.monotonic()) > 0:
+        await asyncio.sleep(min(remaining, 0.1))
+
+    return processes.cancelling
+
+
+@contextlib.asynccontextmanager
+async def _job_token(
+    job_server: Optional[JobServer], processes: RunningProcesses
+) -> AsyncGenerator[bool, None]:
+    """
+    Hold a token from the jobserver while a task executes, if there is one.
+    Yields whether the task can start, which it can't if running tasks
+    were cancelled while waiting for a token.
+    """
+    if job_server is None:
+        yield True
+        return
+
+    loop = asyncio.get_running_loop()
+    while (token := job_server.try_acquire()) is None:
+        if processes.cancelling:
+            yield False
+            return
+
+        # wait for a token to be put back, or to check for cancelling again
+        readable = loop.create_future()
+        loop.add_reader(
+            job_server.read_fd,
+            lambda: readable.done() or readable.set_result(None),
+        )
+        try:
+            await asyncio.wait({readable}, timeout=0.1)
+        finally:
+            loop.remove_reader(job_server.read_fd)
+
+    try:
+        yield True
+    finally:
+        job_server.release(token)
+
+
+async def _run_task_process(
+    task: Task,
+    spec: ExecSpec,
+    index: int,
+    parallel: bool,
+    capture: bool,
+    processes: RunningProcesses,
+    job_server: Optional[JobServer],
+) -> tuple[Optional[bytearray], Optional[bytearray]]:
+    """
+    Execute the command of a task once, and record the result.
+    Returns the standard output and error of the task if they were captured.
+    """
+    attempt = TaskAttempt(task, spec, parallel, capture)
+    proc = await asyncio.create_subprocess_exec(
+        *attempt.cmd,
+        cwd=spec.cwd_use(),
+        env=spec.env_use(),
+        stdout=subprocess.PIPE if attempt.pipe_output else sys.stdout,
+        stderr=subprocess.PIPE if attempt.pipe_output else sys.stderr,
+        start_new_session=attempt.own_group,
+        pass_fds=job_server.pass_fds if job_server is not None else (),
+    )
+    attempt.spawned(proc, processes)
+
+    stdout = bytearray() if capture else None
+    stderr = bytearray() if capture else None
+    first_output = None
+    output_size = None
+
+    if attempt.pipe_output:
+        prefix = task_output_prefix(task, index) if parallel else ""
+        matchers = attempt.problem_matchers
+        streams = await asyncio.gather(
+            _print_stream(
+                proc.stdout, prefix, OutputStreamEnum.stdout, stdout, matchers
+            ),
+            _print_stream(
+                proc.stderr, prefix, OutputStreamEnum.stderr, stderr, matchers
+            ),
+        )
+
+        if received := [first for first, _ in streams if first is not None]:
+            first_output = min(received)
+        output_size = sum(size for _, size in streams)
+
+    returncode = await proc.wait()
+    # the event loop waits for the process itself, so the resources
+    # it used are not known
+    attempt.finished(returncode, None, processes, first_output, output_size)
+    return stdout, stderr
+
+
+async def execute_task(
+    task: Task,
+    spec: ExecSpec,
+    index: int,
+    total: int,
+    parallel: bool,
+    processes: RunningProcesses,
+    job_server: Optional[JobServer] = None,
+) -> int:
+    """
+    Actually execute the task. Takes the task object, how to execute it, current
+    index, total number, whether this is a parallel task, the running processes
+    to track the process in, and the jobserver to hold a token from while the
+    task runs. A task that fails is retried, if it allows retries.
+
+    Returns the exit code of the task.
+    """
+    if spec.virtual:
+        return execute_virtual_task(task, index, total)
+
+    execution = TaskExecution(task, spec, index, total, parallel)
+    with execution.context():
+        if (returncode := execution.replay()) is not None:
+            return returncode
+
+        while True:
+            async with _job_token(job_server, processes) as started:
+                if not started:
+                    return execution.cancelled()
+
+                execution.start()
+                stdout, stderr = await _run_task_process(
+                    task,
+                    spec,
+                    index,
+                    parallel,
+                    execution.capture,
+                    processes,
+                    job_server,
+                )
+
+            if (delay := execution.retry(processes)) is None:
+                break
+
+            # stop waiting if another task fails in the meantime
+            if await _wait_cancelled(processes, delay):
+                break
+
+        return execution.finish(
+            bytes(stdout) if stdout is not None else None,
+            bytes(stderr) if stderr is not None else None,
+        )
@@ -0,0 +1,231 @@
+"""
+Background tasks, such as development servers and compilers in watch mode,
+which keep running. Once the output of a background task shows it is ready,
+the tasks that depend on it are started. Background tasks are stopped
+once everything else has finished.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from vscode_task_runner import history, metrics, printer, tracing
+from vscode_task_runner.executor import (
+    print_task_start,
+    record_task_result,
+    task_output_prefix,
+)
+from vscode_task_runner.models.enums import OutputStreamEnum, TaskExecutionStateEnum
+from vscode_task_runner.models.problem_matcher import js_regex
+from vscode_task_runner.models.task import Task
+from vscode_task_runner.problems import task_problem_matchers
+from vscode_task_runner.output import CHUNK_SIZE, LineBuffer, print_lines
+from vscode_task_runner.processes import RunningProcesses, wait_process
+from vscode_task_runner.spec import ExecSpec
+
+
+def ready_pattern(task: Task) -> Optional[re.Pattern]:
+    """
+    Return the pattern that shows a background task is ready, from the
+    `endsPattern` of the first problem matcher that has one.
+    """
+    for matcher in task.problem_matchers_use():
+        background = matcher.background_use()
+        if background is not None and background.ends_pattern is not None:
+            return js_regex(background.ends_pattern.regexp)
+
+    return None
+
+
+class BackgroundTasks:
+    """
+    The background tasks started during a run. Use as a context manager
+    to stop them all when the run ends.
+    """
+
+    def __init__(self) -> None:
+        self._processes = RunningProcesses()
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> BackgroundTasks:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def start(
+        self, task: Task, spec: ExecSpec, index: int, total: int
+    ) -> concurrent.futures.Future:
+        """
+        Start a background task. Returns a future that is resolved with the
+        exit code of the task once it is ready, or once it exits if that is sooner.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._run,
+            args=(task, spec, index, total, future),
+            name=f"background-{task.label}",
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+        return future
+
+    def terminate(self) -> None:
+        """
+        Stop every background task, without waiting for them to exit.
+        """
+        if self._processes.cancelling:
+            return
+
+        if labels := self._processes.cancel():
+            printer.info(
+                "Stopping background task"
+                + "s" * (len(labels) > 1)
+                + " "
+                + ", ".join(printer.yellow(label) for label in labels)
+            )
+
+    def stop(self) -> None:
+        """
+        Stop every background task, and wait for them to exit.
+        """
+        if not self._threads:
+            return
+
+        self.terminate()
+
+        for thread in self._threads:
+            thread.join()
+
+    def _run(
+        self,
+        task: Task,
+        spec: ExecSpec,
+        index: int,
+        total: int,
+        future: concurrent.futures.Future,
+    ) -> None:
+        """
+        Run a background task, printing its output, until it exits.
+        """
+        try:
+            with tracing.task_span(task):
+                self._run_process(task, spec, index, total, future)
+        except Exception as e:
+            if future.done():
+                raise
+
+            # let the execution engine raise it
+            future.set_exception(e)
+
+    def _run_process(
+        self,
+        task: Task,
+        spec: ExecSpec,
+        index: int,
+        total: int,
+        future: concurrent.futures.Future,
+    ) -> None:
+        """
+        Start the process of a background task, and resolve the future
+        once it is ready.
+        """
+        cmd = spec.argv_use()
+        print_task_start(task, cmd, index, total)
+
+        start_time = time.monotonic()
+        started_at = time.time()
+        pattern = ready_pattern(task)
+        if pattern is None:
+            printer.info(
+                f"Task {printer.yellow(task.label)} has no problem matcher with "
+                + "an endsPattern to tell when it is ready, continuing right away"
+            )
+
+        # the task keeps running alongside its dependents, so always give its
+        # output a prefix, and scan standard output and error together
+        # like VS Code scans the terminal
+        own_group = os.name != "nt"
+        spawn_start = time.perf_counter()
+        proc = subprocess.Popen(
+            args=cmd,
+            shell=False,
+            cwd=spec.cwd_use(),
+            env=spec.env_use(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=own_group,
+        )
+        metrics.task_spawned(task.label, time.perf_counter() - spawn_start)
+        tracing.instant(task.label, "spawn", pid=proc.pid)
+        self._processes.add(task, proc, own_group, None)
+
+        def ready() -> None:
+            tracing.instant(task.label, "ready")
+            task._execution_duration = time.monotonic() - start_time
+            task._execution_returncode = 0
+            task._execution_state = TaskExecutionStateEnum.completed
+            metrics.task_finished(task)
+            printer.info(
+                f"Task {printer.yellow(task.label)} is ready after "
+                + f"{task._execution_duration:.1f}s, continuing in the background"
+            )
+            future.set_result(0)
+
+        if pattern is None:
+            ready()
+
+        prefix = task_output_prefix(task, index)
+        lines = LineBuffer("", task_problem_matchers(task))
+        assert proc.stdout is not None
+
+        def scan(new_lines: list[str]) -> None:
+            print_lines([prefix + line for line in new_lines], OutputStreamEnum.stdout)
+
+            if (
+                pattern is not None
+                and not future.done()
+                and any(pattern.search(line) for line in new_lines)
+            ):
+                ready()
+
+        if chunk := os.read(proc.stdout.fileno(), CHUNK_SIZE):
+            tracing.instant(task.label, "first output")
+
+        size = 0
+        while chunk:
+            size += len(chunk)
+            scan(lines.feed(chunk))
+            chunk = os.read(proc.stdout.fileno(), CHUNK_SIZE)
+
+        scan(lines.flush())
+        proc.stdout.close()
+
+        usage = wait_process(proc)
+        task._execution_usage = usage
+        tracing.instant(task.label, "exit", returncode=proc.returncode)
+        metrics.task_output(task.label, size)
+        history.record_execution(
+            task.label, cmd, started_at, time.time(), proc.returncode, usage
+        )
+        stopped_state = self._processes.remove(task)
+        returncode = proc.returncode
+
+        if not future.done():
+            # exited, or was stopped, before it was ready
+            record_task_result(task, returncode, start_time, stopped_state)
+            metrics.task_finished(task)
+            future.set_result(task._execution_returncode)
+
+        elif stopped_state is None and returncode != 0:
+            printer.error(
+                f"Background task {printer.yellow(task.label)} exited with code {returncode}"
+            )
@@ -0,0 +1,164 @@
+"""
+Cache of task results. A task that declares its inputs is skipped if it has
+already completed successfully with the exact same command, working directory,
+environment, and input files. Its output is replayed and its declared
+outputs are restored instead.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from vscode_task_runner.history import state_dir
+from vscode_task_runner.models.task import Task
+
+CACHE_VERSION = 1
+"""
+Version of the cache format. Changing this invalidates every cached result.
+"""
+
+STDOUT_FILE = "stdout"
+STDERR_FILE = "stderr"
+OUTPUTS_FILE = "outputs.tar"
+
+
+class CachedResult(NamedTuple):
+    stdout: bytes
+    """
+    Raw standard output of the task.
+    """
+    stderr: bytes
+    """
+    Raw standard error of the task.
+    """
+    outputs: Path
+    """
+    Archive of the files the task created.
+    """
+
+
+def cache_dir() -> Path:
+    """
+    Returns the directory cached results are stored in.
+    """
+    return state_dir() / "cache"
+
+
+def is_cacheable(task: Task) -> bool:
+    """
+    Returns if the result of a task can be cached. Tasks must declare their inputs,
+    and caching can be disabled with the VTR_NO_CACHE environment variable.
+    """
+    return bool(task.vtr.inputs) and not os.environ.get("VTR_NO_CACHE")
+
+
+def _glob_files(cwd: Path, patterns: list[str]) -> list[Path]:
+    """
+    Return all files matching the given glob patterns, relative
+    to the working directory, sorted.
+    """
+    files = {
+        path.relative_to(cwd)
+        for pattern in patterns
+        for path in cwd.glob(pattern)
+        if path.is_file()
+    }
+    return sorted(files)
+
+
+def _hash_file(path: Path) -> str:
+    """
+    Return the hash of the contents of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        while chunk := fp.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def cache_key(task: Task, cmd: list[str]) -> str:
+    """
+    Given a task and the fully resolved command to run it, return the
+    key its result is cached under.
+    """
+    cwd = task.cwd_use()
+    env = task.env_use()
+
+    data = {
+        "version": CACHE_VERSION,
+        "cmd": cmd,
+        "cwd": str(cwd),
+        # only the variables the task sets itself, or says it cares about
+        "env": {
+            **{name: env.get(name) for name in task.vtr.input_env},
+            **task._new_env(),
+        },
+        "inputs": [
+            [path.as_posix(), _hash_file(cwd / path)]
+            for path in _glob_files(cwd, task.vtr.inputs)
+        ],
+    }
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load(key: str) -> Optional[CachedResult]:
+    """
+    Return the cached result for a key, if there is one.
+    """
+    entry_dir = cache_dir() / key
+
+    try:
+        return CachedResult(
+            stdout=(entry_dir / STDOUT_FILE).read_bytes(),
+            stderr=(entry_dir / STDERR_FILE).read_bytes(),
+            outputs=entry_dir / OUTPUTS_FILE,
+        )
+    except OSError:
+        return None
+
+
+def restore_outputs(task: Task, result: CachedResult) -> None:
+    """
+    Restore the files a task created from a cached result.
+    """
+    with tarfile.open(result.outputs, "r") as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(task.cwd_use(), filter="data")
+        else:  # pragma: no cover
+            tar.extractall(task.cwd_use())
+
+
+def save(key: str, task: Task, stdout: bytes, stderr: bytes) -> None:
+    """
+    Cache the result of a task that completed successfully.
+    Failing to save is not an error, the task will just be run again next time.
+    """
+    entry_dir = cache_dir() / key
+    cwd = task.cwd_use()
+    temp_dir: Optional[Path] = None
+
+    try:
+        cache_dir().mkdir(parents=True, exist_ok=True)
+
+        # build the entry in a temporary directory first,
+        # so a partial entry is never used
+        temp_dir = Path(tempfile.mkdtemp(dir=cache_dir()))
+        (temp_dir / STDOUT_FILE).write_bytes(stdout)
+        (temp_dir / STDERR_FILE).write_bytes(stderr)
+
+        with tarfile.open(temp_dir / OUTPUTS_FILE, "w") as tar:
+            for path in _glob_files(cwd, task.vtr.outputs):
+                tar.add(cwd / path, arcname=path.as_posix())
+
+        os.replace(temp_dir, entry_dir)
+    except OSError:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
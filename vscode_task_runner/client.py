@@ -0,0 +1,199 @@
+"""
+Thin client for the daemon. This is the entry point for the console application,
+so it only imports the standard library. If no daemon is running, the
+console application is run in this process instead.
+"""
+
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+HEADER = struct.Struct("!I")
+"""
+Header sent before a request, with the length of the request.
+"""
+
+
+def socket_path() -> Path:
+    """
+    Return the path of the socket the daemon listens on. This is set by the
+    VTR_DAEMON_SOCKET environment variable, and defaults to a socket in
+    `$XDG_RUNTIME_DIR`, or a private per-user directory in the temporary
+    directory if that is not set.
+    """
+    if env_value := os.environ.get("VTR_DAEMON_SOCKET"):
+        return Path(env_value)
+
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime_dir, "vscode-task-runner.sock")
+
+    return Path(
+        tempfile.gettempdir(), f"vscode-task-runner-{os.getuid()}", "daemon.sock"
+    )
+
+
+def is_private_dir(path: Path) -> bool:
+    """
+    Returns if a directory is owned by the current user, and no other user
+    can create or replace files in it.
+    """
+    try:
+        stat_result = os.lstat(path)
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISDIR(stat_result.st_mode)
+        and stat_result.st_uid == os.getuid()
+        and not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _is_own_daemon(sock: socket.socket, path: Path) -> bool:
+    """
+    Returns if a connected socket is a daemon run by the current user. Nothing
+    is sent to a daemon run by anyone else, as the request includes the
+    environment and standard streams of this process.
+    """
+    if not is_private_dir(path.parent):
+        return False
+
+    try:
+        stat_result = os.lstat(path)
+    except OSError:
+        return False
+
+    if not stat.S_ISSOCK(stat_result.st_mode) or stat_result.st_uid != os.getuid():
+        return False
+
+    # check the process on the other end too, where the system tells us
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = struct.Struct("3i")
+        _, uid, _ = credentials.unpack(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size)
+        )
+        return uid == os.getuid()
+
+    return True
+
+
+def package_fingerprint() -> str:
+    """
+    Return a value that changes whenever the installed package changes,
+    so a client never uses a daemon running different code.
+    """
+    package_dir = Path(__file__).parent
+    newest = max(path.stat().st_mtime_ns for path in package_dir.rglob("*.py"))
+    return f"{package_dir}:{newest}"
+
+
+def leading_options(argv: list[str]) -> list[str]:
+    """
+    Return the options given before any task label. Anything after that
+    is a task label, or an extra argument for a task.
+    """
+    options = []
+    for arg in argv:
+        if not arg.startswith("-") or arg == "--":
+            break
+        options.append(arg)
+
+    return options
+
+
+def run_with_daemon(argv: list[str]) -> Optional[int]:
+    """
+    Run the console application in the daemon, with the standard streams,
+    working directory, and environment of this process.
+
+    Returns the exit code, or None if no daemon could be used.
+    """
+    # file descriptors cannot be sent over sockets on Windows
+    if os.name == "nt" or os.environ.get("VTR_NO_DAEMON"):
+        return None
+
+    path = socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+
+    if not _is_own_daemon(sock, path):
+        sock.close()
+        print(
+            f"Not using the daemon listening on {path}, "
+            + "as it is not private to the current user",
+            file=sys.stderr,
+        )
+        return None
+
+    with sock:
+        request = json.dumps(
+            {
+                "fingerprint": package_fingerprint(),
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "pid": os.getpid(),
+            }
+        ).encode("utf-8")
+
+        # the standard streams are given to the daemon,
+        # so task output goes straight to our terminal
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        socket.send_fds(sock, [HEADER.pack(len(request))], [0, 1, 2])
+        sock.sendall(request)
+
+        responses = sock.makefile("rb")
+
+        # the daemon first replies with the process group running our request
+        started = json.loads(responses.readline() or "null")
+        if not started:
+            # the daemon refused the request
+            return None
+
+        while True:
+            try:
+                finished = json.loads(responses.readline() or "null")
+                break
+            except KeyboardInterrupt:
+                # pass Ctrl+C on to the tasks, like a terminal would
+                os.killpg(started["pgid"], signal.SIGINT)
+
+    if not finished:
+        print("The daemon stopped before the tasks finished", file=sys.stderr)
+        return 1
+
+    return finished["returncode"]
+
+
+def main() -> int:
+    """
+    Run the console application, in the daemon if one is running.
+    This is the entry point for the console application.
+    """
+    # listing tasks is quicker than connecting to the daemon
+    from vscode_task_runner import listing
+
+    if listing.is_listing(sys.argv[1:]):
+        return listing.run(sys.argv[1:])
+
+    # the daemon itself is always started in this process
+    if "--daemon" not in leading_options(sys.argv[1:]):
+        returncode = run_with_daemon(sys.argv[1:])
+        if returncode is not None:
+            return returncode
+
+    from vscode_task_runner import console
+
+    return console.run()
@@ -1,29 +1,52 @@
+import contextlib
 import os
 import shutil
 import sys
 import textwrap
-from typing import List
+from typing import Callable, List, Optional
 
 import colorama
 
-from vscode_task_runner import executor, printer
+from vscode_task_runner import executor, listing, metrics, printer, tracing
+from vscode_task_runner.client import leading_options
 from vscode_task_runner.constants import TASKS_FILE
-from vscode_task_runner.exceptions import TasksFileNotFound
+from vscode_task_runner.exceptions import PlanInvalid, TasksFileNotFound
 from vscode_task_runner.models.arg_parser import ArgParseResult
+from vscode_task_runner.models.enums import ExecutionEngineEnum
 from vscode_task_runner.models.task import TaskTypeEnum
+from vscode_task_runner.models.tasks import Tasks
 from vscode_task_runner.parser import load_tasks
 
-_COMPLETE_FLAG = "--complete"
+_COMPLETE_FLAG = listing.COMPLETE_FLAG
+_LIST_FLAG = listing.LIST_FLAG
+_JSON_FLAG = listing.JSON_FLAG
 _SKIP_SUMMARY_FLAG = "--skip-summary"
 _CONTINUE_ON_ERROR_FLAG = "--continue-on-error"
 _INPUT_FLAG_PREFIX = "--input="
 _DEFAULT_BUILD_TASK_FLAG_PREFIX = "--default-build-task="
-
-
-def parse_args(sys_argv: List[str], task_choices: List[str]) -> ArgParseResult:
+_JOBS_FLAG_PREFIX = "--jobs="
+_JOBS_SHORT_FLAG_PREFIX = "-j"
+_ENGINE_FLAG_PREFIX = "--engine="
+_TIMEOUT_FLAG_PREFIX = "--timeout="
+_RETRIES_FLAG_PREFIX = "--retries="
+_JOBSERVER_FLAG = "--jobserver"
+_TRACE_FLAG_PREFIX = "--trace="
+_METRICS_FILE_FLAG_PREFIX = "--metrics-file="
+_METRICS_PORT_FLAG_PREFIX = "--metrics-port="
+_PLAN_FLAG_PREFIX = "--plan="
+_EXEC_PLAN_FLAG_PREFIX = "--exec-plan="
+_NO_CACHE_FLAG = "--no-cache"
+_WATCH_FLAG = "--watch"
+_DAEMON_FLAG = "--daemon"
+
+
+def parse_args(
+    sys_argv: List[str], task_choices: List[str], require_labels: bool = True
+) -> ArgParseResult:
     """
     Parse arguments from the command line. Split out as seperate function for testing.
     Returns an object with a list of tasks selected, and extra arguments.
+    Task labels are not required when executing a plan, as it selects the tasks.
     """
 
     # structure is:
@@ -66,8 +89,9 @@ def parse_args(sys_argv: List[str], task_choices: List[str]) -> ArgParseResult:
     if "-h" in options or "--help" in options:
         # show help message and exit
         task_labels_str = ",".join(task_choices)
+        engine_choices_str = ",".join(e.value for e in ExecutionEngineEnum)
         main_msg = f"""
-usage: vtr [-h] [{_SKIP_SUMMARY_FLAG}] [{_CONTINUE_ON_ERROR_FLAG}] [{_DEFAULT_BUILD_TASK_FLAG_PREFIX}TASK] [{_INPUT_FLAG_PREFIX}ID=VALUE ...] {{{task_labels_str}}} [{{{task_labels_str}}} ...]
+usage: vtr [-h] [{_LIST_FLAG} [{_JSON_FLAG}]] [{_SKIP_SUMMARY_FLAG}] [{_CONTINUE_ON_ERROR_FLAG}] [{_JOBS_SHORT_FLAG_PREFIX}N, {_JOBS_FLAG_PREFIX}N] [{_ENGINE_FLAG_PREFIX}{{{engine_choices_str}}}] [{_TIMEOUT_FLAG_PREFIX}SECONDS] [{_RETRIES_FLAG_PREFIX}N] [{_JOBSERVER_FLAG}] [{_TRACE_FLAG_PREFIX}FILE] [{_METRICS_FILE_FLAG_PREFIX}FILE] [{_METRICS_PORT_FLAG_PREFIX}PORT] [{_PLAN_FLAG_PREFIX}FILE] [{_EXEC_PLAN_FLAG_PREFIX}FILE] [{_NO_CACHE_FLAG}] [{_WATCH_FLAG}] [{_DAEMON_FLAG}] [{_DEFAULT_BUILD_TASK_FLAG_PREFIX}TASK] [{_INPUT_FLAG_PREFIX}ID=VALUE ...] {{{task_labels_str}}} [{{{task_labels_str}}} ...]
 
 VS Code Task Runner
 
@@ -77,8 +101,22 @@ positional arguments:
 
 options:
 -h, --help            Show this help message and exit
+{_LIST_FLAG}                List the supported tasks and exit. With {_JSON_FLAG}, include their group and dependencies.
 {_SKIP_SUMMARY_FLAG}        Skip creating a CI/CD step summary
 {_CONTINUE_ON_ERROR_FLAG}   Continue executing tasks even if one fails. The final exit code will be 1 if any task failed.
+{_JOBS_SHORT_FLAG_PREFIX}N, {_JOBS_FLAG_PREFIX}N         Maximum number of tasks to execute at once. Defaults to the number of CPUs.
+{_ENGINE_FLAG_PREFIX}ENGINE       Engine to execute tasks with. Defaults to "{ExecutionEngineEnum.threads.value}".
+{_TIMEOUT_FLAG_PREFIX}SECONDS    Stop any task that runs for longer than this. Tasks can set their own timeout.
+{_RETRIES_FLAG_PREFIX}N          Execute failed tasks again up to this many times. Tasks can set their own number of retries.
+{_JOBSERVER_FLAG}           Share the number of jobs with tools like make, cargo, and ninja that tasks run.
+{_TRACE_FLAG_PREFIX}FILE       Write a timeline of the run to a file, which can be opened in Perfetto.
+{_METRICS_FILE_FLAG_PREFIX}FILE Write Prometheus metrics to a file at the end of each run, for the node_exporter textfile collector.
+{_METRICS_PORT_FLAG_PREFIX}PORT Serve Prometheus metrics on localhost while tasks are running.
+{_PLAN_FLAG_PREFIX}FILE        Write a plan of the tasks to a file instead of executing them.
+{_EXEC_PLAN_FLAG_PREFIX}FILE   Execute the tasks of a plan, without reading {TASKS_FILE}. No task labels are needed.
+{_NO_CACHE_FLAG}            Execute every task, even if a cached result is available.
+{_WATCH_FLAG}               Keep executing tasks again when files they depend on change.
+{_DAEMON_FLAG}              Start a daemon that keeps tasks files loaded, for faster startup.
 """
         # last line is the longest, so try to word wrap it to fit in the terminal
         last_line = f'When running a single task, extra args can be appended only to that task. If a single task is requested, but has dependent tasks, only the top-level task will be given the extra arguments. If the task is a "{TaskTypeEnum.process.value}" type, then this will be added to "args". If the task is a "{TaskTypeEnum.shell.value}" type with only a "command" then this will be tacked on to the end and joined by spaces. If the task is a "{TaskTypeEnum.shell.value}" type with a "command" and "args", then this will be appended to "args".'
@@ -96,9 +134,7 @@ options:
         if option == _COMPLETE_FLAG:
             # show list of tasks and exit
             # parse this manually, since normally task labels are required and to make it faster
-            print(
-                "\n".join([_SKIP_SUMMARY_FLAG, _CONTINUE_ON_ERROR_FLAG, *task_choices])
-            )
+            print("\n".join([*listing.COMPLETE_OPTIONS, *task_choices]))
             sys.exit(0)
 
         # manually set environment variable for ourself
@@ -108,6 +144,112 @@ options:
         elif option == _CONTINUE_ON_ERROR_FLAG:
             os.environ["VTR_CONTINUE_ON_ERROR"] = "1"
 
+        elif option.startswith((_JOBS_FLAG_PREFIX, _JOBS_SHORT_FLAG_PREFIX)):
+            # should be in format of
+            # --jobs=4 or -j4
+            if option.startswith(_JOBS_FLAG_PREFIX):
+                jobs = option.removeprefix(_JOBS_FLAG_PREFIX)
+            else:
+                jobs = option.removeprefix(_JOBS_SHORT_FLAG_PREFIX)
+
+            if not jobs.isdigit() or int(jobs) < 1:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_JOBS"] = jobs
+
+        elif option.startswith(_ENGINE_FLAG_PREFIX):
+            engine = option.removeprefix(_ENGINE_FLAG_PREFIX)
+            if engine not in [e.value for e in ExecutionEngineEnum]:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_ENGINE"] = engine
+
+        elif option.startswith(_TIMEOUT_FLAG_PREFIX):
+            # should be in format of
+            # --timeout=300 or --timeout=0.5
+            timeout = option.removeprefix(_TIMEOUT_FLAG_PREFIX)
+            try:
+                valid = float(timeout) > 0
+            except ValueError:
+                valid = False
+
+            if not valid:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_TIMEOUT"] = timeout
+
+        elif option.startswith(_RETRIES_FLAG_PREFIX):
+            # should be in format of
+            # --retries=2
+            retries = option.removeprefix(_RETRIES_FLAG_PREFIX)
+            if not retries.isdigit():
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_RETRIES"] = retries
+
+        elif option == _JOBSERVER_FLAG:
+            os.environ["VTR_JOBSERVER"] = "1"
+
+        elif option.startswith(_TRACE_FLAG_PREFIX):
+            # should be in format of
+            # --trace=out.json
+            trace_file = option.removeprefix(_TRACE_FLAG_PREFIX)
+            if not trace_file:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_TRACE"] = trace_file
+
+        elif option.startswith(_METRICS_FILE_FLAG_PREFIX):
+            # should be in format of
+            # --metrics-file=/var/lib/node_exporter/vtr.prom
+            metrics_file = option.removeprefix(_METRICS_FILE_FLAG_PREFIX)
+            if not metrics_file:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_METRICS_FILE"] = metrics_file
+
+        elif option.startswith(_METRICS_PORT_FLAG_PREFIX):
+            # should be in format of
+            # --metrics-port=9464
+            port = option.removeprefix(_METRICS_PORT_FLAG_PREFIX)
+            if not port.isdigit() or not 0 < int(port) < 65536:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_METRICS_PORT"] = port
+
+        elif option.startswith(_PLAN_FLAG_PREFIX):
+            # should be in format of
+            # --plan=plan.json
+            plan_file = option.removeprefix(_PLAN_FLAG_PREFIX)
+            if not plan_file:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_PLAN"] = plan_file
+
+        elif option.startswith(_EXEC_PLAN_FLAG_PREFIX):
+            # should be in format of
+            # --exec-plan=plan.json
+            plan_file = option.removeprefix(_EXEC_PLAN_FLAG_PREFIX)
+            if not plan_file:
+                printer.error(f"Invalid option: {option}")
+                sys.exit(1)
+
+            os.environ["VTR_EXEC_PLAN"] = plan_file
+
+        elif option == _NO_CACHE_FLAG:
+            os.environ["VTR_NO_CACHE"] = "1"
+
+        elif option == _WATCH_FLAG:
+            os.environ["VTR_WATCH"] = "1"
+
         elif option.startswith(_DEFAULT_BUILD_TASK_FLAG_PREFIX):
             # this is okay if the value is blank
             # will be handled by determine_default_build_task function
@@ -135,7 +277,7 @@ options:
             sys.exit(1)
 
     # finally, validate that at least one task label is provided, and that extra args are only used with a single task
-    if not task_labels:
+    if not task_labels and require_labels:
         printer.error("At least one task label is required.")
         sys.exit(1)
 
@@ -146,17 +288,53 @@ options:
     return ArgParseResult(task_labels=task_labels, extra_args=extra_args)
 
 
-def run() -> int:
+def run(loaded_tasks: Optional[Tasks] = None) -> int:
     """
-    Run the console application.
-    This is the entry point for the console application.
+    Run the console application. The tasks can be given if they
+    have already been loaded, such as by the daemon.
     """
     colorama.just_fix_windows_console()
 
     sys_argv = sys.argv[1:]
 
+    if _DAEMON_FLAG in leading_options(sys_argv):
+        # only import when needed
+        from vscode_task_runner import daemon
+
+        return daemon.serve()
+
+    # list tasks without loading them
+    if listing.is_listing(sys_argv):
+        return listing.run(sys_argv)
+
+    # start recording before the options are parsed,
+    # so loading the tasks file is included
+    if os.environ.get("VTR_TRACE") or any(
+        arg.startswith(_TRACE_FLAG_PREFIX) for arg in leading_options(sys_argv)
+    ):
+        tracing.start()
+
+    # only options before the task labels, the rest may be arguments for a task
+    if os.environ.get("VTR_EXEC_PLAN") or any(
+        arg.startswith(_EXEC_PLAN_FLAG_PREFIX) for arg in leading_options(sys_argv)
+    ):
+        # the plan selects the tasks, so only options are given
+        parse_args(sys_argv, [], require_labels=False)
+        plan_file = os.environ["VTR_EXEC_PLAN"]
+
+        # only import when needed
+        from vscode_task_runner import plan
+
+        try:
+            nodes, specs = plan.load_plan(plan_file)
+        except PlanInvalid as e:
+            printer.error(str(e))
+            return 1
+
+        return _execute(lambda: executor.execute_plan(nodes, specs))
+
     try:
-        tasks = load_tasks()
+        tasks = load_tasks() if loaded_tasks is None else loaded_tasks
     except TasksFileNotFound:
         if _COMPLETE_FLAG not in sys_argv:
             # don't want to provide any output if just completing
@@ -177,8 +355,60 @@ def run() -> int:
     # convert task labels to task objects
     tasks = [tasks.tasks_dict[label] for label in parse_result.task_labels]
 
+    if plan_file := os.environ.get("VTR_PLAN"):
+        # only import when needed
+        from vscode_task_runner import plan
+
+        nodes = executor.plan_tasks(tasks)
+        specs = executor.compile_specs(nodes, parse_result.extra_args)
+        try:
+            plan.save_plan(plan_file, nodes, specs)
+        except OSError as e:
+            printer.error(f"Unable to write plan to {plan_file}: {e}")
+            return 1
+
+        printer.info(f"Wrote plan of {len(nodes)} task(s) to {plan_file}")
+        return 0
+
+    if os.environ.get("VTR_WATCH"):
+        # only import when needed
+        from vscode_task_runner import watch
+
+        return _execute(
+            lambda: watch.watch_tasks(
+                tasks=tasks,
+                extra_args=parse_result.extra_args,
+            )
+        )
+
     # run
-    return executor.execute_tasks(
-        tasks=tasks,
-        extra_args=parse_result.extra_args,
+    return _execute(
+        lambda: executor.execute_tasks(
+            tasks=tasks,
+            extra_args=parse_result.extra_args,
+        )
     )
+
+
+def _execute(execute: Callable[[], int]) -> int:
+    """
+    Execute tasks, recording metrics and the trace of the run if requested.
+    Returns the exit code.
+    """
+    if os.environ.get("VTR_METRICS_FILE") or os.environ.get("VTR_METRICS_PORT"):
+        metrics.start()
+
+    try:
+        with contextlib.ExitStack() as stack:
+            # serve metrics for as long as tasks are being executed
+            if (port := metrics.metrics_port()) is not None:
+                stack.enter_context(metrics.serve(port))
+
+            return execute()
+    finally:
+        metrics.stop()
+        if trace_file := os.environ.get("VTR_TRACE"):
+            try:
+                tracing.save(trace_file)
+            except OSError as e:
+                printer.error(f"Unable to write trace to {trace_file}: {e}")
@@ -1,12 +1,13 @@
+from __future__ import annotations
+
 import os
 import platform
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Callable, Dict
 
 from vscode_task_runner.models.enums import PlatformEnum, ShellTypeEnum
-from vscode_task_runner.models.shell import (
-    ShellQuotingOptions,
-    ShellQuotingOptionsEscape,
-)
+
+if TYPE_CHECKING:
+    from vscode_task_runner.models.shell import ShellQuotingOptions  # pragma: no cover
 
 # Current OS
 CURRENT_PLATFORM = PlatformEnum(platform.system())
@@ -15,34 +16,70 @@ CURRENT_PLATFORM = PlatformEnum(platform.system())
 TASKS_FILE = os.path.join(".vscode", "tasks.json")
 CODE_WORKSPACE_SUFFIX = ".code-workspace"
 
-# https://github.com/microsoft/vscode/blob/ab7c32a5b5275c3fa9552675b6b6035888068fd7/src/vs/workbench/contrib/tasks/browser/terminalTaskSystem.ts#L163-L191
-DEFAULT_SHELL_QUOTING = {
-    ShellTypeEnum.CMD: ShellQuotingOptions(strong='"'),
-    ShellTypeEnum.PowerShell: ShellQuotingOptions(
-        escape=ShellQuotingOptionsEscape(
-            escapeChar="`", charsToEscape=[" ", '"', "'", "(", ")"]
+
+def _default_shell_quoting() -> Dict[ShellTypeEnum, ShellQuotingOptions]:
+    """
+    Shell quoting settings that are used for each shell type.
+    """
+    # only import when needed, so importing the constants doesn't import pydantic
+    from vscode_task_runner.models.shell import (
+        ShellQuotingOptions,
+        ShellQuotingOptionsEscape,
+    )
+
+    # https://github.com/microsoft/vscode/blob/ab7c32a5b5275c3fa9552675b6b6035888068fd7/src/vs/workbench/contrib/tasks/browser/terminalTaskSystem.ts#L163-L191
+    return {
+        ShellTypeEnum.CMD: ShellQuotingOptions(strong='"'),
+        ShellTypeEnum.PowerShell: ShellQuotingOptions(
+            escape=ShellQuotingOptionsEscape(
+                escapeChar="`", charsToEscape=[" ", '"', "'", "(", ")"]
+            ),
+            strong="'",
+            weak='"',
         ),
-        strong="'",
-        weak='"',
-    ),
-    # zsh is the exact same as bash, so combine the 2
-    ShellTypeEnum.SH: ShellQuotingOptions(
-        escape=ShellQuotingOptionsEscape(
-            escapeChar="\\", charsToEscape=[" ", '"', "'"]
+        # zsh is the exact same as bash, so combine the 2
+        ShellTypeEnum.SH: ShellQuotingOptions(
+            escape=ShellQuotingOptionsEscape(
+                escapeChar="\\", charsToEscape=[" ", '"', "'"]
+            ),
+            strong="'",
+            weak='"',
         ),
-        strong="'",
-        weak='"',
-    ),
-}
-"""
-Shell quoting settings that are used for each shell type.
-"""
+    }
 
-DEFAULT_OS_QUOTING: Dict[PlatformEnum, ShellQuotingOptions] = {
-    PlatformEnum.linux: DEFAULT_SHELL_QUOTING[ShellTypeEnum.SH],
-    PlatformEnum.osx: DEFAULT_SHELL_QUOTING[ShellTypeEnum.SH],
-    PlatformEnum.windows: DEFAULT_SHELL_QUOTING[ShellTypeEnum.PowerShell],
+
+def _default_os_quoting() -> Dict[PlatformEnum, ShellQuotingOptions]:
+    """
+    Shell quoting settings that are used by default for each OS.
+    """
+    shell_quoting = __getattr__("DEFAULT_SHELL_QUOTING")
+    return {
+        PlatformEnum.linux: shell_quoting[ShellTypeEnum.SH],
+        PlatformEnum.osx: shell_quoting[ShellTypeEnum.SH],
+        PlatformEnum.windows: shell_quoting[ShellTypeEnum.PowerShell],
+    }
+
+
+_LAZY_CONSTANTS: Dict[str, Callable[[], Any]] = {
+    "DEFAULT_SHELL_QUOTING": _default_shell_quoting,
+    "DEFAULT_OS_QUOTING": _default_os_quoting,
 }
 """
-Shell quoting settings that are used by default for each OS.
+Constants that are only built the first time they are used.
 """
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Build lazy constants the first time they are used, and keep them.
+    """
+    if name in globals():
+        # already built
+        return globals()[name]
+
+    if name not in _LAZY_CONSTANTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = _LAZY_CONSTANTS[name]()
+    globals()[name] = value
+    return value
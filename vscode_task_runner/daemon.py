@@ -0,0 +1,284 @@
+"""
+Daemon that keeps the package imported and tasks files loaded, so the console
+application starts almost instantly. Clients send their arguments, working
+directory, environment, and standard streams over a Unix socket. Each request
+is run in a forked copy of the daemon, which writes straight to the client's
+terminal and reports the exit code back.
+"""
+
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import NoReturn, Optional
+
+# the console application only imports these when they are needed,
+# import them once here so forked copies of the daemon don't have to
+import questionary  # noqa: F401
+import shellingham  # noqa: F401
+
+from vscode_task_runner import client, console, printer
+from vscode_task_runner.constants import CODE_WORKSPACE_SUFFIX, TASKS_FILE
+from vscode_task_runner.models.tasks import Tasks
+from vscode_task_runner.parser import load_tasks, set_runtime_variables
+from vscode_task_runner.variables.runtime import INPUTS, RUNTIME_VARIABLES
+
+_workspaces: dict[str, tuple[tuple, Tasks]] = {}
+"""
+Loaded tasks for each workspace, along with the state of the tasks files
+they were loaded from.
+"""
+
+
+def _tasks_files_state(cwd: str) -> tuple:
+    """
+    Return the modification time and size of every file tasks could be loaded
+    from in a workspace. If this changes, the tasks need to be loaded again.
+    """
+    paths = [Path(cwd, TASKS_FILE), *Path(cwd).glob(f"*{CODE_WORKSPACE_SUFFIX}")]
+    state = []
+
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+
+        state.append((str(path), stat.st_mtime_ns, stat.st_size))
+
+    return tuple(state)
+
+
+def load_workspace(cwd: str) -> Optional[Tasks]:
+    """
+    Return the tasks for a workspace, loading them again only if the
+    tasks files have changed. Returns None if the tasks could not be loaded,
+    so the error is reported to the client when they are loaded again.
+    """
+    state = _tasks_files_state(cwd)
+
+    if (cached := _workspaces.get(cwd)) and cached[0] == state:
+        return cached[1]
+
+    try:
+        tasks = load_tasks(cwd)
+    except Exception:
+        _workspaces.pop(cwd, None)
+        return None
+
+    _workspaces[cwd] = (state, tasks)
+    return tasks
+
+
+def _receive_exactly(conn: socket.socket, size: int) -> bytes:
+    """
+    Receive exactly the given number of bytes.
+    """
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Client disconnected")
+
+        data += chunk
+
+    return data
+
+
+def _console_returncode(tasks: Optional[Tasks]) -> int:
+    """
+    Run the console application and return its exit code,
+    the same way the Python interpreter would determine it.
+    """
+    try:
+        return console.run(loaded_tasks=tasks)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except BaseException:
+        traceback.print_exc()
+        return 1
+
+
+def _run_request(
+    server: socket.socket,
+    conn: socket.socket,
+    fds: list[int],
+    request: dict,
+    tasks: Optional[Tasks],
+) -> NoReturn:
+    """
+    Run a request from a client. This runs in a forked copy of the daemon,
+    and never returns.
+    """
+    returncode = 1
+
+    try:
+        server.close()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        # use a process group of our own, so the client can pass Ctrl+C
+        # on to us and the tasks
+        os.setpgid(0, 0)
+        # we are not in the foreground of the terminal, so reading from it
+        # would stop the process instead of failing
+        signal.signal(signal.SIGTTIN, signal.SIG_IGN)
+
+        # take over the standard streams, working directory and environment of the client
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.environ["VTR_SHELL_PID"] = str(request["pid"])
+
+        # refresh anything that was determined when the daemon started
+        importlib.reload(printer)
+        RUNTIME_VARIABLES.clear()
+        INPUTS.clear()
+        if tasks is not None:
+            set_runtime_variables(tasks)
+
+        sys.argv = [sys.argv[0], *request["argv"]]
+        conn.sendall(json.dumps({"pgid": os.getpid()}).encode("utf-8") + b"\n")
+
+        returncode = _console_returncode(tasks)
+
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        try:
+            conn.sendall(json.dumps({"returncode": returncode}).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+
+        os._exit(returncode)
+
+
+def _handle_connection(
+    server: socket.socket, conn: socket.socket, fingerprint: str
+) -> None:
+    """
+    Receive a request from a client, and start running it.
+    """
+    header, fds, _, _ = socket.recv_fds(conn, client.HEADER.size, 3)
+
+    try:
+        if len(fds) != 3 or not header:
+            return
+
+        header += _receive_exactly(conn, client.HEADER.size - len(header))
+        (length,) = client.HEADER.unpack(header)
+        request = json.loads(_receive_exactly(conn, length))
+
+        if request["fingerprint"] != fingerprint:
+            # closing the connection makes the client run the request itself
+            printer.error("Refusing a client with a different version installed")
+            return
+
+        tasks = load_workspace(request["cwd"])
+
+        # don't let buffered output be written twice
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        if os.fork() == 0:
+            _run_request(server, conn, fds, request, tasks)
+
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def _reap_workers() -> None:
+    """
+    Clean up forked copies of the daemon that have finished.
+    """
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def serve() -> int:
+    """
+    Run the daemon until interrupted or terminated.
+    """
+    if os.name == "nt":
+        printer.error("The daemon is not supported on Windows")
+        return 1
+
+    path = client.socket_path()
+    fingerprint = client.package_fingerprint()
+
+    # clients only trust a socket in a directory no other user can write to
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not client.is_private_dir(path.parent):
+        printer.error(
+            f"Directory {path.parent} must only be writable by the current user"
+        )
+        return 1
+
+    if path.exists():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(path))
+            except OSError:
+                # left over from a daemon that did not exit cleanly
+                path.unlink()
+            else:
+                printer.error(f"A daemon is already listening on {path}")
+                return 1
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # only the current user can connect
+    umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+
+    server.listen()
+    # wake up regularly to clean up finished workers
+    server.settimeout(1.0)
+
+    # stop cleanly when terminated
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    printer.info(f"Daemon listening on {printer.blue(str(path))}")
+
+    try:
+        while True:
+            _reap_workers()
+
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+
+            with conn:
+                conn.settimeout(None)
+                try:
+                    _handle_connection(server, conn, fingerprint)
+                except (OSError, ValueError, KeyError) as e:
+                    printer.error(f"Invalid request from client: {e}")
+
+    except KeyboardInterrupt:
+        return 0
+
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
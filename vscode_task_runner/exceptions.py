@@ -63,3 +63,45 @@ class BadInputEnvironmentVariable(Exception):
     Raised when a task input provided by an environment variable is not one
     of the selections.
     """
+
+
+class InvalidJobs(Exception):
+    """
+    Raised when the number of jobs to run at once is not a positive integer.
+    """
+
+
+class InvalidResources(Exception):
+    """
+    Raised when the resources available to tasks are not valid.
+    """
+
+
+class InvalidRetries(Exception):
+    """
+    Raised when the number of retries for tasks is not a non-negative integer.
+    """
+
+
+class InvalidTimeout(Exception):
+    """
+    Raised when the timeout for tasks is not a positive number.
+    """
+
+
+class UnsupportedEngine(Exception):
+    """
+    Raised when the requested execution engine is not supported.
+    """
+
+
+class InvalidMetricsPort(Exception):
+    """
+    Raised when the port to serve metrics on is not a valid port.
+    """
+
+
+class PlanInvalid(Exception):
+    """
+    Raised when a run plan can't be read, or was not written by this version.
+    """
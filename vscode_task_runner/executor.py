@@ -1,29 +1,64 @@
 import concurrent.futures
+import contextlib
 import os
-import queue
 import subprocess
 import sys
-import threading
-from typing import NamedTuple, Optional, TextIO
-
-from vscode_task_runner import printer
-from vscode_task_runner.exceptions import MissingCommand
+import time
+from typing import TYPE_CHECKING, ContextManager, Generator, Optional
+
+from vscode_task_runner import (
+    cache,
+    history,
+    jobserver,
+    metrics,
+    printer,
+    problems,
+    resources,
+    tracing,
+)
+from vscode_task_runner.exceptions import (
+    InvalidJobs,
+    InvalidRetries,
+    InvalidTimeout,
+    MissingCommand,
+    UnsupportedEngine,
+)
+from vscode_task_runner.graph import TaskNode, assign_priorities, build_task_graph
+from vscode_task_runner.history import ResourceUsage
 from vscode_task_runner.models.enums import (
-    DependsOrderEnum,
+    ExecutionEngineEnum,
     OutputStreamEnum,
     TaskExecutionStateEnum,
     TaskTypeEnum,
 )
 from vscode_task_runner.models.strings import csc_value
 from vscode_task_runner.models.task import Task
+from vscode_task_runner.output import (
+    LineBuffer,
+    OutputMultiplexer,
+    TaskOutput,
+    print_lines,
+)
+from vscode_task_runner.processes import (
+    Process,
+    RunningProcesses,
+    new_process_group,
+    wait_process,
+)
+from vscode_task_runner.scheduler import Scheduler
+from vscode_task_runner.spec import ExecSpec
 from vscode_task_runner.utils.paths import which_resolver
 from vscode_task_runner.utils.strings import joiner
 from vscode_task_runner.vscode import task_configuration, terminal_task_system
 
+if TYPE_CHECKING:
+    from vscode_task_runner.background import BackgroundTasks
+
 
-class OutputLine(NamedTuple):
-    text: str
-    stream: OutputStreamEnum
+TIMEOUT_RETURNCODE = 124
+"""
+Exit code of a task that timed out, the same as the `timeout` command.
+"""
 
 
 def is_virtual_task(task: Task) -> bool:
@@ -34,11 +69,21 @@ def is_virtual_task(task: Task) -> bool:
     return not bool(task.command_use()) and bool(task.depends_on)
 
 
+def is_background_task(task: Task) -> bool:
+    """
+    Returns if a task keeps running in the background,
+    alongside the tasks that depend on it.
+    """
+    return task.is_background_use() and not is_virtual_task(task)
+
+
 def task_subprocess_command(
-    task: Task, extra_args: Optional[list[str]] = None
+    task: Task, extra_args: Optional[list[str]] = None, resolve: bool = True
 ) -> list[str]:
     """
     Given a task and extra arguments, return the command to run the task.
+    Unless resolve is False, the executable of a process task is resolved
+    to a full path, and raises an error if it does not exist.
     """
     # deal with mutable defaults
     if extra_args is None:
@@ -55,7 +100,9 @@ def task_subprocess_command(
         command_value = csc_value(command)
 
         # resolve to a path
-        subprocess_command = [which_resolver(command_value)]
+        subprocess_command = [
+            which_resolver(command_value) if resolve else command_value
+        ]
 
         # convert the args into string as well
         subprocess_command.extend(csc_value(arg) for arg in args + extra_args)
@@ -71,7 +118,7 @@ def task_subprocess_command(
         shell_config = task.shell_use()
 
         # build the shell quoting options
-        shell_config.quoting = terminal_task_system.get_quoting_options(shell_config)
+        quoting = terminal_task_system.get_quoting_options(shell_config)
 
         # figure out how to tack on extra args
         if extra_args:
@@ -95,7 +142,7 @@ def task_subprocess_command(
             shell_config,
             terminal_task_system.build_shell_command_line(
                 shell_type=shell_config.type_,
-                shell_quoting_options=shell_config.quoting,  # ty:ignore[invalid-argument-type]
+                shell_quoting_options=quoting,
                 command=command,
                 args=args,
             ),
@@ -105,292 +152,879 @@ def task_subprocess_command(
         return []  # pragma: nocover
 
 
-def build_tasks_order(tasks: list[Task]) -> list[list[Task]]:
+def jobs_limit() -> int:
     """
-    Given a list of Tasks, return a 2D list of all
-    tasks that need to be executed.
+    Return the maximum number of tasks to execute at once.
+    This is set by the VTR_JOBS environment variable, and defaults
+    to the number of CPUs.
     """
-    task_groups: list[list[Task]] = []
+    if env_value := os.environ.get("VTR_JOBS"):
+        if not env_value.isdigit() or int(env_value) < 1:
+            raise InvalidJobs(f"Number of jobs '{env_value}' is not a positive integer")
 
-    for task in tasks:
-        task_groups.extend(_build_single_task_order(task))
+        return int(env_value)
 
-    return task_groups
+    return os.cpu_count() or 1
 
 
-def _build_single_task_order(task: Task) -> list[list[Task]]:
+def timeout_limit() -> Optional[float]:
     """
-    Given a Task, return a 2D list of all
-    tasks that need to be executed.
+    Return the maximum number of seconds any task may run for.
+    This is set by the VTR_TIMEOUT environment variable, and defaults
+    to no limit.
     """
-    # output
-    task_groups: list[list[Task]] = []
+    if env_value := os.environ.get("VTR_TIMEOUT"):
+        try:
+            timeout = float(env_value)
+        except ValueError:
+            timeout = 0.0
 
-    # for tasks that can be executed in parallel, create a temp list
-    parallel_temp: list[Task] = []
+        if not timeout > 0:
+            raise InvalidTimeout(f"Timeout '{env_value}' is not a positive number")
 
-    # go through each child task
-    for c_task in task.depends_on:
-        if c_task.depends_on:
-            # if this task has children, go another level deeper
-            task_groups.extend(_build_single_task_order(c_task))
-        elif task.depends_order == DependsOrderEnum.sequence:
-            # if the task must be done in sequence, add to output
-            task_groups.append([c_task])
-        else:
-            # if it can be done in parallel, add it to the parallel list
-            parallel_temp.append(c_task)
+        return timeout
 
-    # if tasks can be done in parallel, add those
-    if parallel_temp:
-        task_groups.append(parallel_temp)
+    return None
 
-    # finally, add current task
-    task_groups.append([task])
-    return task_groups
 
+def task_timeout(task: Task) -> Optional[float]:
+    """
+    Return the maximum number of seconds a task may run for. The timeout set
+    on the task itself takes priority over the timeout for all tasks.
+    """
+    if task.vtr.timeout is not None:
+        return task.vtr.timeout
 
-def execute_tasks(tasks: list[Task], extra_args: list[str]) -> int:
+    return timeout_limit()
+
+
+def retries_limit() -> int:
     """
-    Execute the tasks in the order they are defined in the tasks.json file.
+    Return how many more times to execute a task if it fails.
+    This is set by the VTR_RETRIES environment variable, and defaults to 0.
+    """
+    if env_value := os.environ.get("VTR_RETRIES"):
+        if not env_value.isdigit():
+            raise InvalidRetries(
+                f"Number of retries '{env_value}' is not a non-negative integer"
+            )
+
+        return int(env_value)
+
+    return 0
+
+
+def task_attempts(task: Task) -> int:
+    """
+    Return the maximum number of times a task may be executed. The number of
+    retries set on the task itself takes priority over the number for all tasks.
+    """
+    if task.vtr.retries is not None:
+        return task.vtr.retries + 1
+
+    return retries_limit() + 1
+
+
+def retry_delay(spec: ExecSpec, attempt: int) -> float:
+    """
+    Return how many seconds to wait before the given attempt at executing a task.
+    The delay doubles with every retry.
+    """
+    return spec.retry_delay * 2 ** (attempt - 2)
+
+
+def should_retry(
+    task: Task, spec: ExecSpec, attempt: int, processes: Optional[RunningProcesses]
+) -> bool:
+    """
+    Returns if a task should be executed again after the given attempt.
+    Tasks that failed or timed out are retried, unless running tasks
+    are being cancelled.
+    """
+    return (
+        task._execution_state
+        in (TaskExecutionStateEnum.failed, TaskExecutionStateEnum.timed_out)
+        and attempt < spec.attempts
+        and not (processes is not None and processes.cancelling)
+    )
+
+
+def print_task_retry(spec: ExecSpec, attempt: int) -> float:
+    """
+    Print that a task is going to be retried.
+
+    Returns how many seconds to wait before retrying.
     """
-    # collect all tasks to execute
-    levels = build_tasks_order(tasks)
+    delay = retry_delay(spec, attempt)
+    printer.info(
+        f"Retrying task {printer.yellow(spec.label)} in {delay:g}s "
+        + f"(attempt {attempt}/{spec.attempts})"
+    )
+    return delay
 
-    # ensure all tasks are supported
-    for level in levels:
-        for task in level:
-            if not task.is_supported():
-                printer.error(f"Task {printer.yellow(task.label)} is not supported")
+
+def execution_engine() -> ExecutionEngineEnum:
+    """
+    Return the engine to execute tasks with.
+    This is set by the VTR_ENGINE environment variable, and defaults
+    to threads.
+    """
+    env_value = os.environ.get("VTR_ENGINE") or ExecutionEngineEnum.threads.value
+
+    try:
+        return ExecutionEngineEnum(env_value)
+    except ValueError as e:
+        raise UnsupportedEngine(f"Unsupported execution engine '{env_value}'") from e
+
+
+def plan_tasks(tasks: list[Task]) -> list[TaskNode]:
+    """
+    Build the graph of all tasks that need to be executed, ensure they are
+    all supported, and resolve their variables.
+    """
+    with tracing.span("plan"):
+        # collect all tasks to execute
+        nodes = build_task_graph(tasks)
+
+        # ensure all tasks are supported
+        for node in nodes:
+            if not node.task.is_supported():
+                printer.error(
+                    f"Task {printer.yellow(node.task.label)} is not supported"
+                )
                 sys.exit(1)
 
     # resolve all variables in all tasks
-    # and count all
-    task_count = len([task.resolve_variables() for level in levels for task in level])
+    with tracing.span("resolve"):
+        for node in nodes:
+            node.task.resolve_variables()
 
-    # track task results
-    completed: list[str] = []
-    failed: list[str] = []
+    return nodes
 
-    def should_continue(task: Task) -> bool:
-        """
-        Process the results of a task execution. If a task fails and
-        VTR_CONTINUE_ON_ERROR is not set, exit immediately.
 
-        This returns whether or not to continue execution.
-        """
-        # track results
-        if task._execution_returncode == 0:
-            completed.append(task.label)
+def compile_spec(task: Task, extra_args: list[str]) -> ExecSpec:
+    """
+    Work out everything needed to execute a task, with the given extra arguments.
+    """
+    virtual = is_virtual_task(task)
+    return ExecSpec(
+        label=task.label,
+        # the executable may be created by a task this one depends on
+        argv=()
+        if virtual
+        else tuple(task_subprocess_command(task, extra_args, resolve=False)),
+        # the working directory may be created by a task this one depends on
+        cwd=str(task.cwd_use(check=False)),
+        env=tuple(sorted(task._new_env().items())),
+        virtual=virtual,
+        background=is_background_task(task),
+        timeout=task_timeout(task),
+        attempts=task_attempts(task),
+        retry_delay=task.vtr.retry_delay,
+    )
+
+
+def compile_specs(
+    nodes: list[TaskNode], extra_args: list[str]
+) -> dict[TaskNode, ExecSpec]:
+    """
+    Compile every node of a planned graph. Extra arguments are only given
+    to the last node, as they can't be given to more than one top-level task.
+    """
+    with tracing.span("compile"):
+        return {
+            node: compile_spec(node.task, extra_args if node is nodes[-1] else [])
+            for node in nodes
+        }
 
-        else:
-            failed.append(task.label)
-
-            if not os.environ.get("VTR_CONTINUE_ON_ERROR"):
-                # exit immediately
-                printer.summary(
-                    completed_tasks=completed,
-                    # this is the only situation where we have skipped tasks
-                    skipped_tasks=[
-                        task.label
-                        for level in levels
-                        for task in level
-                        if task._execution_state == TaskExecutionStateEnum.pending
-                    ],
-                    failed_tasks=failed,
-                )
 
-                return False
+def execute_tasks(tasks: list[Task], extra_args: list[str]) -> int:
+    """
+    Execute the tasks in the order they are defined in the tasks.json file.
+    Each task is started as soon as all of the tasks it depends on have finished.
+    """
+    return execute_nodes(plan_tasks(tasks), extra_args)
+
 
-        return True
+def execute_nodes(nodes: list[TaskNode], extra_args: list[str]) -> int:
+    """
+    Execute all the nodes of a planned graph, and print a summary.
 
-    # this keeps track of which task we are on
-    # for the sake of extra args and printing
-    index = 0
+    Returns the exit code for the run.
+    """
+    # fail before anything is executed if the options are invalid
+    timeout_limit()
+    retries_limit()
 
-    # iterate through all tasks
-    for level in levels:
-        if len(level) > 1:  # pragma: no cover
-            # this is challenging to test
-            # parallel execution
-            with concurrent.futures.ThreadPoolExecutor() as thread_pool:
-                futures = []
+    return execute_plan(nodes, compile_specs(nodes, extra_args))
 
-                for task in level:
-                    index += 1
 
-                    # only add extra args to last task
-                    # since this function won't get extra args when more than one
-                    # top level tasks are run
-                    execute_extra_args = extra_args if index == task_count else []
+def execute_plan(nodes: list[TaskNode], specs: dict[TaskNode, ExecSpec]) -> int:
+    """
+    Execute all the nodes of a planned graph, as compiled in the given specs,
+    and print a summary.
+
+    Returns the exit code for the run.
+    """
+    # start the tasks on the longest remaining path first
+    assign_priorities(nodes, history.load_durations())
+
+    jobs = jobs_limit()
+    scheduler = Scheduler(
+        nodes,
+        jobs=min(jobs, len(nodes)),
+        budget=resources.machine_budget(),
+    )
+
+    # imported here, as it uses this module
+    from vscode_task_runner.background import BackgroundTasks
+
+    run_start = time.monotonic()
+    # tasks share the jobserver with any tools they run,
+    # and background tasks are stopped once everything else has finished
+    with (
+        tracing.span("execute"),
+        jobserver.run_jobserver(jobs) as job_server,
+        BackgroundTasks() as background,
+    ):
+        if execution_engine() == ExecutionEngineEnum.asyncio:
+            # only import when needed
+            from vscode_task_runner import async_executor
+
+            async_executor.run_scheduler(scheduler, specs, job_server, background)
+        else:
+            run_scheduler(scheduler, specs, job_server, background)
+
+    wall_time = time.monotonic() - run_start
+    metrics.run_finished(wall_time)
+    if metrics_file := os.environ.get("VTR_METRICS_FILE"):
+        try:
+            metrics.save(metrics_file)
+        except OSError as e:
+            printer.error(f"Unable to write metrics to {metrics_file}: {e}")
+
+    # remember how long tasks took for next time
+    history.save_executions()
+    history.save_durations(
+        {
+            node.task.label: node.task._execution_duration
+            for node in nodes
+            if node.task._execution_state == TaskExecutionStateEnum.completed
+            and node.task._execution_duration is not None
+        }
+    )
+
+    timed_out_tasks = {
+        node.task.label: node.task._execution_duration or 0.0
+        for node in nodes
+        if node.task.label in scheduler.timed_out
+    }
+    # tasks that were executed more than once
+    retried_tasks = {
+        node.task.label: node.task._execution_attempts
+        for node in nodes
+        if node.task._execution_attempts > 1
+    }
+    # how long the tasks that were executed took, and the resources they used
+    task_durations = {
+        node.task.label: node.task._execution_duration
+        for node in nodes
+        if node.task._execution_attempts > 0
+        and node.task._execution_duration is not None
+    }
+    task_usage = {
+        node.task.label: node.task._execution_usage
+        for node in nodes
+        if node.task.label in task_durations and node.task._execution_usage is not None
+    }
+
+    if scheduler.stopped_by is not None:
+        printer.summary(
+            completed_tasks=scheduler.completed,
+            # this is the only situation where we have skipped or cancelled tasks
+            skipped_tasks=[
+                node.task.label
+                for node in nodes
+                if node.task._execution_state == TaskExecutionStateEnum.pending
+            ],
+            failed_tasks=scheduler.failed,
+            cancelled_tasks=scheduler.cancelled,
+            timed_out_tasks=timed_out_tasks,
+            retried_tasks=retried_tasks,
+            task_durations=task_durations,
+            task_usage=task_usage,
+            wall_time=wall_time,
+            slots=scheduler.jobs,
+        )
+        return scheduler.stopped_by._execution_returncode
+
+    # this is reached if all tasks completed successfully or continue on error is set
+    # to True
+    printer.summary(
+        completed_tasks=scheduler.completed,
+        skipped_tasks=[],
+        failed_tasks=scheduler.failed,
+        cancelled_tasks=[],
+        timed_out_tasks=timed_out_tasks,
+        retried_tasks=retried_tasks,
+        task_durations=task_durations,
+        task_usage=task_usage,
+        wall_time=wall_time,
+        slots=scheduler.jobs,
+    )
+    return int(bool(scheduler.failed or scheduler.timed_out))
+
+
+def run_scheduler(
+    scheduler: Scheduler,
+    specs: dict[TaskNode, ExecSpec],
+    job_server: Optional[jobserver.JobServer],
+    background: "BackgroundTasks",
+) -> None:
+    """
+    Execute all the tasks from the scheduler with a pool of threads, as compiled
+    in the given specs, taking a token from the jobserver for each, if there is one.
+    Background tasks are started with the given background tasks instead.
+    """
+    # tasks that are currently executing
+    running: dict[concurrent.futures.Future, TaskNode] = {}
+    processes = RunningProcesses()
+
+    # the output of all tasks running in parallel is read by a single thread
+    with (
+        OutputMultiplexer() as multiplexer,
+        concurrent.futures.ThreadPoolExecutor(
+            max_workers=scheduler.jobs
+        ) as thread_pool,
+    ):
+        try:
+            while not scheduler.finished:
+                for launch in scheduler.start():
+                    spec = specs[launch.node]
+                    if spec.background:
+                        running[
+                            background.start(
+                                launch.node.task, spec, launch.index, scheduler.total
+                            )
+                        ] = launch.node
+                        continue
 
                     # submit the task to the executor
-                    futures.append(
-                        thread_pool.submit(
-                            execute_task,
-                            task,
-                            index,
-                            task_count,
-                            True,
-                            execute_extra_args,
-                        )
+                    future = thread_pool.submit(
+                        execute_task,
+                        launch.node.task,
+                        spec,
+                        launch.index,
+                        scheduler.total,
+                        launch.parallel,
+                        multiplexer,
+                        processes,
+                        job_server,
                     )
+                    running[future] = launch.node
 
-                # this actually executes the tasks
-                [f.result() for f in futures]
+                if not running:
+                    continue
 
-                for task in level:
-                    if not should_continue(task):
-                        return task._execution_returncode
+                # wait for at least one task to finish
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
 
-        else:
-            # sequential execution
-            task = level[0]
-            index += 1
-
-            # only add extra args to last task
-            # since this function won't get extra args when more than one
-            # top level tasks are run
-            execute_extra_args = extra_args if index == task_count else []
-
-            execute_task(
-                task,
-                index=index,
-                total=task_count,
-                parallel=False,
-                extra_args=execute_extra_args,
-            )
+                # raise any exceptions
+                for future in done:
+                    future.result()
 
-            if not should_continue(task):
-                return task._execution_returncode
+                scheduler.finish([running.pop(future) for future in done])
+                cancel_running_tasks(scheduler, processes, background)
 
-    # this is reached if all tasks completed successfully or continue on error is set
-    # to True
-    printer.summary(completed_tasks=completed, skipped_tasks=[], failed_tasks=failed)
-    return int(bool(failed))
+        except KeyboardInterrupt:
+            # tasks running in their own session don't see Ctrl+C,
+            # so they need to be stopped before waiting for them
+            processes.cancel()
+            raise
 
 
-def execute_task(
-    task: Task, index: int, total: int, parallel: bool, extra_args: list[str]
+def cancel_running_tasks(
+    scheduler: Scheduler, processes: RunningProcesses, background: "BackgroundTasks"
+) -> None:
+    """
+    Once execution has been stopped by a failed or timed out task,
+    cancel the tasks that are still running, including background tasks.
+    """
+    if scheduler.stopped_by is None or processes.cancelling:
+        return
+
+    background.terminate()
+
+    if cancelled := processes.cancel():
+        reason = (
+            "timed out"
+            if scheduler.stopped_by._execution_state == TaskExecutionStateEnum.timed_out
+            else "failed"
+        )
+        printer.error(
+            f"Task {printer.yellow(scheduler.stopped_by.label)} {reason}, cancelling "
+            + ", ".join(printer.yellow(label) for label in cancelled)
+        )
+
+
+def execute_virtual_task(task: Task, index: int, total: int) -> int:
+    """
+    Execute a virtual task, which has nothing to run.
+    """
+    printer.info(
+        f"[{index}/{total}] Task {printer.yellow(task.label)} has no direct command to execute"
+    )
+    task._execution_state = TaskExecutionStateEnum.completed
+    task._execution_duration = 0.0
+    return 0
+
+
+def print_task_start(task: Task, cmd: list[str], index: int, total: int) -> None:
+    """
+    Print that a task is starting to execute.
+    """
+    printer.info(
+        f"[{index}/{total}] Executing task {printer.yellow(task.label)}: {printer.blue(joiner(cmd))}"
+    )
+
+
+def task_output_prefix(task: Task, index: int) -> str:
+    """
+    Return the prefix for each line of output of a task running in parallel.
+    """
+    return f"[{printer.rainbow(task.label, index)}] "
+
+
+def task_output_group(task: Task, total: int, parallel: bool) -> ContextManager:
+    """
+    Return a context manager to group the output of a task in CI/CD.
+    """
+    # if we have more than one task and running sequntially group the output
+    # if this were enabled while tasks were running in parallel, it would be chaos
+
+    # we *could* do something fancy where if in CI/CD and parallel, output is held,
+    # and then printed in groups, but that seems too extra.
+    if total > 1 and not parallel:
+        return printer.group(f"Task {task.label}")
+
+    return contextlib.nullcontext()
+
+
+def cancel_waiting_task(task: Task) -> int:
+    """
+    Record that a task was cancelled before it could be started.
+
+    Returns the exit code of the task.
+    """
+    # not a real exit code, but the task is not counted as failing
+    return record_task_result(
+        task, 1, time.monotonic(), TaskExecutionStateEnum.cancelled
+    )
+
+
+@contextlib.contextmanager
+def job_token(
+    job_server: Optional[jobserver.JobServer],
+    processes: Optional[RunningProcesses],
+) -> Generator[bool, None, None]:
+    """
+    Hold a token from the jobserver while a task executes, if there is one.
+    Yields whether the task can start, which it can't if running tasks
+    were cancelled while waiting for a token.
+    """
+    if job_server is None:
+        yield True
+        return
+
+    token = job_server.acquire(lambda: processes is not None and processes.cancelling)
+    if token is None:
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        job_server.release(token)
+
+
+def record_task_result(
+    task: Task,
+    returncode: int,
+    start_time: float,
+    stopped_state: Optional[TaskExecutionStateEnum] = None,
 ) -> int:
     """
-    Actually execute the task. Takes the task object, current index, total number,
-    whether this is a parallel task, and any extra args.
+    Record the result of executing a task, and print an error if it failed.
+    The start time is from `time.monotonic`, and the stopped state is why
+    the task was stopped, if it was. A task that was cancelled because
+    another task failed is not counted as failing itself.
 
     Returns the exit code of the task.
     """
-    if is_virtual_task(task):
-        printer.info(
-            f"[{index}/{total}] Task {printer.yellow(task.label)} has no direct command to execute"
+    # update task execution state
+    task._execution_returncode = returncode
+    task._execution_duration = time.monotonic() - start_time
+
+    # handle the four outcomes
+    if stopped_state == TaskExecutionStateEnum.cancelled:
+        task._execution_state = TaskExecutionStateEnum.cancelled
+        printer.info(f"Task {printer.yellow(task.label)} was cancelled")
+
+    elif stopped_state == TaskExecutionStateEnum.timed_out:
+        task._execution_state = TaskExecutionStateEnum.timed_out
+        # same exit code as the `timeout` command
+        task._execution_returncode = TIMEOUT_RETURNCODE
+
+        printer.error(
+            f"Task {printer.yellow(task.label)} timed out after {task._execution_duration:.1f}s"
         )
-        return 0
 
-    cmd = task_subprocess_command(task, extra_args=extra_args)
+    elif task._execution_returncode != 0:
+        task._execution_state = TaskExecutionStateEnum.failed
 
-    def run_cmd() -> int:
-        printer.info(
-            f"[{index}/{total}] Executing task {printer.yellow(task.label)}: {printer.blue(joiner(cmd))}"
+        # warning output if failed
+        printer.error(
+            f"Task {printer.yellow(task.label)} returned with exit code {returncode}"
         )
+    else:
+        task._execution_state = TaskExecutionStateEnum.completed
+
+    return task._execution_returncode
+
+
+def replay_cached_task(
+    task: Task, result: cache.CachedResult, index: int, total: int, parallel: bool
+) -> int:
+    """
+    Use the cached result of a task instead of executing it. Prints the
+    output the task had, and restores the files it created.
+    """
+    printer.info(
+        f"[{index}/{total}] Task {printer.yellow(task.label)} is up to date, replaying cached output"
+    )
+
+    prefix = task_output_prefix(task, index) if parallel else ""
+    # report the problems again, as the annotations are not cached
+    problem_matchers = problems.task_problem_matchers(task)
+    for data, output in (
+        (result.stdout, OutputStreamEnum.stdout),
+        (result.stderr, OutputStreamEnum.stderr),
+    ):
+        lines = LineBuffer(prefix, problem_matchers)
+        print_lines(lines.feed(data) + lines.flush(), output)
 
-        # in parallel mode, we want to provide a prefix to each line
+    cache.restore_outputs(task, result)
+
+    # no duration is recorded, as the task did not actually run
+    task._execution_returncode = 0
+    task._execution_state = TaskExecutionStateEnum.completed
+    return 0
+
+
+class TaskAttempt:
+    """
+    A single execution of the command of a task. Everything apart from
+    starting the process and waiting for it is the same for every engine,
+    so is done here.
+    """
+
+    def __init__(
+        self, task: Task, spec: ExecSpec, parallel: bool, capture: bool
+    ) -> None:
+        self.task = task
+        self.spec = spec
+        self.cmd = spec.argv_use()
+        """
+        Command to execute.
+        """
+
+        # in parallel mode, we want to provide a prefix to each line,
+        # to cache the result we need a copy of the output,
+        # and to find problems we need to scan the output,
         # so we need to pipe in the subprocess output
-        proc = subprocess.Popen(
-            args=cmd,
-            shell=False,
-            cwd=task.cwd_use(),
-            env=task.env_use(),
-            stdout=subprocess.PIPE if parallel else sys.stdout,
-            stderr=subprocess.PIPE if parallel else sys.stderr,
-            text=True,
-            bufsize=1,
+        self.problem_matchers = problems.task_problem_matchers(task)
+        """
+        Problem matchers to scan the output with, if any.
+        """
+        self.pipe_output = parallel or capture or self.problem_matchers is not None
+        """
+        Whether the output of the process needs to be piped.
+        """
+        self.own_group = new_process_group(parallel, spec.timeout)
+        """
+        Whether the process is started in a process group of its own.
+        """
+
+        task._execution_attempts += 1
+        self._start_time = time.monotonic()
+        self._started_at = time.time()
+        self._spawn_start = time.perf_counter()
+
+    def spawned(self, proc: Process, processes: Optional[RunningProcesses]) -> None:
+        """
+        Record that the process has been started, and track it in the
+        running processes, if given.
+        """
+        metrics.task_spawned(self.task.label, time.perf_counter() - self._spawn_start)
+        tracing.instant(self.task.label, "spawn", pid=proc.pid)
+        if processes is not None:
+            processes.add(self.task, proc, self.own_group, self.spec.timeout)
+
+    def finished(
+        self,
+        returncode: int,
+        usage: Optional[ResourceUsage],
+        processes: Optional[RunningProcesses],
+        first_output: Optional[float] = None,
+        output_size: Optional[int] = None,
+    ) -> None:
+        """
+        Record the result of the process, along with the resources it used,
+        if known, and when its first output arrived and how much there was,
+        if it was piped.
+        """
+        task = self.task
+        task._execution_usage = usage
+        if first_output is not None:
+            tracing.instant(task.label, "first output", first_output)
+        tracing.instant(task.label, "exit", returncode=returncode)
+
+        history.record_execution(
+            task.label, self.cmd, self._started_at, time.time(), returncode, usage
         )
+        stopped_state = processes.remove(task) if processes is not None else None
+        record_task_result(task, returncode, self._start_time, stopped_state)
 
-        # if not running in parallel, we can just wait
-        # for the process to finish
-        if not parallel:  # pragma: no branch
-            proc.wait()
-
-        else:  # pragma: no cover
-            # this is.... challenging to test
-            # https://stackoverflow.com/a/18423003
-            # https://stackoverflow.com/a/17190793
-            # create a queue to store output lines
-            q: queue.Queue[Optional[OutputLine]] = queue.Queue()
-
-            def read_stream(pipe: TextIO, stream: OutputStreamEnum) -> None:
-                """
-                This function will continously try to read lines
-                from a stream, and put them in our output queue. Once
-                the stream is empty, it will close.
-                """
-                for line in iter(pipe.readline, ""):
-                    q.put(
-                        OutputLine(
-                            text=f"[{printer.rainbow(task.label, index)}] {line.rstrip()}",
-                            stream=stream,
-                        )
-                    )
-                pipe.close()
-
-            def print_output() -> None:
-                """
-                This will try to get items from the queue and print them out.
-                Once an item in the queue that is simply a None, it will exit.
-                """
-                for output_line in iter(q.get, None):
-                    if output_line.stream == OutputStreamEnum.stdout:
-                        printer.stdout(output_line.text)
-                    elif output_line.stream == OutputStreamEnum.stderr:
-                        printer.stderr(output_line.text)
-
-            # start the threads
-            t_stdout = threading.Thread(
-                target=read_stream, args=(proc.stdout, OutputStreamEnum.stdout)
-            )
-            t_stderr = threading.Thread(
-                target=read_stream, args=(proc.stderr, OutputStreamEnum.stderr)
-            )
-            t_print = threading.Thread(target=print_output)
+        metrics.task_finished(task)
+        if output_size is not None:
+            metrics.task_output(task.label, output_size)
 
-            for t in {t_stdout, t_stderr, t_print}:
-                t.start()
 
-            # wait for the proces to finish
-            proc.wait()
+class TaskExecution:
+    """
+    Executing a task, from replaying its cached result, or taking as many
+    attempts as it allows, to caching its result. Only holding a jobserver
+    token, running each attempt, and waiting before a retry depend on the engine.
+    """
 
-            # wait for the reader threads to finish
-            for t in {t_stdout, t_stderr}:
-                t.join()
+    def __init__(
+        self, task: Task, spec: ExecSpec, index: int, total: int, parallel: bool
+    ) -> None:
+        self.task = task
+        self.spec = spec
+        self.index = index
+        self.total = total
+        self.parallel = parallel
+        self.attempt = 0
+        """
+        Number of attempts started so far.
+        """
 
-            # tell the output thread to stop
-            q.put(None)
+        self._cmd = spec.argv_use()
+        self._cache_key = (
+            cache.cache_key(task, self._cmd) if cache.is_cacheable(task) else None
+        )
 
-            # wait for the output thread to finish
-            t_print.join()
+    @property
+    def capture(self) -> bool:
+        """
+        Whether the output of the task is needed to cache its result.
+        """
+        return self._cache_key is not None
 
-        # update task execution state
-        task._execution_returncode = proc.returncode
+    def context(self) -> contextlib.ExitStack:
+        """
+        Return a context manager to hold while the task executes.
+        """
+        stack = contextlib.ExitStack()
+        stack.enter_context(task_output_group(self.task, self.total, self.parallel))
+        stack.enter_context(tracing.task_span(self.task))
+        return stack
 
-        # handle the two outcomes
-        if task._execution_returncode != 0:
-            task._execution_state = TaskExecutionStateEnum.failed
+    def replay(self) -> Optional[int]:
+        """
+        Use the cached result of the task, if there is one.
 
-            # warning output if failed
-            printer.error(
-                f"Task {printer.yellow(task.label)} returned with exit code {proc.returncode}"
+        Returns the exit code of the task, or None if it needs to be executed.
+        """
+        if self._cache_key and (cached := cache.load(self._cache_key)):
+            return replay_cached_task(
+                self.task, cached, self.index, self.total, self.parallel
             )
-        else:
-            task._execution_state = TaskExecutionStateEnum.completed
 
-        return task._execution_returncode
+        return None
 
-    # if we have more than one task and running sequntially group the output
-    # if this were enabled while tasks were running in parallel, it would be chaos
+    def cancelled(self) -> int:
+        """
+        Stop executing the task, as running tasks were cancelled while it
+        waited for a jobserver token.
+
+        Returns the exit code of the task.
+        """
+        # keep the result of the last attempt, if there was one
+        if self.attempt == 0:
+            return cancel_waiting_task(self.task)
+        return self.task._execution_returncode
+
+    def start(self) -> None:
+        """
+        Print that the next attempt is starting.
+        """
+        self.attempt += 1
+        print_task_start(self.task, self._cmd, self.index, self.total)
+
+    def retry(self, processes: Optional[RunningProcesses]) -> Optional[float]:
+        """
+        Returns how many seconds to wait before the next attempt,
+        or None if the task should not be executed again.
+        """
+        if not should_retry(self.task, self.spec, self.attempt, processes):
+            return None
+
+        return print_task_retry(self.spec, self.attempt + 1)
+
+    def finish(self, stdout: Optional[bytes], stderr: Optional[bytes]) -> int:
+        """
+        Cache the result of the task, if it succeeded, with the output of the
+        last attempt, if it was captured.
+
+        Returns the exit code of the task.
+        """
+        if (
+            self._cache_key
+            and stdout is not None
+            and stderr is not None
+            and self.task._execution_returncode == 0
+        ):
+            cache.save(self._cache_key, self.task, stdout=stdout, stderr=stderr)
+
+        return self.task._execution_returncode
+
+
+def run_task_process(
+    task: Task,
+    spec: ExecSpec,
+    index: int,
+    parallel: bool,
+    capture: bool,
+    multiplexer: Optional[OutputMultiplexer],
+    processes: Optional[RunningProcesses],
+    job_server: Optional[jobserver.JobServer],
+) -> Optional[TaskOutput]:
+    """
+    Execute the command of a task once, and record the result.
+    Returns the output of the task if it was captured.
+    """
+    attempt = TaskAttempt(task, spec, parallel, capture)
+    proc = subprocess.Popen(
+        args=attempt.cmd,
+        shell=False,
+        cwd=spec.cwd_use(),
+        env=spec.env_use(),
+        stdout=subprocess.PIPE if attempt.pipe_output else sys.stdout,
+        stderr=subprocess.PIPE if attempt.pipe_output else sys.stderr,
+        start_new_session=attempt.own_group,
+        pass_fds=job_server.pass_fds if job_server is not None else (),
+    )
+    attempt.spawned(proc, processes)
+
+    output: Optional[TaskOutput] = None
+
+    # if not piping the output, we can just wait
+    # for the process to finish
+    if not attempt.pipe_output:
+        usage = wait_process(proc)
 
-    # we *could* do something fancy where if in CI/CD and parallel, output is held,
-    # and then printed in groups, but that seems too extra.
-    if total > 1 and not parallel:
-        with printer.group(f"Task {task.label}"):
-            return run_cmd()
     else:
-        return run_cmd()
+        with contextlib.ExitStack() as stack:
+            if multiplexer is None:
+                multiplexer = stack.enter_context(OutputMultiplexer())
+
+            assert proc.stdout is not None and proc.stderr is not None
+            output = multiplexer.add(
+                proc.stdout,
+                proc.stderr,
+                task_output_prefix(task, index) if parallel else "",
+                capture=capture,
+                problem_matchers=attempt.problem_matchers,
+            )
+
+            # wait for the process to finish, and all of its output to be printed
+            usage = wait_process(proc)
+            output.finished.wait()
+
+    attempt.finished(
+        proc.returncode,
+        usage,
+        processes,
+        first_output=output.first_output if output is not None else None,
+        output_size=output.size if output is not None else None,
+    )
+    return output
+
+
+def execute_task(
+    task: Task,
+    spec: ExecSpec,
+    index: int,
+    total: int,
+    parallel: bool,
+    multiplexer: Optional[OutputMultiplexer] = None,
+    processes: Optional[RunningProcesses] = None,
+    job_server: Optional[jobserver.JobServer] = None,
+) -> int:
+    """
+    Actually execute the task. Takes the task object, how to execute it, current
+    index, total number, and whether this is a parallel task. Piped output is
+    read by the given multiplexer, which is shared between all running tasks.
+    The process is tracked in the given running processes, so it can be cancelled,
+    and stopped if it runs for longer than its timeout. A token is held from
+    the given jobserver while the task runs. A task that fails is retried,
+    if it allows retries.
+
+    Returns the exit code of the task.
+    """
+    if spec.virtual:
+        return execute_virtual_task(task, index, total)
+
+    execution = TaskExecution(task, spec, index, total, parallel)
+    with execution.context():
+        if (returncode := execution.replay()) is not None:
+            return returncode
+
+        while True:
+            with job_token(job_server, processes) as started:
+                if not started:
+                    return execution.cancelled()
+
+                execution.start()
+                output = run_task_process(
+                    task,
+                    spec,
+                    index,
+                    parallel,
+                    execution.capture,
+                    multiplexer,
+                    processes,
+                    job_server,
+                )
+
+            if (delay := execution.retry(processes)) is None:
+                break
+
+            # stop waiting if another task fails in the meantime
+            if processes is not None:
+                if processes.wait_cancelled(delay):
+                    break
+            else:
+                time.sleep(delay)
+
+        if output is None:
+            return execution.finish(None, None)
+
+        return execution.finish(
+            bytes(output.captured[OutputStreamEnum.stdout]),
+            bytes(output.captured[OutputStreamEnum.stderr]),
+        )
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from vscode_task_runner import printer
+from vscode_task_runner.exceptions import TasksFileInvalid
+from vscode_task_runner.models.enums import DependsOrderEnum
+from vscode_task_runner.models.task import Task
+
+DEFAULT_TASK_DURATION = 1.0
+"""
+Duration in seconds assumed for a task that has never been executed
+and does not declare a duration.
+"""
+
+
+class TaskNode:
+    """
+    A single task execution in the run graph.
+    """
+
+    def __init__(self, task: Task) -> None:
+        self.task = task
+        """
+        The task to execute.
+        """
+        self.dependencies: list[TaskNode] = []
+        """
+        Nodes that must finish before this node can start.
+        """
+        self.dependents: list[TaskNode] = []
+        """
+        Nodes that are waiting on this node to finish.
+        """
+        self.priority: float = 0.0
+        """
+        Expected time from when this node starts until the end of the longest
+        chain of nodes waiting on it. Nodes with a higher priority are started first.
+        """
+
+    def add_dependency(self, node: TaskNode) -> None:
+        """
+        Record that this node cannot start until the given node has finished.
+        """
+        if node not in self.dependencies:
+            self.dependencies.append(node)
+            node.dependents.append(self)
+
+
+def build_task_graph(tasks: list[Task]) -> list[TaskNode]:
+    """
+    Given a list of Tasks, return a list of all nodes that need to be executed,
+    in the order they were planned. Each node knows which nodes it waits on.
+    Top-level tasks are executed in sequence.
+
+    A task that is reachable through more than one path only gets a single node,
+    so it is only executed once, and every dependent waits on that execution.
+    """
+    # nodes keyed by task label, in the order they were planned
+    nodes: dict[str, TaskNode] = {}
+    previous: Optional[TaskNode] = None
+
+    for task in tasks:
+        previous = _build_task_node(
+            task, gates=[previous] if previous else [], nodes=nodes, path=[]
+        )
+
+    return _dependencies_first(list(nodes.values()))
+
+
+def _depends_on(node: TaskNode, other: TaskNode) -> bool:
+    """
+    Returns if the node waits on the other node, directly or indirectly.
+    """
+    seen = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current is other:
+            return True
+
+        for dependency in current.dependencies:
+            if dependency not in seen:
+                seen.add(dependency)
+                stack.append(dependency)
+
+    return False
+
+
+def _dependencies_first(nodes: list[TaskNode]) -> list[TaskNode]:
+    """
+    Given nodes in the order they were planned, return them in the same order,
+    except that every node comes after the nodes it waits on. A shared node
+    that was given a gate after it was planned is moved after the gate.
+    """
+    ordered: dict[TaskNode, None] = {}
+
+    def visit(node: TaskNode) -> None:
+        if node in ordered:
+            return
+
+        for dependency in node.dependencies:
+            visit(dependency)
+
+        ordered[node] = None
+
+    for node in nodes:
+        visit(node)
+
+    return list(ordered)
+
+
+def _build_task_node(
+    task: Task,
+    gates: list[TaskNode],
+    nodes: dict[str, TaskNode],
+    path: list[str],
+    sequence: bool = False,
+) -> TaskNode:
+    """
+    Given a Task, create the node for it and all of its children,
+    and add them to the dictionary of nodes. The path is the list of
+    task labels that led to this task, used to detect dependency loops.
+
+    Every node created waits on the given gate nodes. This is how a
+    `dependsOrder` of `sequence` holds back an entire subtree until
+    the previous sibling has finished. Sequence is whether this task is
+    itself one of the children of a task with a `dependsOrder` of `sequence`.
+    """
+    if task.label in path:
+        loop = " -> ".join([*path[path.index(task.label) :], task.label])
+        raise TasksFileInvalid(f"Task dependency loop detected: {loop}")
+
+    # if this task has already been planned through another path,
+    # share the existing node, which also needs to wait on the gates.
+    # A gate that waits on the existing node already finishes after it,
+    # so the node is only run once, before the gate.
+    # This is reported if the order of this very task is required
+    if existing := nodes.get(task.label):
+        for gate in gates:
+            if _depends_on(gate, existing):
+                if sequence:
+                    printer.info(
+                        f"Task {printer.yellow(task.label)} is run before "
+                        + f"{printer.yellow(gate.task.label)}, which depends on it"
+                    )
+                continue
+
+            existing.add_dependency(gate)
+
+        return existing
+
+    children: list[TaskNode] = []
+
+    # gates for the next child task
+    child_gates = gates
+
+    # go through each child task
+    for c_task in task.depends_on:
+        c_node = _build_task_node(
+            c_task,
+            gates=child_gates,
+            nodes=nodes,
+            path=[*path, task.label],
+            # the first child only has the gates of this task
+            sequence=bool(children) and task.depends_order == DependsOrderEnum.sequence,
+        )
+        children.append(c_node)
+
+        if task.depends_order == DependsOrderEnum.sequence:
+            # if the task must be done in sequence, the next child
+            # waits for this one to finish
+            child_gates = [c_node]
+
+    # finally, add current task
+    node = TaskNode(task)
+    for dependency in gates + children:
+        node.add_dependency(dependency)
+
+    nodes[task.label] = node
+    return node
+
+
+def task_duration(task: Task, durations: dict[str, float]) -> float:
+    """
+    Return the expected duration of a task in seconds. A duration declared
+    on the task is preferred over one recorded from a previous run.
+    """
+    if task.vtr.duration is not None:
+        return task.vtr.duration
+
+    return durations.get(task.label, DEFAULT_TASK_DURATION)
+
+
+def assign_priorities(nodes: list[TaskNode], durations: dict[str, float]) -> None:
+    """
+    Given a list of nodes in the order they were planned, and the
+    durations of tasks from previous runs, set the priority of each node
+    to the length of the longest remaining path through it.
+    """
+    # dependents are always planned after the nodes they wait on,
+    # so going backwards means every dependent has already been computed
+    for node in reversed(nodes):
+        node.priority = task_duration(node.task, durations) + max(
+            (dependent.priority for dependent in node.dependents), default=0.0
+        )
+
+
+def affected_subgraph(nodes: list[TaskNode], affected: set[TaskNode]) -> list[TaskNode]:
+    """
+    Given a list of nodes in the order they were planned, and the nodes
+    directly affected by a change, return new nodes for those and every
+    node that depends on them, in the same order.
+
+    Only `dependsOn` is followed to find dependents, so a top-level task is not
+    re-executed just because it was ordered after an affected task. Ordering
+    between the selected nodes is kept.
+    """
+    selected_labels = {node.task.label for node in affected}
+
+    # dependencies are always planned before the nodes that depend on them
+    for node in nodes:
+        if any(c_task.label in selected_labels for c_task in node.task.depends_on):
+            selected_labels.add(node.task.label)
+
+    copies = {
+        node: TaskNode(node.task)
+        for node in nodes
+        if node.task.label in selected_labels
+    }
+    for node, copy in copies.items():
+        for dependency in node.dependencies:
+            if dependency in copies:
+                copy.add_dependency(copies[dependency])
+
+    return list(copies.values())
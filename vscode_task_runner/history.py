@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from vscode_task_runner.constants import CURRENT_PLATFORM
+from vscode_task_runner.models.enums import PlatformEnum
+
+DURATIONS_FILE = "durations.json"
+HISTORY_FILE = "history.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    argv_hash TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    exit_code INTEGER NOT NULL,
+    user_time REAL,
+    system_time REAL,
+    max_rss INTEGER
+);
+CREATE INDEX IF NOT EXISTS executions_label ON executions (label, start_time);
+"""
+
+
+class ResourceUsage(NamedTuple):
+    """
+    Resources used by the process of a task.
+    """
+
+    user_time: float
+    """
+    CPU time spent in user mode, in seconds.
+    """
+    system_time: float
+    """
+    CPU time spent in the kernel, in seconds.
+    """
+    max_rss: int
+    """
+    Peak resident memory, in bytes.
+    """
+
+
+class Execution(NamedTuple):
+    """
+    A single execution of the command of a task.
+    """
+
+    label: str
+    argv_hash: str
+    """
+    Hash of the command that was executed, with all variables resolved.
+    """
+    start_time: float
+    """
+    When the command was started, in seconds since the epoch.
+    """
+    end_time: float
+    exit_code: int
+    usage: Optional[ResourceUsage]
+    """
+    Resources the command used, if known.
+    """
+
+
+_pending: list[Execution] = []
+_pending_lock = threading.Lock()
+
+
+def state_dir() -> Path:
+    """
+    Returns the directory to store state for the current workspace in,
+    such as how long tasks took in previous runs.
+    This can be overridden with the VTR_STATE_DIR environment variable.
+    """
+    if env_value := os.environ.get("VTR_STATE_DIR"):
+        return Path(env_value)
+
+    if CURRENT_PLATFORM == PlatformEnum.windows:
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    else:
+        base = Path(
+            os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+        )
+
+    # keep each workspace seperate
+    workspace = hashlib.sha256(os.getcwd().encode("utf-8")).hexdigest()[:16]
+    return base / "vscode-task-runner" / workspace
+
+
+def load_durations() -> dict[str, float]:
+    """
+    Load how long tasks took in previous runs, keyed by task label.
+    Returns an empty dictionary if nothing has been recorded.
+    """
+    try:
+        with open(state_dir() / DURATIONS_FILE, "r", encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+
+    return {
+        label: float(duration)
+        for label, duration in data.items()
+        if isinstance(duration, (int, float))
+    }
+
+
+def save_durations(durations: dict[str, float]) -> None:
+    """
+    Record how long tasks took in this run, keyed by task label.
+    Failing to save is not an error, as this is only used for scheduling.
+    """
+    if not durations:
+        return
+
+    durations_file = state_dir() / DURATIONS_FILE
+    data = {**load_durations(), **durations}
+
+    try:
+        durations_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first so parallel runs never see a partial file
+        temp_file = durations_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+
+        os.replace(temp_file, durations_file)
+    except OSError:
+        pass
+
+
+def argv_hash(cmd: list[str]) -> str:
+    """
+    Returns a hash of the command of a task, to tell when it has changed.
+    """
+    return hashlib.sha256(json.dumps(cmd).encode("utf-8")).hexdigest()
+
+
+def record_execution(
+    label: str,
+    cmd: list[str],
+    start_time: float,
+    end_time: float,
+    exit_code: int,
+    usage: Optional[ResourceUsage],
+) -> None:
+    """
+    Record an execution of the command of a task. Executions are kept in
+    memory until they are all saved at once with `save_executions`.
+    """
+    execution = Execution(label, argv_hash(cmd), start_time, end_time, exit_code, usage)
+    with _pending_lock:
+        _pending.append(execution)
+
+
+def save_executions() -> None:
+    """
+    Save every execution recorded since the last save to the history database,
+    in a single transaction. Failing to save is not an error, as the history
+    is only informational.
+    """
+    with _pending_lock:
+        executions = _pending.copy()
+        _pending.clear()
+
+    if not executions:
+        return
+
+    # only import when needed
+    import sqlite3
+
+    rows = [
+        (
+            execution.label,
+            execution.argv_hash,
+            execution.start_time,
+            execution.end_time,
+            execution.exit_code,
+            *(execution.usage or (None, None, None)),
+        )
+        for execution in executions
+    ]
+
+    history_file = state_dir() / HISTORY_FILE
+    try:
+        history_file.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(history_file, timeout=5)
+        try:
+            # parallel runs can write at the same time, and losing the last
+            # few executions to a power cut doesn't matter
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.executemany(
+                    "INSERT INTO executions (label, argv_hash, start_time, end_time, "
+                    + "exit_code, user_time, system_time, max_rss) "
+                    + "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        finally:
+            connection.close()
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def load_executions(label: Optional[str] = None) -> list[Execution]:
+    """
+    Load the executions saved in the history database, oldest first.
+    Optionally only those of the task with the given label.
+    Returns an empty list if nothing has been recorded.
+    """
+    history_file = state_dir() / HISTORY_FILE
+    if not history_file.is_file():
+        return []
+
+    # only import when needed
+    import sqlite3
+
+    query = (
+        "SELECT label, argv_hash, start_time, end_time, exit_code, "
+        + "user_time, system_time, max_rss FROM executions"
+    )
+    params: tuple[str, ...] = ()
+    if label is not None:
+        query += " WHERE label = ?"
+        params = (label,)
+
+    try:
+        connection = sqlite3.connect(history_file, timeout=5)
+        try:
+            rows = connection.execute(query + " ORDER BY start_time, id", params)
+            return [
+                Execution(
+                    *row[:5],
+                    usage=ResourceUsage(*row[5:]) if row[5] is not None else None,
+                )
+                for row in rows.fetchall()
+            ]
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return []
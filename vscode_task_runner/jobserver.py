@@ -0,0 +1,235 @@
+"""
+GNU make jobserver support. A jobserver is a pipe holding one token for every
+job that may run at once, beyond the one every process is allowed to run
+anyway. Tools like `make -j`, `cargo`, and `ninja` take a token before starting
+another job, and put it back once it finishes, so everything running under the
+same jobserver shares the same limit.
+
+VS Code Task Runner takes a token before starting each task, and gives the
+tasks access to the jobserver. If it is run by make, it uses the jobserver of
+make. Otherwise, it can create a jobserver of its own.
+"""
+
+import contextlib
+import os
+import re
+import select
+import threading
+from typing import Callable, Generator, Optional
+
+from vscode_task_runner import printer
+
+IMPLICIT_TOKEN = b""
+"""
+Stand-in for the token every process has without taking one from the jobserver.
+"""
+
+_AUTH_PATTERN = re.compile(r"--jobserver-(?:auth|fds)=(\S+)")
+
+
+def _open_nonblocking(fd: int) -> Optional[int]:
+    """
+    Open a pipe again so that reading from it does not block. This can't be done
+    by changing the existing file descriptor, as other processes share it.
+    Returns None if this is not possible on this platform.
+    """
+    try:
+        return os.open(f"/proc/self/fd/{fd}", os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+
+
+def _read_nonblocking(fd: int) -> Optional[bytes]:
+    """
+    Read a single byte from a pipe without blocking, for platforms where it can't
+    be opened again. The pipe is only switched to non-blocking mode for the read,
+    as other processes share the mode. Returns None if nothing can be read.
+    """
+    blocking = os.get_blocking(fd)
+    os.set_blocking(fd, False)
+    try:
+        return os.read(fd, 1) or None
+    except (BlockingIOError, InterruptedError):
+        return None
+    finally:
+        os.set_blocking(fd, blocking)
+
+
+class JobServer:
+    """
+    Hands out tokens from a jobserver pipe. Safe to use from multiple threads.
+    """
+
+    def __init__(
+        self, read_fd: int, write_fd: int, makeflags: str, owns_fds: bool
+    ) -> None:
+        self.read_fd = read_fd
+        """
+        File descriptor tokens are read from.
+        """
+        self.write_fd = write_fd
+        """
+        File descriptor tokens are written back to.
+        """
+        self.makeflags = makeflags
+        """
+        Value of MAKEFLAGS that gives processes access to this jobserver.
+        """
+        self.owns_fds = owns_fds
+        """
+        Whether the file descriptors were opened by this process,
+        rather than inherited.
+        """
+
+        self._lock = threading.Lock()
+        self._implicit_free = True
+        self._nonblocking_fd = _open_nonblocking(read_fd)
+
+    @property
+    def pass_fds(self) -> tuple[int, int]:
+        """
+        File descriptors processes need to inherit to use the jobserver.
+        """
+        return (self.read_fd, self.write_fd)
+
+    def try_acquire(self) -> Optional[bytes]:
+        """
+        Take a token if one is free right now. Returns the token, or None.
+        """
+        with self._lock:
+            if self._implicit_free:
+                self._implicit_free = False
+                return IMPLICIT_TOKEN
+
+        if self._nonblocking_fd is None:
+            # another process may take the token first,
+            # so even a readable pipe may have nothing left to read
+            return _read_nonblocking(self.read_fd)
+
+        try:
+            return os.read(self._nonblocking_fd, 1) or None
+        except (BlockingIOError, InterruptedError):
+            return None
+
+    def acquire(self, cancelled: Callable[[], bool]) -> Optional[bytes]:
+        """
+        Wait until a token is free, and take it. Returns the token,
+        or None if waiting was cancelled.
+        """
+        while (token := self.try_acquire()) is None:
+            if cancelled():
+                return None
+
+            select.select([self.read_fd], [], [], 0.1)
+
+        return token
+
+    def release(self, token: bytes) -> None:
+        """
+        Give back a token once the task using it has finished.
+        """
+        if token == IMPLICIT_TOKEN:
+            with self._lock:
+                self._implicit_free = True
+        else:
+            os.write(self.write_fd, token)
+
+    def close(self) -> None:
+        """
+        Stop using the jobserver.
+        """
+        if self._nonblocking_fd is not None:
+            os.close(self._nonblocking_fd)
+
+        if self.owns_fds:
+            # a fifo is read from and written to with the same file descriptor
+            for fd in set(self.pass_fds):
+                os.close(fd)
+
+
+def inherited_jobserver() -> Optional[JobServer]:
+    """
+    Return the jobserver of the make process that started this one, if any.
+    Make only lets processes use its jobserver if it knows they are
+    a sub-make, or the command is marked with "+".
+    """
+    makeflags = os.environ.get("MAKEFLAGS", "")
+    if not (matches := _AUTH_PATTERN.findall(makeflags)):
+        return None
+
+    auth = matches[-1]
+    try:
+        if auth.startswith("fifo:"):
+            fd = os.open(auth.removeprefix("fifo:"), os.O_RDWR)
+            return JobServer(fd, fd, makeflags, owns_fds=True)
+
+        read_fd, write_fd = (int(fd) for fd in auth.split(","))
+        os.fstat(read_fd)
+        os.fstat(write_fd)
+    except (OSError, ValueError):
+        printer.info(
+            "The jobserver of make is not available, "
+            + 'add "+" to the start of the command in the Makefile to use it'
+        )
+        return None
+
+    return JobServer(read_fd, write_fd, makeflags, owns_fds=False)
+
+
+def create_jobserver(jobs: int) -> JobServer:
+    """
+    Create a jobserver that lets the given number of jobs run at once.
+    """
+    read_fd, write_fd = os.pipe()
+    # this process has an implicit token of its own
+    os.write(write_fd, b"+" * (jobs - 1))
+
+    auth = f"{read_fd},{write_fd}"
+    # keep any other flags, and support versions of make before 4.2
+    makeflags = " ".join(
+        part
+        for part in (
+            _AUTH_PATTERN.sub("", os.environ.get("MAKEFLAGS", "")).strip(),
+            f"-j{jobs} --jobserver-auth={auth} --jobserver-fds={auth}",
+        )
+        if part
+    )
+
+    return JobServer(read_fd, write_fd, makeflags, owns_fds=True)
+
+
+@contextlib.contextmanager
+def run_jobserver(jobs: int) -> Generator[Optional[JobServer], None, None]:
+    """
+    Use the jobserver of make if running under it, or create one if the
+    VTR_JOBSERVER environment variable is set. While a jobserver created by
+    this process is in use, MAKEFLAGS is set so tasks can use it.
+    """
+    if os.name == "nt":
+        yield None
+        return
+
+    if jobserver := inherited_jobserver():
+        try:
+            yield jobserver
+        finally:
+            jobserver.close()
+        return
+
+    if not os.environ.get("VTR_JOBSERVER"):
+        yield None
+        return
+
+    jobserver = create_jobserver(jobs)
+    original = os.environ.get("MAKEFLAGS")
+    os.environ["MAKEFLAGS"] = jobserver.makeflags
+
+    try:
+        yield jobserver
+    finally:
+        jobserver.close()
+
+        if original is None:
+            del os.environ["MAKEFLAGS"]
+        else:
+            os.environ["MAKEFLAGS"] = original
@@ -0,0 +1,54 @@
+"""
+Listing tasks for shell completion and editor integrations. The tasks file is
+only scanned for what is needed to list the tasks, without validating it,
+so this is much faster than loading the tasks for a run.
+"""
+
+import json
+
+from vscode_task_runner import printer
+from vscode_task_runner.client import leading_options
+from vscode_task_runner.exceptions import TasksFileInvalid, TasksFileNotFound
+from vscode_task_runner.tasks_file import read_tasks_json, scan_tasks
+
+COMPLETE_FLAG = "--complete"
+LIST_FLAG = "--list"
+JSON_FLAG = "--json"
+
+COMPLETE_OPTIONS = ["--skip-summary", "--continue-on-error"]
+"""
+Options that are offered for completion, along with the task labels.
+"""
+
+
+def is_listing(argv: list[str]) -> bool:
+    """
+    Returns if the arguments only ask for the tasks to be listed.
+    """
+    options = leading_options(argv)
+    return COMPLETE_FLAG in options or LIST_FLAG in options
+
+
+def run(argv: list[str], path: str = ".") -> int:
+    """
+    List the tasks in the given working directory, as asked for by the
+    arguments. Returns the exit code.
+    """
+    options = leading_options(argv)
+
+    try:
+        tasks = scan_tasks(read_tasks_json(path))
+    except (TasksFileNotFound, TasksFileInvalid) as e:
+        if COMPLETE_FLAG not in options:
+            # don't want to provide any output if just completing
+            printer.error(str(e))
+        return 1
+
+    if COMPLETE_FLAG in options:
+        print("\n".join([*COMPLETE_OPTIONS, *(task["label"] for task in tasks)]))
+    elif JSON_FLAG in options:
+        print(json.dumps(tasks, indent=2, ensure_ascii=False))
+    elif tasks:
+        print("\n".join(task["label"] for task in tasks))
+
+    return 0
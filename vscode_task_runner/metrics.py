@@ -0,0 +1,380 @@
+"""
+Metrics of task execution in the Prometheus text format. They can be written
+to a file for the node_exporter textfile collector at the end of each run,
+and served over HTTP on localhost while tasks are running.
+
+Nothing is recorded unless metrics have been started.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Generator, NamedTuple, Optional
+
+from vscode_task_runner.exceptions import InvalidMetricsPort
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+
+if TYPE_CHECKING:
+    from vscode_task_runner.models.task import Task  # pragma: no cover
+
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0)
+"""
+Upper bounds in seconds of the buckets for how long tasks take, or wait.
+"""
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+"""
+Upper bounds in seconds of the buckets for how long processes take to start.
+"""
+
+
+class Metric(NamedTuple):
+    name: str
+    """
+    Name of the metric, including the unit.
+    """
+    kind: str
+    """
+    Prometheus type of the metric.
+    """
+    help: str
+    """
+    Description of the metric.
+    """
+    buckets: tuple[float, ...] = ()
+    """
+    Upper bounds of the buckets, for histograms.
+    """
+
+
+TASKS_STARTED = Metric(
+    "vtr_tasks_started_total",
+    "counter",
+    "Number of task processes started, including retries.",
+)
+TASKS_COMPLETED = Metric(
+    "vtr_tasks_completed_total",
+    "counter",
+    "Number of task executions that completed successfully.",
+)
+TASKS_FAILED = Metric(
+    "vtr_tasks_failed_total",
+    "counter",
+    "Number of task executions that failed or timed out.",
+)
+TASK_DURATION = Metric(
+    "vtr_task_duration_seconds",
+    "histogram",
+    "Wall time of each task execution.",
+    DURATION_BUCKETS,
+)
+TASK_SPAWN_LATENCY = Metric(
+    "vtr_task_spawn_latency_seconds",
+    "histogram",
+    "Time taken to start the process of a task.",
+    LATENCY_BUCKETS,
+)
+TASK_QUEUE_WAIT = Metric(
+    "vtr_task_queue_wait_seconds",
+    "histogram",
+    "Time a task was ready to start, but waiting for a free job or resources.",
+    DURATION_BUCKETS,
+)
+TASK_OUTPUT = Metric(
+    "vtr_task_output_bytes_total",
+    "counter",
+    "Bytes of output read from tasks. Only known when the output is piped.",
+)
+RUN_DURATION = Metric(
+    "vtr_run_duration_seconds",
+    "gauge",
+    "Wall time of the last run.",
+)
+RUN_FINISHED = Metric(
+    "vtr_run_last_finished_timestamp_seconds",
+    "gauge",
+    "Unix time the last run finished.",
+)
+
+METRICS = (
+    TASKS_STARTED,
+    TASKS_COMPLETED,
+    TASKS_FAILED,
+    TASK_DURATION,
+    TASK_SPAWN_LATENCY,
+    TASK_QUEUE_WAIT,
+    TASK_OUTPUT,
+    RUN_DURATION,
+    RUN_FINISHED,
+)
+"""
+Every metric, in the order they are written.
+"""
+
+
+class _Histogram:
+    """
+    Counts of observations in each bucket, along with their total.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Registry:
+    """
+    Records the metrics of a run. Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # values of counters and gauges, by metric and task label
+        self.values: dict[Metric, dict[Optional[str], float]] = {}
+        self.histograms: dict[Metric, dict[str, _Histogram]] = {}
+
+    def add(self, metric: Metric, label: Optional[str], value: float) -> None:
+        with self.lock:
+            values = self.values.setdefault(metric, {})
+            values[label] = values.get(label, 0) + value
+
+    def set(self, metric: Metric, value: float) -> None:
+        with self.lock:
+            self.values[metric] = {None: value}
+
+    def observe(self, metric: Metric, label: str, value: float) -> None:
+        with self.lock:
+            histograms = self.histograms.setdefault(metric, {})
+            if label not in histograms:
+                histograms[label] = _Histogram(metric.buckets)
+            histograms[label].observe(value)
+
+
+_registry: Optional[_Registry] = None
+
+
+def start() -> None:
+    """
+    Start recording metrics, discarding any recorded before.
+    """
+    global _registry
+    _registry = _Registry()
+
+
+def stop() -> None:
+    """
+    Stop recording metrics.
+    """
+    global _registry
+    _registry = None
+
+
+def enabled() -> bool:
+    """
+    Returns if metrics are being recorded.
+    """
+    return _registry is not None
+
+
+def metrics_port() -> Optional[int]:
+    """
+    Return the port on localhost to serve metrics on. This is set by the
+    VTR_METRICS_PORT environment variable, and defaults to not serving them.
+    """
+    if env_value := os.environ.get("VTR_METRICS_PORT"):
+        if not env_value.isdigit() or not 0 < int(env_value) < 65536:
+            raise InvalidMetricsPort(f"Metrics port '{env_value}' is not a valid port")
+
+        return int(env_value)
+
+    return None
+
+
+def task_spawned(label: str, latency: float) -> None:
+    """
+    Record that the process of a task was started, and how many seconds
+    it took to start.
+    """
+    registry = _registry
+    if registry is None:
+        return
+
+    registry.add(TASKS_STARTED, label, 1)
+    registry.observe(TASK_SPAWN_LATENCY, label, latency)
+
+
+def task_finished(task: Task) -> None:
+    """
+    Record the result of executing a task once. Tasks that were cancelled
+    are only counted as started.
+    """
+    registry = _registry
+    if registry is None:
+        return
+
+    if task._execution_state == TaskExecutionStateEnum.completed:
+        registry.add(TASKS_COMPLETED, task.label, 1)
+    elif task._execution_state in (
+        TaskExecutionStateEnum.failed,
+        TaskExecutionStateEnum.timed_out,
+    ):
+        registry.add(TASKS_FAILED, task.label, 1)
+    else:
+        return
+
+    if task._execution_duration is not None:
+        registry.observe(TASK_DURATION, task.label, task._execution_duration)
+
+
+def task_queued(label: str, wait: float) -> None:
+    """
+    Record how many seconds a task waited to start once it was ready.
+    """
+    registry = _registry
+    if registry is not None:
+        registry.observe(TASK_QUEUE_WAIT, label, wait)
+
+
+def task_output(label: str, size: int) -> None:
+    """
+    Record how many bytes of output were read from a task.
+    """
+    registry = _registry
+    if registry is not None:
+        registry.add(TASK_OUTPUT, label, size)
+
+
+def run_finished(duration: float) -> None:
+    """
+    Record that a run finished, and how many seconds it took.
+    """
+    registry = _registry
+    if registry is None:
+        return
+
+    registry.set(RUN_DURATION, duration)
+    registry.set(RUN_FINISHED, time.time())
+
+
+def _labels(**labels: Optional[str]) -> str:
+    """
+    Format labels for a sample, leaving out any that are not set.
+    """
+    escaped = {
+        name: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for name, value in labels.items()
+        if value is not None
+    }
+    if not escaped:
+        return ""
+
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+
+def _number(value: float) -> str:
+    """
+    Format a sample value, without a decimal point for whole numbers.
+    """
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render() -> str:
+    """
+    Returns the recorded metrics in the Prometheus text format.
+    """
+    registry = _registry
+    if registry is None:
+        return ""
+
+    lines: list[str] = []
+    with registry.lock:
+        for metric in METRICS:
+            values = registry.values.get(metric, {})
+            histograms = registry.histograms.get(metric, {})
+            if not values and not histograms:
+                continue
+
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            for label, value in sorted(values.items(), key=lambda item: item[0] or ""):
+                lines.append(f"{metric.name}{_labels(task=label)} {_number(value)}")
+
+            for label, histogram in sorted(histograms.items()):
+                for bound, count in zip(metric.buckets, histogram.counts):
+                    le = _labels(task=label, le=_number(bound))
+                    lines.append(f"{metric.name}_bucket{le} {count}")
+                le = _labels(task=label, le="+Inf")
+                lines.append(f"{metric.name}_bucket{le} {histogram.count}")
+                lines.append(
+                    f"{metric.name}_sum{_labels(task=label)} {_number(histogram.sum)}"
+                )
+                lines.append(
+                    f"{metric.name}_count{_labels(task=label)} {histogram.count}"
+                )
+
+    return "".join(line + "\n" for line in lines)
+
+
+def save(path: str) -> None:
+    """
+    Write the recorded metrics to a file. The file is replaced all at once,
+    so the textfile collector never reads it half written.
+    """
+    if _registry is None:
+        return
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as fp:
+        fp.write(render())
+    os.replace(temp_path, path)
+
+
+@contextlib.contextmanager
+def serve(port: int) -> Generator[int, None, None]:
+    """
+    Serve the recorded metrics over HTTP on localhost, while in the context.
+    Yields the port being served on, which is chosen by the system if 0.
+    """
+    # only import when needed
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            # don't mix requests in with the output of tasks
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
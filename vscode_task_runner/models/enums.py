@@ -70,6 +70,8 @@ class TaskExecutionStateEnum(Enum):
     pending = auto()
     completed = auto()
     failed = auto()
+    cancelled = auto()
+    timed_out = auto()
 
 
 class OutputStreamEnum(Enum):
@@ -81,6 +83,15 @@ class OutputStreamEnum(Enum):
     stderr = auto()
 
 
+class ExecutionEngineEnum(str, Enum):
+    """
+    Enum for the engines that can execute tasks
+    """
+
+    threads = "threads"
+    asyncio = "asyncio"
+
+
 class PlatformEnum(str, Enum):
     """
     Enum for platforms
@@ -89,3 +100,13 @@ class PlatformEnum(str, Enum):
     windows = "Windows"
     linux = "Linux"
     osx = "Darwin"
+
+
+class ProblemSeverityEnum(str, Enum):
+    """
+    Enum for the severity of problems found by problem matchers
+    """
+
+    error = "error"
+    warning = "warning"
+    info = "info"
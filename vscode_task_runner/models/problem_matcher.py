@@ -0,0 +1,261 @@
+import re
+from typing import Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from vscode_task_runner.models.enums import ProblemSeverityEnum
+
+
+def js_regex(pattern: str) -> re.Pattern:
+    """
+    Compile a JavaScript regular expression, as used by VS Code.
+    The syntax is nearly identical, except for named groups.
+    """
+    return re.compile(re.sub(r"\(\?<(?=[A-Za-z_])", "(?P<", pattern))
+
+
+class ProblemPattern(BaseModel):
+    """
+    Pattern to find a problem in a line of output. The other fields are the
+    match groups each part of the problem is taken from.
+    """
+
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/src/vs/workbench/contrib/tasks/common/problemMatcher.ts#L81-L134
+
+    regexp: str
+    """
+    Regular expression to match a line of output with.
+    """
+    kind: Optional[str] = None
+    """
+    Whether the problem is about a whole "file", or a "location" in it.
+    """
+    file: Optional[int] = None
+    location: Optional[int] = None
+    """
+    Match group of the location, as "line", "line,column",
+    or "line,column,endLine,endColumn".
+    """
+    line: Optional[int] = None
+    column: Optional[int] = None
+    end_line: Optional[int] = Field(alias="endLine", default=None)
+    end_column: Optional[int] = Field(alias="endColumn", default=None)
+    severity: Optional[int] = None
+    code: Optional[int] = None
+    message: Optional[int] = None
+    """
+    Match group of the message. The whole line is used if not set.
+    """
+    loop: bool = False
+    """
+    For the last pattern of a multi-line problem matcher, whether every
+    following line matching it is another problem.
+    """
+
+
+class WatchingPattern(BaseModel):
+    """
+    Pattern to detect the beginning or end of a background task's activity.
+    """
+
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/src/vs/workbench/contrib/tasks/common/problemMatcher.ts#L136-L139
+
+    regexp: str
+    """
+    Regular expression to match a line of output with.
+    """
+    file: Optional[int] = None
+    """
+    Match group of the file name, if any.
+    """
+
+
+class BackgroundMonitor(BaseModel):
+    """
+    Patterns to track when a background task is active.
+    """
+
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/src/vs/workbench/contrib/tasks/common/problemMatcher.ts#L1011-L1028
+
+    active_begin: bool = Field(alias="activeBegin", default=False)
+    """
+    If the task starts out active, before the begins pattern is printed.
+    """
+    begins_pattern: Optional[WatchingPattern] = Field(
+        alias="beginsPattern", default=None
+    )
+    """
+    Pattern that signals the task has started working.
+    """
+    ends_pattern: Optional[WatchingPattern] = Field(alias="endsPattern", default=None)
+    """
+    Pattern that signals the task has finished working, and is ready.
+    """
+
+    @field_validator("begins_pattern", "ends_pattern", mode="before")
+    def process_pattern(
+        cls, value: Optional[Union[str, dict]]
+    ) -> Optional[Union[WatchingPattern, dict]]:
+        """
+        Patterns can be given as just the regular expression.
+        """
+        if isinstance(value, str):
+            return WatchingPattern(regexp=value)
+
+        return value
+
+
+class ProblemMatcher(BaseModel):
+    """
+    Problem matcher model.
+    """
+
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/src/vs/workbench/contrib/tasks/common/problemMatcher.ts#L1030-L1100
+
+    model_config = ConfigDict(extra="allow")
+
+    base: Optional[str] = None
+    """
+    Name of a predefined problem matcher to extend.
+    """
+    owner: Optional[str] = None
+    """
+    Owner of the problems that are found.
+    """
+    source: Optional[str] = None
+    """
+    Name of the tool that reports the problems.
+    """
+    severity: Optional[ProblemSeverityEnum] = None
+    """
+    Severity of problems that the pattern does not give a severity for.
+    """
+    file_location: Optional[Union[str, list[str]]] = Field(
+        alias="fileLocation", default=None
+    )
+    """
+    How file names are interpreted. Either "absolute", "relative", or
+    "relative" followed by the directory they are relative to.
+    """
+    pattern: Optional[Union[str, ProblemPattern, list[ProblemPattern]]] = None
+    """
+    Patterns to find problems with, or the name of a predefined pattern.
+    A list of patterns matches a problem spread across multiple lines.
+    """
+    background: Optional[BackgroundMonitor] = None
+    """
+    Patterns to track when a background task is active.
+    """
+
+    # older name for the same thing
+    watching: Optional[BackgroundMonitor] = None
+
+    def background_use(self) -> Optional[BackgroundMonitor]:
+        """
+        Return the patterns to track when a background task is active.
+        """
+        return self.background or self.watching
+
+    def patterns_use(self) -> list[ProblemPattern]:
+        """
+        Return the patterns to find problems with. A pattern that refers to a
+        predefined pattern by name is resolved. Names that are not known are ignored.
+        """
+        if self.pattern is None:
+            return []
+
+        if isinstance(self.pattern, str):
+            return PREDEFINED_PROBLEM_PATTERNS.get(self.pattern, [])
+
+        if isinstance(self.pattern, ProblemPattern):
+            return [self.pattern]
+
+        return self.pattern
+
+
+def _patterns(*patterns: dict) -> list[ProblemPattern]:
+    return [ProblemPattern.model_validate(pattern) for pattern in patterns]
+
+
+PREDEFINED_PROBLEM_PATTERNS: dict[str, list[ProblemPattern]] = {
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/src/vs/workbench/contrib/tasks/common/problemMatcher.ts#L1200-L1290
+    "$tsc": _patterns(
+        {
+            "regexp": r"^([^\s].*)[\(:](\d+[,:]\d+)(?:\):\s+|\s+-\s+)(error|warning|info)\s+TS(\d+)\s*:\s*(.*)$",
+            "file": 1,
+            "location": 2,
+            "severity": 3,
+            "code": 4,
+            "message": 5,
+        }
+    ),
+    "$gcc": _patterns(
+        {
+            "regexp": r"^(.*?):(\d+):(\d*):?\s+(?:fatal\s+)?(warning|error):\s+(.*)$",
+            "file": 1,
+            "line": 2,
+            "column": 3,
+            "severity": 4,
+            "message": 5,
+        }
+    ),
+    "$eslint-stylish": _patterns(
+        {"regexp": r"^((?:[a-zA-Z]:)*[./\\]+.*?)$", "kind": "file", "file": 1},
+        {
+            "regexp": r"^\s+(\d+):(\d+)\s+(error|warning|info)\s+(.+?)(?:\s\s+(.*))?$",
+            "line": 1,
+            "column": 2,
+            "severity": 3,
+            "message": 4,
+            "code": 5,
+            "loop": True,
+        },
+    ),
+}
+"""
+Problem patterns that can be referred to by name.
+"""
+
+PREDEFINED_PROBLEM_MATCHERS: dict[str, ProblemMatcher] = {
+    "$tsc": ProblemMatcher.model_validate(
+        {
+            "owner": "typescript",
+            "source": "ts",
+            "fileLocation": "relative",
+            "pattern": "$tsc",
+        }
+    ),
+    "$gcc": ProblemMatcher.model_validate(
+        {
+            "owner": "cpp",
+            "source": "gcc",
+            "fileLocation": "relative",
+            "pattern": "$gcc",
+        }
+    ),
+    "$eslint-stylish": ProblemMatcher.model_validate(
+        {
+            "owner": "eslint",
+            "source": "eslint",
+            "fileLocation": "absolute",
+            "pattern": "$eslint-stylish",
+        }
+    ),
+    # https://github.com/microsoft/vscode/blob/e0c332665ce059efebb4477a90dd62e3aadcd688/extensions/typescript-language-features/package.json
+    "$tsc-watch": ProblemMatcher.model_validate(
+        {
+            "owner": "typescript",
+            "source": "ts",
+            "fileLocation": "relative",
+            "pattern": "$tsc",
+            "background": {
+                "activeBegin": True,
+                "beginsPattern": r"^\s*(?:message TS6032:|\[?\D*.{1,2}[:.].{1,2}[:.].{1,2}\D*(├\D*\d{1,2}\D+┤)?(?:\]| -)) (Starting compilation in watch mode|File change detected\. Starting incremental compilation)\.\.\.",
+                "endsPattern": r"^\s*(?:message TS6042:|\[?\D*.{1,2}[:.].{1,2}[:.].{1,2}\D*(├\D*\d{1,2}\D+┤)?(?:\]| -)) (?:Compilation complete\.|Found \d+ errors?\.) Watching for file changes\.",
+            },
+        }
+    ),
+}
+"""
+Problem matchers that can be referred to by name.
+"""
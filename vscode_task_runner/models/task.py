@@ -20,14 +20,21 @@ from vscode_task_runner.models.enums import (
     TaskExecutionStateEnum,
     TaskTypeEnum,
 )
+from vscode_task_runner.history import ResourceUsage
+from vscode_task_runner.models.problem_matcher import (
+    PREDEFINED_PROBLEM_MATCHERS,
+    ProblemMatcher,
+)
 from vscode_task_runner.models.properties import (
     BaseCommandProperties,
     CommandProperties,
 )
 from vscode_task_runner.models.shell import ShellConfiguration
 from vscode_task_runner.models.strings import CommandStringConfig
+from vscode_task_runner.resources import parse_memory
 from vscode_task_runner.utils.paths import which_resolver
 from vscode_task_runner.utils.shell import get_parent_shell
+from vscode_task_runner.variables.resolve import resolve_variables_data
 
 if TYPE_CHECKING:
     from vscode_task_runner.models.tasks import Tasks  # pragma: no cover
@@ -44,6 +51,75 @@ class GroupKind(BaseModel):
     is_default: Union[bool, str] = Field(alias="isDefault", default=False)
 
 
+class VtrOptions(BaseModel):
+    """
+    Task options specific to VS Code Task Runner. These are ignored by VS Code.
+    """
+
+    duration: Optional[float] = Field(default=None, ge=0)
+    """
+    Expected duration of the task in seconds. This takes priority over
+    durations recorded from previous runs when deciding which tasks to start first.
+    """
+    timeout: Optional[float] = Field(default=None, gt=0)
+    """
+    Maximum time in seconds the task may run for before it is stopped.
+    This takes priority over the timeout for all tasks.
+    """
+    retries: Optional[int] = Field(default=None, ge=0)
+    """
+    How many more times to execute the task if it fails.
+    This takes priority over the number of retries for all tasks.
+    """
+    retry_delay: float = Field(alias="retryDelay", default=1.0, ge=0)
+    """
+    Seconds to wait before retrying the task the first time.
+    This doubles with every retry.
+    """
+    cpu: Optional[float] = Field(default=None, gt=0)
+    """
+    Number of CPUs the task uses. The task is only started when this many
+    are free, out of the CPUs available to all tasks.
+    """
+    memory: Optional[int] = None
+    """
+    Memory the task uses in bytes, given as a number of bytes or an amount
+    such as "6G". The task is only started when this much is free,
+    out of the memory available to all tasks.
+    """
+    inputs: list[str] = Field(default_factory=list)
+    """
+    Glob patterns of files the task reads, relative to the working directory.
+    Declaring inputs allows the result of the task to be cached.
+    """
+    outputs: list[str] = Field(default_factory=list)
+    """
+    Glob patterns of files the task creates, relative to the working directory.
+    These are restored when a cached result is used.
+    """
+    input_env: list[str] = Field(alias="inputEnv", default_factory=list)
+    """
+    Names of inherited environment variables that affect the result of the task.
+    """
+
+    @field_validator("memory", mode="before")
+    def process_memory(cls, value: Optional[Union[int, float, str]]) -> Optional[int]:
+        """
+        Convert an amount of memory such as "6G" into a number of bytes.
+        """
+        if value is None:
+            return None
+
+        return parse_memory(value)
+
+    def resolve_variables(self) -> None:
+        """
+        Resolve variables for these options.
+        """
+        self.inputs = resolve_variables_data(self.inputs)
+        self.outputs = resolve_variables_data(self.outputs)
+
+
 class TaskProperties(CommandProperties, BaseCommandProperties):
     """
     Properties of a task.
@@ -61,6 +137,12 @@ class TaskProperties(CommandProperties, BaseCommandProperties):
     """
     If the task is a background task
     """
+    problem_matcher: Optional[
+        Union[str, ProblemMatcher, list[Union[str, ProblemMatcher]]]
+    ] = Field(alias="problemMatcher", default=None)
+    """
+    Problem matchers to scan the output of the task with
+    """
 
     @property
     def type_enum(self) -> TaskTypeEnum:
@@ -156,6 +238,10 @@ class Task(TaskProperties):
     """
     Order in which child tasks are executed.
     """
+    vtr: VtrOptions = Field(default_factory=VtrOptions)
+    """
+    Options specific to VS Code Task Runner.
+    """
 
     _depends_on: list[Task] = PrivateAttr(default_factory=list)
     """
@@ -183,6 +269,23 @@ class Task(TaskProperties):
     """
     Record the return code of the task after execution.
     """
+    _execution_duration: Optional[float] = PrivateAttr(default=None)
+    """
+    Record how long the task took to execute, in seconds.
+    """
+    _execution_attempts: int = PrivateAttr(default=0)
+    """
+    Record how many times the task was executed, including retries.
+    """
+    _execution_usage: Optional[ResourceUsage] = PrivateAttr(default=None)
+    """
+    Record the resources the last execution of the task used, if known.
+    """
+    _shell: Optional[ShellConfiguration] = PrivateAttr(default=None)
+    """
+    Keep track of the shell configuration once it has been determined,
+    as detecting the parent shell is slow.
+    """
 
     @field_validator("depends_on_labels", mode="before")
     def process_depends_on_labels(cls, value: Union[str, list[str]]) -> list[str]:
@@ -239,10 +342,6 @@ class Task(TaskProperties):
             # unsupported task type
             return False
 
-        if self.is_background_use():
-            # background tasks are not supported
-            return False
-
         return True
 
     def is_background_use(self) -> bool:
@@ -261,6 +360,48 @@ class Task(TaskProperties):
 
         return False
 
+    def problem_matchers_use(self) -> list[ProblemMatcher]:
+        """
+        Return the problem matchers for this task. Problem matchers that
+        refer to a predefined problem matcher by name are resolved.
+        Names that are not known are ignored.
+        """
+        problem_matcher = self.problem_matcher
+
+        # like background tasks, the global setting only applies
+        # to tasks using the global command
+        if problem_matcher is None and self.command_os() is None:
+            problem_matcher = self._tasks.problem_matcher
+
+        if problem_matcher is None:
+            return []
+
+        if not isinstance(problem_matcher, list):
+            problem_matcher = [problem_matcher]
+
+        matchers = []
+        for matcher in problem_matcher:
+            if isinstance(matcher, str):
+                if matcher in PREDEFINED_PROBLEM_MATCHERS:
+                    matchers.append(PREDEFINED_PROBLEM_MATCHERS[matcher])
+
+            elif matcher.base in PREDEFINED_PROBLEM_MATCHERS:
+                # anything set takes priority over the base
+                base = PREDEFINED_PROBLEM_MATCHERS[matcher.base]
+                matchers.append(
+                    ProblemMatcher.model_validate(
+                        {
+                            **base.model_dump(by_alias=True, exclude_unset=True),
+                            **matcher.model_dump(by_alias=True, exclude_unset=True),
+                        }
+                    )
+                )
+
+            else:
+                matchers.append(matcher)
+
+        return matchers
+
     def group_use(self) -> Optional[Union[GroupKindEnum, GroupKind]]:
         """
         Return the group for this task.
@@ -301,9 +442,10 @@ class Task(TaskProperties):
         # combine with a copy of the current environment
         return {**os.environ.copy(), **task_env}
 
-    def cwd_use(self) -> Path:
+    def cwd_use(self, check: bool = True) -> Path:
         """
-        Return the working directory to to use for this task.
+        Return the working directory to to use for this task. Unless check
+        is False, raises an error if it does not exist.
         """
         cwd = Path(os.getcwd())
 
@@ -322,7 +464,7 @@ class Task(TaskProperties):
         elif global_cwd := self._tasks.cwd_os():
             cwd = base.joinpath(global_cwd)
 
-        if not cwd.is_dir():
+        if check and not cwd.is_dir():
             raise WorkingDirectoryNotFound(f"Working directory {cwd} does not exist")
 
         return cwd
@@ -359,6 +501,9 @@ class Task(TaskProperties):
         """
         Return the shell configuration to use for this task.
         """
+        if self._shell is not None:
+            return self._shell
+
         shell = ShellConfiguration()
 
         # task settings
@@ -373,11 +518,15 @@ class Task(TaskProperties):
             # if no shell binary defined, use the parent shell
             shell = get_parent_shell()
 
-        # make sure shell executable exists and is absolute
+        # make sure shell executable exists and is absolute, without changing
+        # the configuration, which may be shared with other tasks
         assert shell.executable is not None
-        shell.executable = which_resolver(shell.executable)
+        shell = shell.model_copy(
+            update={"executable": which_resolver(shell.executable)}
+        )
 
         # return the shell config
+        self._shell = shell
         return shell
 
     # =======
@@ -394,6 +543,7 @@ class Task(TaskProperties):
         # need to do this because of mixins
         CommandProperties.resolve_variables(self)
         BaseCommandProperties.resolve_variables(self)
+        self.vtr.resolve_variables()
 
         # record what we did
         self._vars_resolved = True
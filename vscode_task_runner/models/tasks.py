@@ -39,10 +39,13 @@ class Tasks(TaskProperties):
         """
         This runs automatically after the model is initialized.
         """
+        # build this once, rather than for every dependency
+        tasks_dict = self.tasks_dict
+
         for task in self.tasks:
             # give the task a reference to the parent tasks object
             task._tasks = self
 
             # convert the depends on task labels to task objects
             for task_label in task.depends_on_labels:
-                task._depends_on.append(self.tasks_dict[task_label])
+                task._depends_on.append(tasks_dict[task_label])
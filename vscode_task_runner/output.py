@@ -0,0 +1,324 @@
+"""
+Printing of output from tasks running in parallel. Every line is given
+a prefix with the task label so the interleaved output can be told apart.
+"""
+
+from __future__ import annotations
+
+import locale
+import os
+import selectors
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Optional
+
+from vscode_task_runner import printer
+from vscode_task_runner.models.enums import OutputStreamEnum
+
+if TYPE_CHECKING:
+    from vscode_task_runner.problems import ProblemMatchers  # pragma: no cover
+
+CHUNK_SIZE = 64 * 1024
+"""
+Maximum number of bytes to read from a task output stream at once.
+"""
+
+
+class LineBuffer:
+    """
+    Splits raw output from a task into complete lines, with a prefix applied.
+    Incomplete lines are held until the rest of the line arrives.
+    Complete lines are scanned for problems with the given problem matchers.
+    """
+
+    def __init__(
+        self, prefix: str, problem_matchers: Optional[ProblemMatchers] = None
+    ) -> None:
+        self._prefix = prefix
+        self._encoding = locale.getpreferredencoding(False)
+        self._partial = b""
+        self._scanner = (
+            problem_matchers.scanner() if problem_matchers is not None else None
+        )
+
+    def _decode(self, data: bytes) -> list[str]:
+        """
+        Decode complete lines and apply the prefix to each.
+        """
+        text = data.decode(self._encoding, errors="replace")
+        lines = [line.rstrip() for line in text.split("\n")]
+
+        if self._scanner is not None:
+            self._scanner.feed(lines)
+
+        return [self._prefix + line for line in lines]
+
+    def feed(self, data: bytes) -> list[str]:
+        """
+        Add raw output, and return any lines that are now complete.
+        """
+        complete, newline, self._partial = (self._partial + data).rpartition(b"\n")
+        if not newline:
+            return []
+
+        return self._decode(complete)
+
+    def flush(self) -> list[str]:
+        """
+        Return whatever is left once the stream has ended.
+        """
+        if not self._partial:
+            return []
+
+        lines = self._decode(self._partial)
+        self._partial = b""
+        return lines
+
+
+class _Stream:
+    """
+    A single output stream of a task that is being read.
+    """
+
+    def __init__(
+        self, pipe: IO[bytes], output: OutputStreamEnum, task_output: TaskOutput
+    ) -> None:
+        self.pipe = pipe
+        self.output = output
+        self.task_output = task_output
+        self.lines = LineBuffer(task_output.prefix, task_output.problem_matchers)
+
+
+class TaskOutput:
+    """
+    The output streams of a single task.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        capture: bool = False,
+        problem_matchers: Optional[ProblemMatchers] = None,
+    ) -> None:
+        self.prefix = prefix
+        self.capture = capture
+        """
+        Whether to keep a copy of the raw output.
+        """
+        self.problem_matchers = problem_matchers
+        """
+        Problem matchers to scan the output with, if any.
+        """
+        self.captured = {
+            OutputStreamEnum.stdout: bytearray(),
+            OutputStreamEnum.stderr: bytearray(),
+        }
+        """
+        Raw output of the task, if captured.
+        """
+        self.first_output: Optional[float] = None
+        """
+        When the first output arrived, from `time.perf_counter`.
+        """
+        self.size = 0
+        """
+        Number of bytes of output read from both streams.
+        """
+        self.open_streams = 2
+        self.finished = threading.Event()
+        """
+        Set once both streams have ended and all output has been printed.
+        """
+
+    def feed(self, stream: _Stream, chunk: bytes) -> list[str]:
+        """
+        Add raw output from one of the streams, and return any lines
+        that are now complete.
+        """
+        if self.first_output is None:
+            self.first_output = time.perf_counter()
+
+        self.size += len(chunk)
+        if self.capture:
+            self.captured[stream.output].extend(chunk)
+
+        return stream.lines.feed(chunk)
+
+
+def print_lines(lines: list[str], output: OutputStreamEnum) -> None:
+    """
+    Print a batch of lines at once.
+    """
+    if not lines:
+        return
+
+    if output == OutputStreamEnum.stdout:
+        printer.stdout("\n".join(lines))
+    else:
+        printer.stderr("\n".join(lines))
+
+
+class OutputMultiplexer:
+    """
+    Reads the output of every task running in parallel from a single thread,
+    and prints it in batches with each task's prefix.
+
+    Pipes cannot be waited on with `select` on Windows, so there each stream
+    is read by its own thread instead.
+    """
+
+    def __init__(self) -> None:
+        self._use_selector = os.name != "nt"
+        self._lock = threading.Lock()
+        self._closed = False
+        # streams waiting to be registered with the selector
+        self._pending: list[_Stream] = []
+        self._thread: Optional[threading.Thread] = None
+
+        if self._use_selector:
+            self._selector = selectors.DefaultSelector()
+            # writing to this pipe wakes up the selector loop
+            self._wake_read, self._wake_write = os.pipe()
+            self._selector.register(self._wake_read, selectors.EVENT_READ)
+
+    def __enter__(self) -> OutputMultiplexer:
+        if self._use_selector:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop reading once all streams that were added have ended.
+        """
+        with self._lock:
+            self._closed = True
+
+        if self._thread is not None:
+            self._wake()
+            self._thread.join()
+            self._thread = None
+
+            self._selector.close()
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+
+    def add(
+        self,
+        stdout: IO[bytes],
+        stderr: IO[bytes],
+        prefix: str,
+        capture: bool = False,
+        problem_matchers: Optional[ProblemMatchers] = None,
+    ) -> TaskOutput:
+        """
+        Start reading the output streams of a task, optionally keeping a copy
+        of the raw output, and scanning it with problem matchers.
+        """
+        task_output = TaskOutput(
+            prefix, capture=capture, problem_matchers=problem_matchers
+        )
+        streams = [
+            _Stream(stdout, OutputStreamEnum.stdout, task_output),
+            _Stream(stderr, OutputStreamEnum.stderr, task_output),
+        ]
+
+        if not self._use_selector:  # pragma: no cover
+            for stream in streams:
+                threading.Thread(target=self._read_thread, args=(stream,)).start()
+
+            return task_output
+
+        with self._lock:
+            self._pending.extend(streams)
+
+        self._wake()
+        return task_output
+
+    def _wake(self) -> None:
+        """
+        Wake up the selector loop.
+        """
+        os.write(self._wake_write, b"\0")
+
+    def _end_stream(self, stream: _Stream) -> list[str]:
+        """
+        Close a stream that has ended, and return any output left over.
+        """
+        stream.pipe.close()
+        stream.task_output.open_streams -= 1
+        return stream.lines.flush()
+
+    def _read_thread(self, stream: _Stream) -> None:  # pragma: no cover
+        """
+        Read a single stream until it ends.
+        """
+        fd = stream.pipe.fileno()
+        while chunk := os.read(fd, CHUNK_SIZE):
+            lines = stream.task_output.feed(stream, chunk)
+            with self._lock:
+                print_lines(lines, stream.output)
+
+        with self._lock:
+            print_lines(self._end_stream(stream), stream.output)
+            if stream.task_output.open_streams == 0:
+                stream.task_output.finished.set()
+
+    def _run(self) -> None:
+        """
+        Selector loop. Reads whatever output is available from every stream,
+        then prints it all at once.
+        """
+        while True:
+            stdout_lines: list[str] = []
+            stderr_lines: list[str] = []
+            finished: list[TaskOutput] = []
+
+            for key, _ in self._selector.select():
+                if key.fileobj == self._wake_read:
+                    os.read(self._wake_read, CHUNK_SIZE)
+
+                    with self._lock:
+                        for pending in self._pending:
+                            self._selector.register(
+                                pending.pipe, selectors.EVENT_READ, pending
+                            )
+                        self._pending = []
+
+                    continue
+
+                stream: _Stream = key.data
+                lines = (
+                    stdout_lines
+                    if stream.output == OutputStreamEnum.stdout
+                    else stderr_lines
+                )
+
+                if chunk := os.read(stream.pipe.fileno(), CHUNK_SIZE):
+                    lines.extend(stream.task_output.feed(stream, chunk))
+                else:
+                    self._selector.unregister(stream.pipe)
+                    lines.extend(self._end_stream(stream))
+
+                    if stream.task_output.open_streams == 0:
+                        finished.append(stream.task_output)
+
+            print_lines(stdout_lines, OutputStreamEnum.stdout)
+            print_lines(stderr_lines, OutputStreamEnum.stderr)
+
+            # only tell tasks they are done once their output has been printed
+            for task_output in finished:
+                task_output.finished.set()
+
+            # close once every stream has ended
+            with self._lock:
+                if (
+                    self._closed
+                    and not self._pending
+                    and len(self._selector.get_map()) == 1
+                ):
+                    return
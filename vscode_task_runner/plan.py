@@ -0,0 +1,135 @@
+"""
+Run plans, which hold everything needed to execute a set of tasks: the graph of
+tasks, and the compiled command, working directory and environment variables of
+each. A plan is written once all variables have been resolved and inputs answered,
+and can then be executed elsewhere, without reading the tasks file, validating
+it, or prompting for anything.
+"""
+
+import json
+from typing import Any
+
+from vscode_task_runner.exceptions import PlanInvalid
+from vscode_task_runner.graph import TaskNode
+from vscode_task_runner.models.options import CommandOptions
+from vscode_task_runner.models.problem_matcher import ProblemMatcher
+from vscode_task_runner.models.task import Task, VtrOptions
+from vscode_task_runner.models.tasks import Tasks
+from vscode_task_runner.spec import ExecSpec
+
+PLAN_VERSION = 1
+"""
+Version of the plan format. Plans of any other version can't be executed.
+"""
+
+
+def _dump_node(node: TaskNode, spec: ExecSpec) -> dict[str, Any]:
+    """
+    Return the plan of a single node.
+    """
+    return {
+        "label": spec.label,
+        "dependencies": [dependency.task.label for dependency in node.dependencies],
+        "argv": list(spec.argv),
+        "cwd": spec.cwd,
+        "env": dict(spec.env),
+        "virtual": spec.virtual,
+        "background": spec.background,
+        "timeout": spec.timeout,
+        "attempts": spec.attempts,
+        "retryDelay": spec.retry_delay,
+        "vtr": node.task.vtr.model_dump(mode="json", by_alias=True),
+        "problemMatchers": [
+            matcher.model_dump(mode="json", by_alias=True, exclude_unset=True)
+            for matcher in node.task.problem_matchers_use()
+        ],
+    }
+
+
+def save_plan(
+    path: str, nodes: list[TaskNode], specs: dict[TaskNode, ExecSpec]
+) -> None:
+    """
+    Write the plan of the given nodes, in the order they were planned,
+    to a file.
+    """
+    plan = {
+        "version": PLAN_VERSION,
+        "nodes": [_dump_node(node, specs[node]) for node in nodes],
+    }
+
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(plan, fp, indent=2)
+
+
+def _load_node(data: dict[str, Any]) -> tuple[Task, ExecSpec]:
+    """
+    Return the task and compiled spec of a single node of a plan.
+    """
+    spec = ExecSpec(
+        label=data["label"],
+        argv=tuple(data["argv"]),
+        cwd=data["cwd"],
+        env=tuple(sorted(data["env"].items())),
+        virtual=data["virtual"],
+        background=data["background"],
+        timeout=data["timeout"],
+        attempts=data["attempts"],
+        retry_delay=data["retryDelay"],
+    )
+
+    # the plan was validated when it was written, so the task is only built
+    # with what execution needs, skipping validation
+    task = Task.model_construct(
+        label=spec.label,
+        is_background=spec.background,
+        options=CommandOptions.model_construct(cwd=spec.cwd, env=dict(spec.env)),
+        problem_matcher=[
+            ProblemMatcher.model_validate(matcher)
+            for matcher in data["problemMatchers"]
+        ],
+        vtr=VtrOptions.model_construct(**data["vtr"]),
+    )
+    # variables were resolved before the plan was written
+    task._vars_resolved = True
+    return task, spec
+
+
+def load_plan(path: str) -> tuple[list[TaskNode], dict[TaskNode, ExecSpec]]:
+    """
+    Read a plan from a file. Returns the nodes in the order they were planned,
+    and the compiled spec of each.
+    """
+    try:
+        with open(path, encoding="utf-8") as fp:
+            plan = json.load(fp)
+    except (OSError, ValueError) as e:
+        raise PlanInvalid(f"Unable to read plan {path}: {e}") from e
+
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        raise PlanInvalid(f"Plan {path} is not a version {PLAN_VERSION} plan")
+
+    nodes: dict[str, TaskNode] = {}
+    specs: dict[TaskNode, ExecSpec] = {}
+    tasks: list[Task] = []
+
+    try:
+        for data in plan["nodes"]:
+            task, spec = _load_node(data)
+            node = TaskNode(task)
+            # dependencies are always planned before the nodes that wait on them
+            for label in data["dependencies"]:
+                node.add_dependency(nodes[label])
+
+            nodes[spec.label] = node
+            specs[node] = spec
+            tasks.append(task)
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise PlanInvalid(f"Plan {path} is not valid: {e!r}") from e
+
+    if not nodes:
+        raise PlanInvalid(f"Plan {path} has no tasks")
+
+    # give the tasks the parent they would have from a tasks file
+    Tasks.model_construct(version="2.0.0", tasks=tasks)
+    return list(nodes.values()), specs
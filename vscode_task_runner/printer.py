@@ -2,10 +2,13 @@ import os
 import sys
 import tempfile
 from contextlib import contextmanager
-from typing import Generator, TextIO
+from typing import TYPE_CHECKING, Generator, Optional, TextIO
 
 import colorama
 
+if TYPE_CHECKING:
+    from vscode_task_runner.history import ResourceUsage  # pragma: no cover
+
 IS_GITHUB_ACTIONS = bool(os.getenv("GITHUB_ACTIONS"))
 IS_AZURE_PIPELINES = bool(os.getenv("TF_BUILD"))
 
@@ -58,6 +61,72 @@ def error(msg: str) -> None:  # pragma: no cover
         stderr(f"{red(msg)}")
 
 
+def _escape(value: str, escapes: dict[str, str]) -> str:  # pragma: no cover
+    """
+    Escapes characters with a special meaning in CI/CD logging commands.
+    """
+    for char, escaped in escapes.items():
+        value = value.replace(char, escaped)
+    return value
+
+
+def annotation(
+    severity: str,
+    msg: str,
+    file: Optional[str] = None,
+    line: Optional[int] = None,
+    column: Optional[int] = None,
+    end_line: Optional[int] = None,
+    end_column: Optional[int] = None,
+    title: Optional[str] = None,
+) -> None:  # pragma: no cover
+    """
+    Creates an annotation in GitHub Actions/Azure Pipelines, which is shown
+    next to the given location in the code. The severity is one of
+    "error", "warning", or "info". Does nothing elsewhere.
+    """
+    if IS_GITHUB_ACTIONS:
+        # https://docs.github.com/en/actions/reference/workflow-commands-for-github-actions
+        data_escapes = {"%": "%25", "\r": "%0D", "\n": "%0A"}
+        property_escapes = {**data_escapes, ":": "%3A", ",": "%2C"}
+
+        properties = {
+            "file": file,
+            "line": line,
+            "col": column,
+            "endLine": end_line,
+            "endColumn": end_column,
+            "title": title,
+        }
+        params = ",".join(
+            f"{key}={_escape(str(value), property_escapes)}"
+            for key, value in properties.items()
+            if value is not None
+        )
+        command = "notice" if severity == "info" else severity
+        stdout(f"::{command} {params}::{_escape(msg, data_escapes)}")
+
+    elif IS_AZURE_PIPELINES:
+        # https://learn.microsoft.com/en-us/azure/devops/pipelines/scripts/logging-commands#logissue-log-an-error-or-warning
+        data_escapes = {"%": "%AZP25", "\r": "%0D", "\n": "%0A"}
+        property_escapes = {**data_escapes, ";": "%3B", "]": "%5D"}
+
+        properties = {
+            # only errors and warnings are supported
+            "type": "error" if severity == "error" else "warning",
+            "sourcepath": file,
+            "linenumber": line,
+            "columnnumber": column,
+            "code": title,
+        }
+        params = "".join(
+            f"{key}={_escape(str(value), property_escapes)};"
+            for key, value in properties.items()
+            if value is not None
+        )
+        stdout(f"##vso[task.logissue {params}]{_escape(msg, data_escapes)}")
+
+
 def blue(msg: str) -> str:  # pragma: no cover
     """
     Returns a blue-colored string. Respects existing colors.
@@ -98,22 +167,126 @@ def rainbow(msg: str, index: int) -> str:  # pragma: no cover
     return _color_string(msg, color)
 
 
+def _format_bytes(size: int) -> str:
+    """
+    Formats a number of bytes in the largest unit that keeps it above 1.
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def resource_table(
+    task_durations: dict[str, float],
+    task_usage: dict[str, "ResourceUsage"],
+    wall_time: float,
+    slots: int,
+) -> str:
+    """
+    Returns a Markdown table of the wall time, CPU time, CPU utilisation and peak
+    memory of each task, slowest first, followed by the totals for the run.
+    Tasks without a known resource usage only have their wall time shown.
+
+    Parallel efficiency is the time spent in tasks, divided by the time
+    that was available across all slots for the length of the run.
+    """
+    if not task_durations:
+        return ""
+
+    def utilisation(cpu_time: float, duration: float) -> str:
+        return f"{cpu_time / duration:.0%}" if duration > 0 else "-"
+
+    msg = "## Resource Usage 📊\n\n"
+    msg += "| Task | Wall Time | CPU Time | CPU Utilisation | Peak Memory |\n"
+    msg += "| --- | ---: | ---: | ---: | ---: |\n"
+    for task, duration in sorted(
+        task_durations.items(), key=lambda item: item[1], reverse=True
+    ):
+        usage = task_usage.get(task)
+        if usage is None:
+            msg += f"| `{task}` | {duration:.1f}s | - | - | - |\n"
+            continue
+
+        cpu_time = usage.user_time + usage.system_time
+        msg += (
+            f"| `{task}` | {duration:.1f}s | {cpu_time:.1f}s "
+            + f"| {utilisation(cpu_time, duration)} "
+            + f"| {_format_bytes(usage.max_rss)} |\n"
+        )
+
+    total_duration = sum(task_durations.values())
+    # CPU time is only totalled for the tasks it is known for
+    known = [task for task in task_durations if task in task_usage]
+    if known:
+        cpu_time = sum(
+            task_usage[task].user_time + task_usage[task].system_time for task in known
+        )
+        known_duration = sum(task_durations[task] for task in known)
+        peak = max(task_usage[task].max_rss for task in known)
+        msg += (
+            f"| **Total** | {total_duration:.1f}s | {cpu_time:.1f}s "
+            + f"| {utilisation(cpu_time, known_duration)} "
+            + f"| {_format_bytes(peak)} |\n\n"
+        )
+    else:
+        msg += f"| **Total** | {total_duration:.1f}s | - | - | - |\n\n"
+
+    efficiency = total_duration / (wall_time * slots) if wall_time > 0 and slots else 0
+    msg += (
+        f"Ran for {wall_time:.1f}s with {slots} slot{'s' * (slots != 1)}, "
+        + f"parallel efficiency {efficiency:.0%}\n\n"
+    )
+    return msg
+
+
 def summary(
-    completed_tasks: list[str], skipped_tasks: list[str], failed_tasks: list[str]
+    completed_tasks: list[str],
+    skipped_tasks: list[str],
+    failed_tasks: list[str],
+    cancelled_tasks: list[str],
+    timed_out_tasks: dict[str, float],
+    retried_tasks: dict[str, int],
+    task_durations: Optional[dict[str, float]] = None,
+    task_usage: Optional[dict[str, "ResourceUsage"]] = None,
+    wall_time: float = 0.0,
+    slots: int = 1,
 ) -> None:  # pragma: no cover
     """
     Uploads a step summary in GitHub Actions/Azure Pipelines.
+    Timed out tasks are given along with how long they ran for, in seconds,
+    and tasks that were executed more than once along with how many times.
+    The wall time of each task that ran, and the resources it used, are added
+    as a table, along with the wall time of the whole run and how many tasks
+    could run at once.
     """
     if os.environ.get("VTR_SKIP_SUMMARY"):
         return
 
     msg = ""
 
+    def attempts(task: str) -> str:
+        if task in retried_tasks:
+            return f" ({retried_tasks[task]} attempts)"
+        return ""
+
     # completed
     if completed_tasks:
         msg += f"## {len(completed_tasks)} Task{'s' * (len(completed_tasks) > 1)} Completed ✅\n\n"
         msg += "\n".join(f"- `{task}`" for task in completed_tasks) + "\n\n"
 
+    # completed only after retrying
+    if passed_after_retrying := [
+        task for task in completed_tasks if task in retried_tasks
+    ]:
+        msg += f"## {len(passed_after_retrying)} Task{'s' * (len(passed_after_retrying) > 1)} Passed After Retrying 🔁\n\n"
+        msg += (
+            "\n".join(f"- `{task}`{attempts(task)}" for task in passed_after_retrying)
+            + "\n\n"
+        )
+
     # skipped
     if skipped_tasks:
         msg += f"## {len(skipped_tasks)} Task{'s' * (len(skipped_tasks) > 1)} Skipped ⏩\n\n"
@@ -124,7 +297,28 @@ def summary(
         msg += (
             f"## {len(failed_tasks)} Task{'s' * (len(failed_tasks) > 1)} Failed ❌\n\n"
         )
-        msg += "\n".join(f"- `{task}`" for task in failed_tasks) + "\n\n"
+        msg += (
+            "\n".join(f"- `{task}`{attempts(task)}" for task in failed_tasks) + "\n\n"
+        )
+
+    # cancelled
+    if cancelled_tasks:
+        msg += f"## {len(cancelled_tasks)} Task{'s' * (len(cancelled_tasks) > 1)} Cancelled 🛑\n\n"
+        msg += "\n".join(f"- `{task}`" for task in cancelled_tasks) + "\n\n"
+
+    # timed out
+    if timed_out_tasks:
+        msg += f"## {len(timed_out_tasks)} Task{'s' * (len(timed_out_tasks) > 1)} Timed Out ⏱️\n\n"
+        msg += (
+            "\n".join(
+                f"- `{task}` ({duration:.1f}s){attempts(task)}"
+                for task, duration in timed_out_tasks.items()
+            )
+            + "\n\n"
+        )
+
+    # resource usage
+    msg += resource_table(task_durations or {}, task_usage or {}, wall_time, slots)
 
     if IS_GITHUB_ACTIONS:
         summary_file = os.environ["GITHUB_STEP_SUMMARY"]
@@ -0,0 +1,492 @@
+"""
+Problem matchers find errors and warnings in the output of tasks, such as
+those from compilers and linters. In GitHub Actions and Azure Pipelines, the
+problems found are reported as annotations, so they show up next to the code.
+
+Most lines of output have no problems, so the output is first searched for
+text that the first pattern of every problem matcher needs, such as "error" or
+"warning", and the lines without any of it are skipped. Other lines are searched
+with a single regular expression, combining the first pattern of each problem
+matcher, or with the first pattern of only those matchers whose text is in the
+line. Lines that need searching still cost more for every problem matcher, and
+a matcher whose first pattern needs no text, or only text found in almost every
+line, such as the file names of "$eslint-stylish", has every line searched.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import re
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from vscode_task_runner import printer
+from vscode_task_runner.models.enums import ProblemSeverityEnum
+from vscode_task_runner.models.problem_matcher import (
+    ProblemMatcher,
+    js_regex,
+)
+from vscode_task_runner.variables.resolve import replace_supported_variables
+
+if TYPE_CHECKING:
+    from vscode_task_runner.models.task import Task  # pragma: no cover
+
+_SEVERITIES = {
+    "error": ProblemSeverityEnum.error,
+    "fatal": ProblemSeverityEnum.error,
+    "warning": ProblemSeverityEnum.warning,
+    "warn": ProblemSeverityEnum.warning,
+    "info": ProblemSeverityEnum.info,
+    "information": ProblemSeverityEnum.info,
+    "note": ProblemSeverityEnum.info,
+    "hint": ProblemSeverityEnum.info,
+}
+
+_FIELDS = (
+    "file",
+    "location",
+    "line",
+    "column",
+    "end_line",
+    "end_column",
+    "severity",
+    "code",
+    "message",
+)
+
+# patterns that refer to their own groups can't be combined,
+# as the group numbers change
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+try:
+    _sre_parse: Any = importlib.import_module("re._parser")
+except ImportError:  # pragma: no cover
+    # before Python 3.11
+    _sre_parse = importlib.import_module("sre_parse")
+
+
+class Problem(NamedTuple):
+    """
+    A problem found in the output of a task.
+    """
+
+    message: str
+    severity: ProblemSeverityEnum
+    file: Optional[str] = None
+    line: Optional[int] = None
+    column: Optional[int] = None
+    end_line: Optional[int] = None
+    end_column: Optional[int] = None
+    code: Optional[str] = None
+    source: Optional[str] = None
+
+
+def _shifted(match: re.Match, offset: int) -> Callable[[int], Optional[str]]:
+    """
+    Returns a function to get the groups of one alternative of a combined
+    expression, numbered as they are in the pattern on its own.
+    """
+    return lambda group: match.group(offset + group)
+
+
+def _required(parsed: Any) -> Optional[frozenset[str]]:
+    """
+    Returns strings of which at least one is in any text the parsed
+    expression matches, or None if there are no such strings.
+    """
+    options: list[frozenset[str]] = []
+    run = ""
+    for op, av in parsed:
+        if op == _sre_parse.LITERAL:
+            run += chr(av)
+            continue
+
+        if run:
+            options.append(frozenset((run,)))
+            run = ""
+
+        required = None
+        if op == _sre_parse.SUBPATTERN:
+            required = _required(av[-1])
+        elif op == _sre_parse.BRANCH:
+            branches = [_required(branch) for branch in av[1]]
+            if all(branches):
+                required = frozenset().union(*filter(None, branches))
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT) and av[0] >= 1:
+            required = _required(av[2])
+        elif op == _sre_parse.IN and all(item == _sre_parse.LITERAL for item, _ in av):
+            required = frozenset(chr(value) for _, value in av)
+
+        if required:
+            options.append(required)
+
+    if run:
+        options.append(frozenset((run,)))
+
+    if not options:
+        return None
+
+    # the strings that are least likely to be found in lines without problems
+    return max(options, key=lambda option: min(map(len, option)))
+
+
+def _ignores_case(parsed: Any) -> bool:
+    """
+    Returns whether any part of the parsed expression turns on
+    case insensitive matching with an inline flag, such as "(?i:error)".
+    """
+    for op, av in parsed:
+        if op == _sre_parse.SUBPATTERN and av[1] & re.IGNORECASE:
+            return True
+
+        # nested expressions, including the alternatives of a branch
+        values = av if isinstance(av, (tuple, list)) else ()
+        for value in values:
+            nested = value if isinstance(value, list) else [value]
+            if any(
+                isinstance(item, _sre_parse.SubPattern) and _ignores_case(item)
+                for item in nested
+            ):
+                return True
+
+    return False
+
+
+def _literals(regex: re.Pattern) -> Optional[frozenset[str]]:
+    """
+    Returns strings of which at least one is in any line the expression
+    matches, or None if every line needs to be searched.
+    """
+    if regex.flags & re.IGNORECASE:
+        return None
+
+    try:
+        parsed = _sre_parse.parse(regex.pattern, regex.flags)
+        return None if _ignores_case(parsed) else _required(parsed)
+    except Exception:
+        return None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value and value.isdigit() else None
+
+
+class _CompiledMatcher:
+    """
+    A problem matcher with its patterns compiled.
+    """
+
+    def __init__(self, matcher: ProblemMatcher, cwd: str) -> None:
+        self.patterns = matcher.patterns_use()
+        self.regexes = [js_regex(pattern.regexp) for pattern in self.patterns]
+        self.severity = matcher.severity or ProblemSeverityEnum.error
+        self.source = matcher.source or matcher.owner
+
+        # file names are relative to the working directory of the task,
+        # unless another directory is given
+        self.directory = cwd
+        if isinstance(matcher.file_location, list) and len(matcher.file_location) > 1:
+            self.directory = os.path.join(
+                cwd, replace_supported_variables(matcher.file_location[1])
+            )
+
+    def extract(
+        self, position: int, group: Callable[[int], Optional[str]]
+    ) -> dict[str, str]:
+        """
+        Take the parts of a problem from the match of the pattern at the given
+        position. The group function returns the text of a match group.
+        """
+        pattern = self.patterns[position]
+        data = {}
+        for field in _FIELDS:
+            index = getattr(pattern, field)
+            if index is not None and (value := group(index)):
+                data[field] = value
+
+        if "message" not in data and position == len(self.patterns) - 1:
+            data["message"] = (group(0) or "").strip()
+
+        return data
+
+    def problem(self, data: dict[str, str]) -> Problem:
+        """
+        Create a problem from the parts taken from the matched lines.
+        """
+        line = _int(data.get("line"))
+        column = _int(data.get("column"))
+        end_line = _int(data.get("end_line"))
+        end_column = _int(data.get("end_column"))
+
+        if location := data.get("location"):
+            parts = [_int(part) for part in re.split(r"[,:]", location)]
+            if len(parts) == 4:
+                line, column, end_line, end_column = parts
+            elif len(parts) == 2:
+                line, column = parts
+            else:
+                line = parts[0]
+
+        file = data.get("file")
+        if file is not None:
+            path = os.path.normpath(os.path.join(self.directory, file))
+            # annotations need paths relative to the repository
+            relative = os.path.relpath(path)
+            file = path if relative.startswith(os.pardir) else relative
+
+        return Problem(
+            message=data.get("message", ""),
+            severity=_SEVERITIES.get(data.get("severity", "").lower(), self.severity),
+            file=file,
+            line=line,
+            column=column,
+            end_line=end_line,
+            end_column=end_column,
+            code=data.get("code"),
+            source=self.source,
+        )
+
+
+class ProblemMatchers:
+    """
+    The problem matchers of a task, compiled so output can be scanned quickly.
+    """
+
+    def __init__(self, matchers: list[ProblemMatcher], cwd: str) -> None:
+        self.matchers = [
+            compiled
+            for matcher in matchers
+            if (compiled := _CompiledMatcher(matcher, cwd)).patterns
+        ]
+
+        # text that the first pattern of each matcher needs to find in a line,
+        # and the same for any of the matchers, if they all need some
+        self._literals = [_literals(matcher.regexes[0]) for matcher in self.matchers]
+        self.literals: Optional[frozenset[str]] = None
+        if all(self._literals):
+            self.literals = frozenset().union(*filter(None, self._literals))
+
+        # the first pattern of every matcher, as alternatives of one expression,
+        # along with the matcher index for the group number of each alternative.
+        # the group of each alternative comes right before its own groups
+        self._combined: list[tuple[re.Pattern, dict[int, int]]] = []
+        self._anchored = False
+
+        firsts = [matcher.regexes[0] for matcher in self.matchers]
+        if any(
+            first.flags & ~re.UNICODE or _BACKREFERENCE.search(first.pattern)
+            for first in firsts
+        ):
+            return
+
+        # if every pattern only matches from the start of the line, the combined
+        # expression is matched instead of searched. Otherwise, the start of the
+        # line is not detected for alternatives, and every other position is
+        # tried as well, which is much slower. Another expression, combining the
+        # patterns after each one, finds any other matchers that match the line
+        self._anchored = all(first.pattern.startswith("^") for first in firsts)
+
+        for start in range(len(firsts) if self._anchored else 1):
+            alternatives = []
+            offsets = {}
+            offset = 1
+            for index in range(start, len(firsts)):
+                alternatives.append(f"({firsts[index].pattern})")
+                offsets[offset] = index
+                offset += firsts[index].groups + 1
+
+            try:
+                self._combined.append((re.compile("|".join(alternatives)), offsets))
+            except re.error:
+                # such as the same group name used by multiple patterns
+                self._combined = []
+                return
+
+    @property
+    def combined(self) -> bool:
+        """
+        Whether the first patterns could be combined into one expression.
+        """
+        return bool(self._combined)
+
+    def starts(self, line: str) -> list[tuple[int, Callable[[int], Optional[str]]]]:
+        """
+        Return the index of every matcher whose first pattern matches the line,
+        along with a function that returns the text of each of its match groups.
+        """
+        candidates = [
+            index
+            for index, literals in enumerate(self._literals)
+            if literals is None or any(literal in line for literal in literals)
+        ]
+        if not candidates:
+            return []
+
+        if not self._combined or len(candidates) < len(self.matchers):
+            return [
+                (index, match.group)
+                for index in candidates
+                if (match := self.matchers[index].regexes[0].search(line))
+            ]
+
+        if not self._anchored:
+            combined, offsets = self._combined[0]
+            if (match := combined.search(line)) is None:
+                return []
+
+            # other patterns may match elsewhere in the line
+            offset = match.lastindex or 0
+            found = []
+            for index, matcher in enumerate(self.matchers):
+                if index == offsets[offset]:
+                    found.append((index, _shifted(match, offset)))
+                elif other := matcher.regexes[0].search(line):
+                    found.append((index, other.group))
+
+            return found
+
+        found = []
+        start = 0
+        while start < len(self._combined):
+            combined, offsets = self._combined[start]
+            if (match := combined.match(line)) is None:
+                break
+
+            offset = match.lastindex or 0
+            found.append((offsets[offset], _shifted(match, offset)))
+            start = offsets[offset] + 1
+
+        return found
+
+    def scanner(self) -> ProblemScanner:
+        """
+        Return a new scanner for a stream of output.
+        """
+        return ProblemScanner(self)
+
+
+class ProblemScanner:
+    """
+    Finds problems in a single stream of output. Problems spread across
+    multiple lines are tracked as the lines arrive.
+    """
+
+    def __init__(self, matchers: ProblemMatchers) -> None:
+        self._matchers = matchers
+        # position of the next pattern to match, and the parts matched so far,
+        # for each matcher part way through a multi-line problem
+        self._active: dict[int, tuple[int, dict[str, str]]] = {}
+
+    def feed(self, lines: list[str]) -> None:
+        """
+        Scan lines of output, and report any problems found.
+        """
+        literals = self._matchers.literals
+        if literals is None:
+            for line in lines:
+                for problem in self.scan_line(line):
+                    report(problem)
+            return
+
+        # search all the lines at once for the next one that may start a
+        # problem, skipping the lines in between. The next position of each
+        # string is only searched for again once it has been passed
+        text = "\n".join(lines)
+        found = {literal: text.find(literal) for literal in literals}
+        index = 0
+        position = 0
+        while index < len(lines):
+            if not self._active:
+                for literal, at in found.items():
+                    if 0 <= at < position:
+                        found[literal] = text.find(literal, position)
+
+                hits = [at for at in found.values() if at >= 0]
+                if not hits:
+                    return
+
+                start = max(position, text.rfind("\n", position, min(hits)) + 1)
+                index += text.count("\n", position, start)
+                position = start
+
+            line = lines[index]
+            for problem in self.scan_line(line):
+                report(problem)
+
+            index += 1
+            position += len(line) + 1
+
+    def scan_line(self, line: str) -> list[Problem]:
+        """
+        Scan a single line of output, and return any problems that are now complete.
+        """
+        problems: list[Problem] = []
+        matchers = self._matchers.matchers
+
+        # continue problems spread across multiple lines
+        consumed = set()
+        for index, (position, data) in list(self._active.items()):
+            matcher = matchers[index]
+            match = matcher.regexes[position].search(line)
+            if match is None:
+                # the line may be the start of a new problem instead
+                del self._active[index]
+                continue
+
+            consumed.add(index)
+            found = {**data, **matcher.extract(position, match.group)}
+
+            if position < len(matcher.patterns) - 1:
+                self._active[index] = (position + 1, found)
+                continue
+
+            problems.append(matcher.problem(found))
+            if not matcher.patterns[position].loop:
+                del self._active[index]
+
+        # start new problems
+        for index, group in self._matchers.starts(line):
+            if index in consumed:
+                continue
+
+            matcher = matchers[index]
+            found = matcher.extract(0, group)
+            if len(matcher.patterns) == 1:
+                problems.append(matcher.problem(found))
+            else:
+                self._active[index] = (1, found)
+
+        return problems
+
+
+def task_problem_matchers(task: Task) -> Optional[ProblemMatchers]:
+    """
+    Return the compiled problem matchers of a task, or None if there are no
+    problem patterns to scan its output with. Problems are only reported as
+    annotations, so this is also None outside GitHub Actions and Azure Pipelines.
+    """
+    if not (printer.IS_GITHUB_ACTIONS or printer.IS_AZURE_PIPELINES):
+        return None
+
+    matchers = ProblemMatchers(task.problem_matchers_use(), str(task.cwd_use()))
+    return matchers if matchers.matchers else None
+
+
+def report(problem: Problem) -> None:
+    """
+    Report a problem as an annotation.
+    """
+    title = problem.source
+    if problem.code:
+        title = f"{title}({problem.code})" if title else problem.code
+
+    printer.annotation(
+        problem.severity.value,
+        problem.message,
+        file=problem.file,
+        line=problem.line,
+        column=problem.column,
+        end_line=problem.end_line,
+        end_column=problem.end_column,
+        title=title,
+    )
@@ -0,0 +1,213 @@
+"""
+Tracking of the processes of running tasks, so they can be stopped
+when another task fails, or when they time out.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+from vscode_task_runner.history import ResourceUsage
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+from vscode_task_runner.models.task import Task
+
+if TYPE_CHECKING:
+    import asyncio.subprocess
+
+TERMINATE_GRACE_SECONDS = 5.0
+"""
+How long a task has to exit after being asked to,
+before it is killed.
+"""
+
+Process = Union[subprocess.Popen, "asyncio.subprocess.Process"]
+
+
+def new_process_group(parallel: bool, timeout: Optional[float]) -> bool:
+    """
+    Returns if a task process should be started in a new session,
+    and therefore in its own process group, so that it can be stopped along
+    with any processes it starts. This is needed for tasks running in parallel,
+    which can be cancelled, and tasks with a timeout. Other tasks are not,
+    as tasks in their own session cannot use the terminal.
+    """
+    return (parallel or timeout is not None) and os.name != "nt"
+
+
+def wait_process(proc: subprocess.Popen) -> Optional[ResourceUsage]:
+    """
+    Wait for a task process to exit, and return the resources it used.
+    Returns None if they are not known, such as on Windows.
+    """
+    if hasattr(os, "wait4") and proc.returncode is None:
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            # already waited for by the process object itself
+            pass
+        else:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return ResourceUsage(
+                user_time=rusage.ru_utime,
+                system_time=rusage.ru_stime,
+                # kilobytes everywhere except macOS
+                max_rss=rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+            )
+
+    proc.wait()
+    return None
+
+
+def _signal_process(proc: Process, own_group: bool, sig: int) -> None:
+    """
+    Send a signal to a task process, and its process group if it has its own.
+    """
+    try:
+        if own_group:
+            os.killpg(proc.pid, sig)
+        else:
+            proc.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        # already exited
+        pass
+
+
+class _RunningProcess:
+    """
+    The process of a single task that is executing.
+    """
+
+    def __init__(self, proc: Process, own_group: bool) -> None:
+        self.proc = proc
+        self.own_group = own_group
+        self.stopped_state: Optional[TaskExecutionStateEnum] = None
+        """
+        Why the process was stopped, if it was.
+        """
+        self.timers: list[threading.Timer] = []
+
+
+class RunningProcesses:
+    """
+    The processes of all tasks that are currently executing.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._processes: dict[str, _RunningProcess] = {}
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelling(self) -> bool:
+        """
+        Whether all running tasks have been cancelled.
+        """
+        return self._cancelled.is_set()
+
+    def wait_cancelled(self, timeout: float) -> bool:
+        """
+        Wait up to the timeout in seconds for running tasks to be cancelled.
+        Returns if they were.
+        """
+        return self._cancelled.wait(timeout)
+
+    def add(
+        self, task: Task, proc: Process, own_group: bool, timeout: Optional[float]
+    ) -> None:
+        """
+        Track the process of a task that has started, and stop it once the
+        timeout in seconds has passed. If running tasks have already been
+        cancelled, the process is stopped right away.
+        """
+        running = _RunningProcess(proc, own_group)
+
+        with self._lock:
+            self._processes[task.label] = running
+            cancelling = self.cancelling
+
+        if cancelling:
+            self._stop(task.label, TaskExecutionStateEnum.cancelled)
+        elif timeout is not None:
+            self._start_timer(
+                running,
+                timeout,
+                self._stop,
+                (task.label, TaskExecutionStateEnum.timed_out),
+            )
+
+    def remove(self, task: Task) -> Optional[TaskExecutionStateEnum]:
+        """
+        Stop tracking the process of a task that has exited.
+        Returns why the task was stopped, if it was.
+        """
+        with self._lock:
+            running = self._processes.pop(task.label)
+
+        for timer in running.timers:
+            timer.cancel()
+
+        return running.stopped_state
+
+    def cancel(self) -> list[str]:
+        """
+        Stop every running task.
+
+        Returns the labels of the tasks that were running.
+        """
+        with self._lock:
+            self._cancelled.set()
+            labels = list(self._processes)
+
+        for label in labels:
+            self._stop(label, TaskExecutionStateEnum.cancelled)
+
+        return labels
+
+    def _start_timer(
+        self,
+        running: _RunningProcess,
+        interval: float,
+        function: Callable[..., None],
+        args: tuple,
+    ) -> None:
+        """
+        Call a function after an interval, unless the process exits first.
+        """
+        timer = threading.Timer(interval, function, args=args)
+        timer.daemon = True
+        running.timers.append(timer)
+        timer.start()
+
+    def _stop(self, label: str, state: TaskExecutionStateEnum) -> None:
+        """
+        Stop the process of a task. It is sent SIGTERM, and then SIGKILL
+        if it has not exited after a grace period.
+        """
+        with self._lock:
+            running = self._processes.get(label)
+            if running is None or running.stopped_state is not None:
+                return
+
+            running.stopped_state = state
+
+        _signal_process(running.proc, running.own_group, signal.SIGTERM)
+        self._start_timer(
+            running, TERMINATE_GRACE_SECONDS, self._kill, (label, running)
+        )
+
+    def _kill(self, label: str, running: _RunningProcess) -> None:
+        """
+        Kill the process of a task if it still has not exited.
+        """
+        with self._lock:
+            # the process may have exited, and its ID been reused
+            if self._processes.get(label) is not running:
+                return
+
+        _signal_process(
+            running.proc, running.own_group, getattr(signal, "SIGKILL", signal.SIGTERM)
+        )
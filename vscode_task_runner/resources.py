@@ -0,0 +1,115 @@
+"""
+Resources tasks can declare they need, such as CPUs and memory. Tasks are only
+started when there is enough left in the budget for the whole machine, so
+heavy tasks running in parallel do not oversubscribe it.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import sys
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from vscode_task_runner.exceptions import InvalidResources
+
+if TYPE_CHECKING:
+    from vscode_task_runner.models.task import Task  # pragma: no cover
+
+MEMINFO_FILE = "/proc/meminfo"
+
+_MEMORY_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+_MEMORY_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?", re.IGNORECASE)
+
+
+class Resources(NamedTuple):
+    cpu: float
+    """
+    Number of CPUs.
+    """
+    memory: int
+    """
+    Memory in bytes.
+    """
+
+
+def parse_memory(value: Union[int, float, str]) -> int:
+    """
+    Convert an amount of memory such as "6G", "512MiB", or a number of bytes
+    into a number of bytes. Units are powers of 1024.
+    """
+    # a bool is also an int, but never an amount
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Memory '{value}' must be a positive number of bytes")
+
+        return int(value)
+
+    if not isinstance(value, str):
+        raise ValueError(f"Memory '{value}' is not a valid amount, such as '6G'")
+
+    match = _MEMORY_PATTERN.fullmatch(value.strip())
+    if not match:
+        raise ValueError(f"Memory '{value}' is not a valid amount, such as '6G'")
+
+    number, unit = match.groups()
+    return int(float(number) * _MEMORY_UNITS[unit.lower()])
+
+
+def system_memory() -> Optional[int]:
+    """
+    Return the memory available on this machine in bytes,
+    or None if it cannot be determined.
+    """
+    try:
+        with open(MEMINFO_FILE, "r", encoding="utf-8") as fp:
+            meminfo = dict(line.split(":", maxsplit=1) for line in fp if ":" in line)
+    except OSError:
+        return None
+
+    # prefer what can actually be used without swapping
+    for key in ("MemAvailable", "MemTotal"):
+        if key in meminfo:
+            return parse_memory(meminfo[key].strip().removesuffix(" kB") + "K")
+
+    return None
+
+
+def machine_budget() -> Resources:
+    """
+    Return the resources available to tasks. The CPUs are set by the VTR_CPUS
+    environment variable, and default to the number of CPUs. The memory is set
+    by the VTR_MEMORY environment variable, and defaults to the available memory.
+    If the available memory cannot be determined, memory is not limited.
+    """
+    if env_value := os.environ.get("VTR_CPUS"):
+        try:
+            cpu = float(env_value)
+        except ValueError:
+            cpu = 0.0
+
+        if not cpu > 0:
+            raise InvalidResources(
+                f"Number of CPUs '{env_value}' is not a positive number"
+            )
+    else:
+        cpu = float(os.cpu_count() or 1)
+
+    if env_value := os.environ.get("VTR_MEMORY"):
+        try:
+            memory = parse_memory(env_value)
+        except ValueError as e:
+            raise InvalidResources(str(e)) from e
+    else:
+        memory = system_memory() or sys.maxsize
+
+    return Resources(cpu=cpu, memory=memory)
+
+
+def task_needs(task: Task) -> Resources:
+    """
+    Return the resources a task declares it needs.
+    Tasks that don't declare anything only take up a job.
+    """
+    return Resources(cpu=task.vtr.cpu or 0.0, memory=task.vtr.memory or 0)
@@ -0,0 +1,205 @@
+import os
+import time
+from typing import NamedTuple, Optional
+
+from vscode_task_runner import metrics
+from vscode_task_runner.graph import TaskNode
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+from vscode_task_runner.models.task import Task
+from vscode_task_runner.resources import Resources, task_needs
+
+
+class TaskLaunch(NamedTuple):
+    node: TaskNode
+    """
+    Node to execute.
+    """
+    index: int
+    """
+    Position of this task in the run, for the sake of printing.
+    """
+    parallel: bool
+    """
+    Whether other tasks may be running at the same time as this one.
+    """
+
+
+class Scheduler:
+    """
+    Keeps track of which nodes in the run graph are ready to be started,
+    are running, and have finished. Execution engines ask the scheduler
+    which tasks to start, and tell it when they finish.
+    """
+
+    def __init__(
+        self,
+        nodes: list[TaskNode],
+        jobs: int,
+        budget: Optional[Resources] = None,
+    ) -> None:
+        self.nodes = nodes
+        """
+        All nodes in the run, in the order they were planned.
+        """
+        self.jobs = jobs
+        """
+        Maximum number of tasks to execute at once.
+        """
+        self.budget = budget
+        """
+        Resources available to all tasks at once, if they are limited.
+        """
+        self.total = len(nodes)
+        """
+        Total number of tasks in the run.
+        """
+        self.completed: list[str] = []
+        """
+        Labels of tasks that completed successfully.
+        """
+        self.failed: list[str] = []
+        """
+        Labels of tasks that failed.
+        """
+        self.cancelled: list[str] = []
+        """
+        Labels of tasks that were stopped because another task failed.
+        """
+        self.timed_out: list[str] = []
+        """
+        Labels of tasks that were stopped because they ran for too long.
+        """
+        self.stopped_by: Optional[Task] = None
+        """
+        The task that stopped execution, if any.
+        """
+
+        # this keeps track of which task we are on
+        self._index = 0
+        self._position = {node: i for i, node in enumerate(nodes)}
+
+        # number of dependencies each node is still waiting on
+        self._waiting = {node: len(node.dependencies) for node in nodes}
+        # nodes that can be started right now
+        self._ready = [node for node in nodes if not node.dependencies]
+        # when each node that can be started became ready, from `time.monotonic`
+        self._ready_since = {node: time.monotonic() for node in self._ready}
+        # number of nodes that are currently executing
+        self._running = 0
+        # resources used by the nodes that are currently executing
+        self._used = Resources(cpu=0.0, memory=0)
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether there is nothing left running or left to start.
+        """
+        return not self._ready and not self._running
+
+    def start(self) -> list[TaskLaunch]:
+        """
+        Return the tasks that should be started now, highest priority first,
+        and mark them as running.
+        """
+        if self.stopped_by is not None:
+            # don't start any more tasks
+            self._ready = []
+
+        # start as many ready tasks as there are free slots
+        # and resources for, skipping tasks that need more than is free
+        self._ready.sort(key=lambda n: n.priority, reverse=True)
+        to_start: list[TaskNode] = []
+        waiting: list[TaskNode] = []
+        for node in self._ready:
+            running = self._running + len(to_start)
+            if running < self.jobs and self._reserve(node, alone=running == 0):
+                to_start.append(node)
+            else:
+                waiting.append(node)
+
+        self._ready = waiting
+
+        # if more than one task is going to be running at once,
+        # the output needs to be prefixed
+        parallel = self._running + len(to_start) > 1
+        self._running += len(to_start)
+
+        launches = []
+        now = time.monotonic()
+        for node in to_start:
+            metrics.task_queued(node.task.label, now - self._ready_since.pop(node))
+            self._index += 1
+            launches.append(
+                TaskLaunch(
+                    node=node,
+                    index=self._index,
+                    parallel=parallel,
+                )
+            )
+
+        return launches
+
+    def _reserve(self, node: TaskNode, alone: bool) -> bool:
+        """
+        Reserve the resources a node needs, if there are enough free.
+        A node that needs more than the whole budget can still be started
+        if nothing else is running.
+        """
+        needs = task_needs(node.task)
+
+        if self.budget is not None and not alone:
+            if (
+                self._used.cpu + needs.cpu > self.budget.cpu
+                or self._used.memory + needs.memory > self.budget.memory
+            ):
+                return False
+
+        self._used = Resources(
+            cpu=self._used.cpu + needs.cpu, memory=self._used.memory + needs.memory
+        )
+        return True
+
+    def _release(self, node: TaskNode) -> None:
+        """
+        Release the resources a node that finished was using.
+        """
+        needs = task_needs(node.task)
+        self._used = Resources(
+            cpu=self._used.cpu - needs.cpu, memory=self._used.memory - needs.memory
+        )
+
+    def finish(self, nodes: list[TaskNode]) -> None:
+        """
+        Record the results of nodes that finished executing, and release
+        any nodes that were waiting on them. If a task failed or timed out and
+        VTR_CONTINUE_ON_ERROR is not set, no more tasks will be started,
+        and the execution engine should cancel the running tasks.
+        """
+        # process in the order the tasks were planned
+        for node in sorted(nodes, key=self._position.__getitem__):
+            self._running -= 1
+            self._release(node)
+
+            # track results
+            if node.task._execution_state == TaskExecutionStateEnum.cancelled:
+                self.cancelled.append(node.task.label)
+            elif node.task._execution_returncode == 0:
+                self.completed.append(node.task.label)
+            else:
+                if node.task._execution_state == TaskExecutionStateEnum.timed_out:
+                    self.timed_out.append(node.task.label)
+                else:
+                    self.failed.append(node.task.label)
+
+                if (
+                    not os.environ.get("VTR_CONTINUE_ON_ERROR")
+                    and self.stopped_by is None
+                ):
+                    self.stopped_by = node.task
+
+            # release any tasks that were waiting on this one
+            for dependent in node.dependents:
+                self._waiting[dependent] -= 1
+                if self._waiting[dependent] == 0:
+                    self._ready.append(dependent)
+                    self._ready_since[dependent] = time.monotonic()
@@ -0,0 +1,82 @@
+"""
+Compiled form of a task, with everything needed to execute it worked out
+once per run, so execution engines don't need to merge the task's settings
+with the global settings of the tasks file again for every attempt.
+"""
+
+import os
+from typing import NamedTuple, Optional
+
+from vscode_task_runner.exceptions import WorkingDirectoryNotFound
+from vscode_task_runner.utils.paths import which_resolver
+
+
+class ExecSpec(NamedTuple):
+    """
+    How to execute a single task. Immutable and hashable, so it is safe
+    to share between threads.
+    """
+
+    label: str
+    """
+    Label of the task.
+    """
+    argv: tuple[str, ...]
+    """
+    Command to run, including any extra arguments. The executable is only
+    resolved to a full path once the task starts, as a task it depends on
+    may create it. Empty for virtual tasks.
+    """
+    cwd: str
+    """
+    Working directory to run the command in. It is only required to exist
+    once the task is started, as a task it depends on may create it.
+    """
+    env: tuple[tuple[str, str], ...]
+    """
+    Environment variables the task sets on top of the current environment,
+    sorted by name.
+    """
+    virtual: bool
+    """
+    Whether the task has nothing to run, and only depends on other tasks.
+    """
+    background: bool
+    """
+    Whether the task keeps running alongside the tasks that depend on it.
+    """
+    timeout: Optional[float]
+    """
+    Maximum number of seconds the task may run for, if limited.
+    """
+    attempts: int
+    """
+    Maximum number of times to execute the task, including retries.
+    """
+    retry_delay: float
+    """
+    Seconds to wait before the first retry. The delay doubles with every retry.
+    """
+
+    def cwd_use(self) -> str:
+        """
+        Return the working directory, ensuring it exists.
+        """
+        if not os.path.isdir(self.cwd):
+            raise WorkingDirectoryNotFound(
+                f"Working directory {self.cwd} does not exist"
+            )
+
+        return self.cwd
+
+    def argv_use(self) -> list[str]:
+        """
+        Return the command to run, with the executable resolved to a full path.
+        """
+        return [which_resolver(self.argv[0]), *self.argv[1:]]
+
+    def env_use(self) -> dict[str, str]:
+        """
+        Return all the environment variables to run the command with.
+        """
+        return {**os.environ, **dict(self.env)}
@@ -0,0 +1,146 @@
+"""
+Cache of validated tasks files. Decoding a tasks file and validating it is
+repeated on every invocation, including every shell completion, so the
+validated models are stored once and loaded back without validating them
+again, as long as the tasks file and the code that validates it are unchanged.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import pydantic
+
+from vscode_task_runner.history import state_dir
+from vscode_task_runner.models.tasks import Tasks
+
+TASKS_CACHE_VERSION = 1
+"""
+Version of the cache format. Changing this invalidates every cached tasks file.
+"""
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+class CacheKey(NamedTuple):
+    path: str
+    """
+    Absolute path of the tasks file.
+    """
+    size: int
+    """
+    Size of the tasks file in bytes.
+    """
+    mtime_ns: int
+    """
+    Modification time of the tasks file.
+    """
+    digest: str
+    """
+    Hash of the contents of the tasks file.
+    """
+    modules: tuple[tuple[str, int, int], ...]
+    """
+    Path, size and modification time of each module of the package, so cached
+    models are never loaded into classes, or validated by code, that has since
+    changed.
+    """
+    versions: tuple[int, str, str]
+    """
+    Versions of the cache format, pydantic, and Python.
+    """
+
+
+def tasks_cache_dir() -> Path:
+    """
+    Returns the directory validated tasks files are stored in.
+    """
+    return state_dir() / "tasks"
+
+
+def _modules_state() -> tuple[tuple[str, int, int], ...]:
+    """
+    Return the path, size and modification time of each module of the package.
+    The models are validated with code from across the package,
+    such as parsing amounts of memory and the current platform.
+    """
+    state = []
+    for root, dirs, files in os.walk(_PACKAGE_DIR):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                relative = os.path.relpath(path, _PACKAGE_DIR)
+                state.append((relative, stat.st_size, stat.st_mtime_ns))
+
+    return tuple(state)
+
+
+def cache_key(path: str, content: bytes) -> CacheKey:
+    """
+    Return the key for a tasks file, given the contents that were read from it.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    return CacheKey(
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        digest=hashlib.sha256(content).hexdigest(),
+        modules=_modules_state(),
+        versions=(TASKS_CACHE_VERSION, pydantic.VERSION, sys.version),
+    )
+
+
+def _cache_file(key: CacheKey) -> Path:
+    """
+    Return the file a tasks file is cached in. Each tasks file
+    only has a single entry, which is replaced when it changes.
+    """
+    name = hashlib.sha256(key.path.encode("utf-8")).hexdigest()
+    return tasks_cache_dir() / f"{name}.pickle"
+
+
+def load(key: CacheKey) -> Optional[Tasks]:
+    """
+    Load the validated models of a tasks file, if they are cached.
+    The cache is in the user's own state directory, so is trusted
+    as much as the tasks file itself.
+    """
+    try:
+        with open(_cache_file(key), "rb") as fp:
+            cached_key, tasks = pickle.load(fp)
+    except Exception:
+        # missing, from an older version, or otherwise unreadable
+        return None
+
+    if cached_key != key or not isinstance(tasks, Tasks):
+        return None
+
+    return tasks
+
+
+def save(key: CacheKey, tasks: Tasks) -> None:
+    """
+    Cache the validated models of a tasks file. This must be done before the
+    tasks are executed, as the models are saved with their current state.
+    Failing to write the cache is ignored, as it only makes startup slower.
+    """
+    path = _cache_file(key)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as fp:
+            pickle.dump((key, tasks), fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except Exception:
+        # the models may not be picklable, so anything can fail
+        with contextlib.suppress(OSError):
+            temp_path.unlink(missing_ok=True)
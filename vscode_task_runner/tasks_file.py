@@ -0,0 +1,176 @@
+"""
+Finding and decoding the tasks file, without validating it. This only imports
+what is needed to decode the file, so tasks can be listed without importing
+pydantic or the models.
+"""
+
+import os
+import pathlib
+from typing import Any, Optional
+
+import pyjson5
+
+from vscode_task_runner.constants import (
+    CODE_WORKSPACE_SUFFIX,
+    CURRENT_PLATFORM,
+    TASKS_FILE,
+)
+from vscode_task_runner.exceptions import TasksFileInvalid, TasksFileNotFound
+from vscode_task_runner.models.enums import (
+    DependsOrderEnum,
+    PlatformEnum,
+    TaskTypeEnum,
+)
+
+
+def find_tasks_file(path: str) -> tuple[str, bool]:
+    """
+    Given a working directory, find the vscode tasks config. Returns the path
+    of the file, and whether the tasks are under a "tasks" key.
+    """
+    # possible paths
+    tasks_json = os.path.join(path, TASKS_FILE)
+    code_workspace_jsons = sorted(pathlib.Path(path).glob(f"*{CODE_WORKSPACE_SUFFIX}"))
+
+    # prefer the tasks.json file
+    if os.path.isfile(tasks_json):
+        return tasks_json, False
+
+    # fallback to first file that ends with .code-workspace
+    for file in code_workspace_jsons:
+        if file.is_file():
+            return str(file), True
+
+    # if we didn't find any file, raise an error
+    raise TasksFileNotFound(f"No suitable tasks file found in {path}")
+
+
+def decode_vscode_json(content: bytes, tasks_key: bool) -> dict:
+    """
+    Decode the contents of a vscode tasks config.
+    """
+    # use pyjson 5 to deal with comments and other bad syntax
+    data = pyjson5.decode(content.decode("utf-8"))
+
+    if tasks_key:
+        # if we are using a code workspace file, we need to get the tasks key
+        if "tasks" not in data:
+            raise TasksFileInvalid(
+                f"'tasks' key not found in {CODE_WORKSPACE_SUFFIX} file"
+            )
+
+        data = data["tasks"]
+
+    return data
+
+
+def read_tasks_json(path: str) -> dict:
+    """
+    Given a working directory, read and decode the vscode tasks config,
+    without validating it.
+    """
+    file_to_use, tasks_key = find_tasks_file(path)
+
+    with open(file_to_use, "rb") as fp:
+        content = fp.read()
+
+    try:
+        data = decode_vscode_json(content, tasks_key)
+    except (pyjson5.Json5Exception, ValueError) as e:
+        raise TasksFileInvalid(f"Tasks file not valid: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("tasks", []), list):
+        raise TasksFileInvalid("Tasks file not valid: 'tasks' is not a list")
+
+    return data
+
+
+def _os_key() -> str:
+    """
+    Return the key of the properties for the current OS.
+    """
+    if CURRENT_PLATFORM == PlatformEnum.windows:
+        return "windows"
+    elif CURRENT_PLATFORM == PlatformEnum.linux:
+        return "linux"
+    return "osx"
+
+
+def _group(task: dict, tasks_json: dict) -> tuple[Optional[str], bool]:
+    """
+    Return the kind of group of a task, and whether it is the default task
+    of the group. The group of the task is used, then the global group.
+    """
+    group = task.get("group") or tasks_json.get("group")
+
+    if isinstance(group, dict):
+        kind = group.get("kind")
+        return (kind if isinstance(kind, str) else None), group.get("isDefault") is True
+
+    if isinstance(group, str):
+        return group, False
+
+    return None, False
+
+
+def _is_background(task: dict, tasks_json: dict) -> bool:
+    """
+    Return if a task is a background task. Tasks that don't set this
+    themselves, and use the global command, use the global setting.
+    """
+    if isinstance(is_background := task.get("isBackground"), bool):
+        return is_background
+
+    os_properties = task.get(_os_key())
+    has_command = task.get("command") is not None or (
+        isinstance(os_properties, dict) and os_properties.get("command") is not None
+    )
+    return not has_command and tasks_json.get("isBackground") is True
+
+
+def _depends_on(task: dict) -> list[str]:
+    """
+    Return the labels of the tasks a task depends on.
+    """
+    depends_on = task.get("dependsOn", [])
+
+    # a single label can be given instead of a list
+    if isinstance(depends_on, str):
+        return [depends_on]
+
+    return [label for label in depends_on if isinstance(label, str)]
+
+
+def scan_tasks(tasks_json: dict) -> list[dict[str, Any]]:
+    """
+    Return the label and metadata of each supported task in a decoded tasks
+    file, in the order they are defined. This only looks at the few properties
+    needed to list tasks, rather than validating the whole file.
+    """
+    supported_types = [e.value for e in TaskTypeEnum]
+    tasks = []
+
+    for task in tasks_json.get("tasks", []):
+        if not isinstance(task, dict) or not isinstance(task.get("label"), str):
+            continue
+
+        task_type = task.get("type", TaskTypeEnum.process.value)
+        if task_type not in supported_types:
+            continue
+
+        group, is_default = _group(task, tasks_json)
+        tasks.append(
+            {
+                "label": task["label"],
+                "type": task_type,
+                "group": group,
+                "isDefault": is_default,
+                "isBackground": _is_background(task, tasks_json),
+                "dependsOn": _depends_on(task),
+                "dependsOrder": task.get(
+                    "dependsOrder", DependsOrderEnum.parallel.value
+                ),
+            }
+        )
+
+    return tasks
@@ -0,0 +1,198 @@
+"""
+Timeline of a run in the Chrome trace event format, which can be opened in
+Perfetto (https://ui.perfetto.dev) or chrome://tracing. Loading the tasks file
+and planning are shown on one track, and every task on the track of the slot
+it ran in, so it is easy to see where tasks were waiting on each other.
+
+Nothing is recorded unless tracing has been started.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Generator, Optional
+
+if TYPE_CHECKING:
+    from vscode_task_runner.models.task import Task  # pragma: no cover
+
+MAIN_TRACK = 0
+"""
+Track of everything that isn't a task, such as loading the tasks file.
+"""
+
+
+class _Tracer:
+    """
+    Records the events of a single run. Safe to use from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.events: list[dict[str, Any]] = []
+        self.lock = threading.Lock()
+        # the slot each running task is in
+        self.slots: dict[str, int] = {}
+        self.track_count = 0
+
+    def timestamp(self, perf_counter: Optional[float] = None) -> float:
+        """
+        Microseconds since tracing started, for the given time
+        from `time.perf_counter`, or now.
+        """
+        if perf_counter is None:
+            perf_counter = time.perf_counter()
+        return (perf_counter - self.start) * 1_000_000
+
+    def take_slot(self, label: str) -> int:
+        """
+        Put a task in the lowest slot that is free, and return its track.
+        """
+        with self.lock:
+            used = set(self.slots.values())
+            track = next(slot for slot in range(1, len(used) + 2) if slot not in used)
+            self.slots[label] = track
+            self.track_count = max(self.track_count, track)
+            return track
+
+
+_tracer: Optional[_Tracer] = None
+
+
+def start() -> None:
+    """
+    Start recording events, discarding any recorded before.
+    """
+    global _tracer
+    _tracer = _Tracer()
+
+
+def enabled() -> bool:
+    """
+    Returns if events are being recorded.
+    """
+    return _tracer is not None
+
+
+def _complete(
+    tracer: _Tracer, name: str, track: int, begin: float, args: dict[str, Any]
+) -> None:
+    tracer.events.append(
+        {
+            "name": name,
+            "ph": "X",
+            "ts": begin,
+            "dur": tracer.timestamp() - begin,
+            "pid": os.getpid(),
+            "tid": track,
+            "args": args,
+        }
+    )
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Generator[None, None, None]:
+    """
+    Record a phase of the run, such as loading the tasks file.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+
+    begin = tracer.timestamp()
+    try:
+        yield
+    finally:
+        _complete(tracer, name, MAIN_TRACK, begin, args)
+
+
+@contextlib.contextmanager
+def task_span(task: Task) -> Generator[None, None, None]:
+    """
+    Record the lifetime of a task, in the lowest slot that is free.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+
+    track = tracer.take_slot(task.label)
+    begin = tracer.timestamp()
+    try:
+        yield
+    finally:
+        details = {
+            "state": task._execution_state.name,
+            "returncode": task._execution_returncode,
+            "attempts": task._execution_attempts,
+        }
+        _complete(tracer, task.label, track, begin, details)
+        with tracer.lock:
+            del tracer.slots[task.label]
+
+
+def instant(
+    label: str, name: str, perf_counter: Optional[float] = None, **args: Any
+) -> None:
+    """
+    Record something that happened to a running task, such as its process
+    starting. The time is from `time.perf_counter`, and defaults to now.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+
+    tracer.events.append(
+        {
+            "name": name,
+            "ph": "i",
+            "s": "t",
+            "ts": tracer.timestamp(perf_counter),
+            "pid": os.getpid(),
+            "tid": tracer.slots.get(label, MAIN_TRACK),
+            "args": {"task": label, **args},
+        }
+    )
+
+
+def save(path: str) -> None:
+    """
+    Write the recorded events to a file, and stop recording.
+    """
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return
+    _tracer = None
+
+    # name the tracks
+    pid = os.getpid()
+    metadata = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "vtr"}},
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": MAIN_TRACK,
+            "args": {"name": "vtr"},
+        },
+        *(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": track,
+                "args": {"name": f"slot {track}"},
+            }
+            for track in range(1, tracer.track_count + 1)
+        ),
+    ]
+
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(
+            {"traceEvents": metadata + tracer.events, "displayTimeUnit": "ms"}, fp
+        )
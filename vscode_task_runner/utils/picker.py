@@ -3,8 +3,6 @@ from __future__ import annotations
 import os
 from typing import TYPE_CHECKING, Optional
 
-import questionary
-
 from vscode_task_runner.exceptions import (
     BadInputEnvironmentVariable,
     ResponseNotProvided,
@@ -43,6 +41,9 @@ def determine_default_build_task(tasks: list[Task]) -> Optional[Task]:
         return tasks[0]._tasks.tasks_dict[env_value]
 
     # otherwise, obtain from user input
+    # only import when needed, as this is slow to import
+    import questionary
+
     question = questionary.select(
         "Select the default build task",
         choices=task_labels,
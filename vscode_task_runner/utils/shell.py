@@ -1,8 +1,6 @@
 import os
 import shutil
 
-import shellingham
-
 from vscode_task_runner.constants import CURRENT_PLATFORM
 from vscode_task_runner.exceptions import ShellNotFound
 from vscode_task_runner.models.enums import PlatformEnum
@@ -24,9 +22,14 @@ def get_parent_shell() -> ShellConfiguration:
     to launch a command.
     """
 
-    # try to get the path to the parent shell
+    # only import when needed
+    import shellingham
+
+    # try to get the path to the parent shell.
+    # when running in the daemon, start from the client process instead
+    pid = os.environ.get("VTR_SHELL_PID")
     try:
-        name, shell_executable = shellingham.detect_shell()
+        name, shell_executable = shellingham.detect_shell(pid=int(pid) if pid else None)
     except shellingham.ShellDetectionFailure:
         shell_executable = None
 
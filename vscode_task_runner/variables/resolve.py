@@ -3,8 +3,6 @@ import re
 from functools import cache
 from typing import Optional, Union, overload
 
-import questionary
-
 from vscode_task_runner.exceptions import (
     ResponseNotProvided,
     UnsupportedInput,
@@ -14,8 +12,8 @@ from vscode_task_runner.models.input import InputChoice, InputTypeEnum
 from vscode_task_runner.utils.picker import check_item_with_options
 from vscode_task_runner.variables.runtime import INPUTS, RUNTIME_VARIABLES
 from vscode_task_runner.variables.static import (
-    SUPPORTED_PREDEFINED_VARIABLES,
     UNSUPPORTED_PREDEFINED_VARIABLES,
+    predefined_variables,
 )
 
 
@@ -49,6 +47,9 @@ def get_input_value(input_id: str) -> str:
             raise UnsupportedInput(f"Unsupported input variable type '{input_.type_}'")
 
     # otherwise, obtain from user input
+    # only import when needed, as this is slow to import
+    import questionary
+
     if input_.type_ == InputTypeEnum.promptString:
         question_type = questionary.text
 
@@ -117,7 +118,10 @@ def replace_supported_variables(data: str) -> str:
     """
     Replaces references to supported variables in a string with their values.
     """
-    for var, value in SUPPORTED_PREDEFINED_VARIABLES.items():
+    if "${" not in data:
+        return data
+
+    for var, value in predefined_variables().items():
         data = data.replace(var, value)
 
     for var, value in RUNTIME_VARIABLES.items():
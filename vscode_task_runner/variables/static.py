@@ -1,15 +1,29 @@
 import os
+from functools import lru_cache
+
+
+def predefined_variables() -> dict[str, str]:
+    """
+    Return the values of the supported predefined variables
+    for the current user and working directory. These are only worked
+    out again when the working directory or home directory changes.
+    """
+    return _predefined_variables(os.getcwd(), os.path.expanduser("~"))
+
+
+@lru_cache(maxsize=1)
+def _predefined_variables(cwd: str, home: str) -> dict[str, str]:
+    # https://code.visualstudio.com/docs/editor/variables-reference#_predefined-variables
+    return {
+        "${userHome}": home,
+        "${workspaceFolder}": cwd,
+        "${workspaceRoot}": cwd,
+        "${workspaceFolderBasename}": os.path.basename(cwd),
+        "${pathSeparator}": os.path.sep,
+        "${/}": os.path.sep,
+        "${cwd}": cwd,
+    }
 
-# https://code.visualstudio.com/docs/editor/variables-reference#_predefined-variables
-SUPPORTED_PREDEFINED_VARIABLES = {
-    "${userHome}": os.path.expanduser("~"),
-    "${workspaceFolder}": os.getcwd(),
-    "${workspaceRoot}": os.getcwd(),
-    "${workspaceFolderBasename}": os.path.basename(os.getcwd()),
-    "${pathSeparator}": os.path.sep,
-    "${/}": os.path.sep,
-    "${cwd}": os.getcwd(),
-}
 
 UNSUPPORTED_PREDEFINED_VARIABLES = {
     "${file}",
@@ -8,11 +8,8 @@ import copy
 import re
 from typing import List, Optional, Tuple
 
-from vscode_task_runner.constants import (
-    CURRENT_PLATFORM,
-    DEFAULT_OS_QUOTING,
-    DEFAULT_SHELL_QUOTING,
-)
+from vscode_task_runner import constants
+from vscode_task_runner.constants import CURRENT_PLATFORM
 from vscode_task_runner.models.enums import (
     PlatformEnum,
     ShellQuotingEnum,
@@ -36,12 +33,12 @@ def get_quoting_options(shell_config: ShellConfiguration) -> ShellQuotingOptions
         # Appears to be dead code
         return shell_config.quoting  # pragma: no cover
 
-    if shell_config.type_ in DEFAULT_SHELL_QUOTING:
+    if shell_config.type_ in constants.DEFAULT_SHELL_QUOTING:
         # otherwise return default for shell
-        return DEFAULT_SHELL_QUOTING[shell_config.type_]
+        return constants.DEFAULT_SHELL_QUOTING[shell_config.type_]
 
     # return default for OS if shell doesn't have defined options
-    return DEFAULT_OS_QUOTING[CURRENT_PLATFORM]
+    return constants.DEFAULT_OS_QUOTING[CURRENT_PLATFORM]
 
 
 def _add_all_argument(
@@ -0,0 +1,395 @@
+"""
+Watch mode. Tasks are executed once, then executed again whenever files
+they depend on change. The tasks are only parsed and planned once, and stay
+in memory between executions.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from vscode_task_runner import executor, printer
+from vscode_task_runner.graph import TaskNode, affected_subgraph
+from vscode_task_runner.models.enums import TaskExecutionStateEnum
+from vscode_task_runner.models.task import Task
+
+DEBOUNCE_SECONDS = 0.2
+"""
+How long to wait for more changes after a change, so that a burst of
+changes such as saving many files at once only executes tasks once.
+"""
+
+POLL_INTERVAL_SECONDS = 0.5
+"""
+How often to check for changes when inotify is not available.
+"""
+
+IGNORED_DIRS = {".git", ".hg", ".svn", "__pycache__"}
+"""
+Directories that are never watched.
+"""
+
+# inotify event flags, from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_IN_EVENT = struct.Struct("iIII")
+
+
+def _walk_dirs(root: Path) -> list[Path]:
+    """
+    Return a directory and all directories under it, except ignored ones.
+    """
+    dirs = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        dirs.append(Path(dirpath))
+
+    return dirs
+
+
+class InotifyWatcher:
+    """
+    Watches directory trees for changes with inotify. Only available on Linux.
+    """
+
+    def __init__(self, roots: list[Path]) -> None:
+        self._roots = roots
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "Could not initialize inotify")
+
+        # directory each watch descriptor is for
+        self._watches: dict[int, Path] = {}
+        try:
+            for root in roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """
+        Stop watching.
+        """
+        os.close(self._fd)
+
+    def _add_tree(self, root: Path) -> set[Path]:
+        """
+        Watch a directory and all directories under it.
+        Returns the files that already exist in them.
+        """
+        files: set[Path] = set()
+
+        for directory in _walk_dirs(root):
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), _IN_MASK
+            )
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Could not watch {directory}")
+
+            self._watches[wd] = directory
+            files.update(p for p in directory.iterdir() if p.is_file())
+
+        return files
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        """
+        Wait up to the timeout in seconds for changes, forever if None.
+        Returns the paths that changed.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed: set[Path] = set()
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+            offset += _IN_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # events were lost, so assume everything changed
+                changed.update(self._roots)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+
+            if mask & _IN_IGNORED:
+                # the directory was removed
+                del self._watches[wd]
+                continue
+
+            path = directory / os.fsdecode(name)
+            if path.name in IGNORED_DIRS:
+                continue
+
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                # files may have been created before the directory was watched
+                changed.update(self._add_tree(path))
+
+            changed.add(path)
+
+        return changed
+
+    def discard(self) -> None:
+        """
+        Forget any changes that have not been waited for.
+        """
+        while self.wait(0):
+            pass
+
+
+class PollingWatcher:
+    """
+    Watches directory trees for changes by checking the modification time
+    and size of every file.
+    """
+
+    def __init__(self, roots: list[Path]) -> None:
+        self._roots = roots
+        self._snapshot = self._scan()
+
+    def close(self) -> None:
+        """
+        Stop watching.
+        """
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """
+        Return the modification time and size of every file.
+        """
+        snapshot: dict[Path, tuple[int, int]] = {}
+
+        for root in self._roots:
+            for directory in _walk_dirs(root):
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (
+                                stat.st_mtime_ns,
+                                stat.st_size,
+                            )
+                    except OSError:
+                        continue
+
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        """
+        Wait up to the timeout in seconds for changes, forever if None.
+        Returns the paths that changed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if deadline is None:
+                time.sleep(POLL_INTERVAL_SECONDS)
+            else:
+                time.sleep(
+                    max(0.0, min(POLL_INTERVAL_SECONDS, deadline - time.monotonic()))
+                )
+
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def discard(self) -> None:
+        """
+        Forget any changes that have not been waited for.
+        """
+        self._snapshot = self._scan()
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def create_watcher(roots: list[Path]) -> Watcher:
+    """
+    Watch the given directory trees with inotify if possible,
+    and fall back to polling otherwise.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            # inotify is not available, or the limit on watches was reached
+            printer.info(
+                "Could not watch files with inotify, checking for changes instead"
+            )
+
+    return PollingWatcher(roots)
+
+
+def wait_for_changes(watcher: Watcher) -> set[Path]:
+    """
+    Wait until something changes, then keep collecting changes
+    until things settle down.
+    """
+    changed: set[Path] = set()
+    while not changed:
+        changed = watcher.wait(None)
+
+    while more := watcher.wait(DEBOUNCE_SECONDS):
+        changed |= more
+
+    return changed
+
+
+def watch_roots(nodes: list[TaskNode]) -> list[Path]:
+    """
+    Return the directories that need to be watched for the given nodes.
+    """
+    roots: list[Path] = []
+
+    # parents sort before their children
+    for cwd in sorted({node.task.cwd_use() for node in nodes}):
+        if not any(cwd.is_relative_to(root) for root in roots):
+            roots.append(cwd)
+
+    return roots
+
+
+def _glob_regex(pattern: str) -> re.Pattern:
+    """
+    Convert a glob pattern into a regular expression,
+    matching paths the same way as `Path.glob`.
+    """
+    regex = ""
+    for part in re.split(r"(\*\*/|\*\*|\*|\?)", pattern):
+        if part == "**/":
+            regex += "(?:.*/)?"
+        elif part == "**":
+            regex += ".*"
+        elif part == "*":
+            regex += "[^/]*"
+        elif part == "?":
+            regex += "[^/]"
+        else:
+            regex += re.escape(part)
+
+    return re.compile(regex)
+
+
+def task_affected(task: Task, changed: set[Path]) -> bool:
+    """
+    Returns if any of the changed paths affect a task. If the task declares
+    its inputs, only those are considered. Otherwise, any change under its
+    working directory affects it.
+    """
+    cwd = task.cwd_use()
+    patterns = [_glob_regex(pattern) for pattern in task.vtr.inputs]
+
+    for path in changed:
+        if not path.is_relative_to(cwd):
+            continue
+
+        relative = path.relative_to(cwd).as_posix()
+        if not patterns or any(pattern.fullmatch(relative) for pattern in patterns):
+            return True
+
+    return False
+
+
+def _reset_task(task: Task) -> None:
+    """
+    Reset the execution state of a task so it can be executed again.
+    """
+    task._execution_state = TaskExecutionStateEnum.pending
+    task._execution_returncode = 0
+    task._execution_duration = None
+    task._execution_attempts = 0
+    task._execution_usage = None
+
+
+def watch_tasks(tasks: list[Task], extra_args: list[str]) -> int:
+    """
+    Execute the tasks, then execute the tasks affected by any changed files
+    and the tasks that depend on them, until interrupted.
+    """
+    nodes = executor.plan_tasks(tasks)
+    executor.execute_nodes(nodes, extra_args)
+
+    watcher = create_watcher(watch_roots(nodes))
+    try:
+        while True:
+            printer.info("Watching for changes, press Ctrl+C to stop")
+
+            # virtual tasks have nothing to execute,
+            # so only execute them again if a task they depend on is
+            changed: set[Path] = set()
+            affected: set[TaskNode] = set()
+            while not affected:
+                changed = wait_for_changes(watcher)
+                affected = {
+                    node
+                    for node in nodes
+                    if not executor.is_virtual_task(node.task)
+                    and task_affected(node.task, changed)
+                }
+
+            subgraph = affected_subgraph(nodes, affected)
+            for node in subgraph:
+                _reset_task(node.task)
+
+            printer.info(
+                f"{len(changed)} file{'s' * (len(changed) > 1)} changed, "
+                + f"executing {len(subgraph)} task{'s' * (len(subgraph) > 1)}"
+            )
+            # extra args only ever go to the last top-level task
+            executor.execute_nodes(
+                subgraph, extra_args if subgraph[-1].task is nodes[-1].task else []
+            )
+
+            # ignore changes made while the tasks were executing,
+            # such as files the tasks themselves created
+            watcher.discard()
+
+    except KeyboardInterrupt:
+        return 0
+
+    finally:
+        watcher.close()